@@ -0,0 +1,67 @@
+"""Time the cold imports of the library.
+
+Each import is run in a fresh interpreter a number of times, and the
+fastest time is reported, along with the modules of the library that
+were loaded::
+
+    python benchmarks/import_time.py --repeat 10
+"""
+
+import argparse
+import subprocess
+import sys
+
+IMPORTS = (
+    "import matching",
+    "from matching import Player",
+    "from matching.games import StableMarriage",
+    "from matching.games import HospitalResident",
+    "from matching.games import StudentAllocation",
+    "from matching.algorithms import stable_roommates",
+    "import matching.cli",
+)
+
+TIMER = """
+import sys, time
+start = time.perf_counter()
+{statement}
+elapsed = time.perf_counter() - start
+loaded = sum(name.startswith("matching") for name in sys.modules)
+print(elapsed, loaded)
+"""
+
+
+def time_import(statement, repeat):
+    """Get the fastest time taken by an import in a fresh interpreter,
+    and the number of modules of the library it loaded."""
+
+    times = []
+    for _ in range(repeat):
+        output = subprocess.run(
+            [sys.executable, "-c", TIMER.format(statement=statement)],
+            capture_output=True,
+            text=True,
+            check=True,
+        )
+        elapsed, loaded = output.stdout.split()
+        times.append(float(elapsed))
+
+    return min(times), int(loaded)
+
+
+def main(argv=None):
+    """Time each import and print a table of the results."""
+
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--repeat", type=int, default=5)
+    args = parser.parse_args(argv)
+
+    width = max(map(len, IMPORTS))
+    print(f"{'import':<{width}}  {'ms':>8}  {'modules':>7}")
+    for statement in IMPORTS:
+        elapsed, loaded = time_import(statement, args.repeat)
+        print(f"{statement:<{width}}  {elapsed * 1000:>8.1f}  {loaded:>7}")
+
+
+if __name__ == "__main__":
+    main()
@@ -1,15 +1,14 @@
 """Top-level imports for the library."""
 
+import os
 import sys
 
-if not sys.warnoptions:
+if not sys.warnoptions and not os.environ.get("MATCHING_NO_WARNINGS_FILTER"):
     import warnings
 
     warnings.simplefilter("always")
 
-from .base import BaseGame, BaseMatching, BasePlayer
-from .matchings import MultipleMatching, SingleMatching
-from .players import Hospital, Player, Project, Supervisor
+from ._lazy import attach
 
 __version__ = "1.4.3"
 
@@ -26,3 +25,37 @@ __all__ = [
     "Supervisor",
     "__version__",
 ]
+
+__getattr__, __dir__ = attach(
+    __name__,
+    submodules=[
+        "algorithms",
+        "base",
+        "batch",
+        "cache",
+        "checkpoint",
+        "cli",
+        "compact",
+        "exceptions",
+        "games",
+        "io",
+        "matchings",
+        "pickling",
+        "players",
+        "spec",
+        "sweep",
+        "tensor",
+        "validation",
+    ],
+    exports={
+        "BaseGame": ".base",
+        "BaseMatching": ".base",
+        "BasePlayer": ".base",
+        "Hospital": ".players",
+        "MultipleMatching": ".matchings",
+        "Player": ".players",
+        "Project": ".players",
+        "SingleMatching": ".matchings",
+        "Supervisor": ".players",
+    },
+)
@@ -0,0 +1,7 @@
+"""Run the command-line interface with ``python -m matching``."""
+
+import sys
+
+from matching.cli import main
+
+sys.exit(main())
@@ -0,0 +1,79 @@
+"""Lazy loading of the exports of the packages in the library.
+
+Each package lists the module that each of its exports comes from, and
+the module is only imported when the export is first used. Importing
+``HospitalResident`` then loads the modules it needs and no others.
+"""
+
+import importlib
+import sys
+import types
+
+
+class _Package(types.ModuleType):
+    """A package that loads its exports and submodules when they are first
+    used.
+
+    When a submodule is imported, it is set as an attribute of the
+    package. Where the package exports something of the same name from
+    that submodule, as ``matching.algorithms`` does with its functions,
+    the export is kept in its place instead.
+    """
+
+    def __setattr__(self, name, value):
+        exports = vars(self).get("_exports", {})
+        if (
+            isinstance(value, types.ModuleType)
+            and value.__name__ == f"{self.__name__}.{name}"
+            and exports.get(name) == f".{name}"
+        ):
+            value = getattr(value, name)
+
+        super().__setattr__(name, value)
+
+
+def attach(name, submodules=(), exports=None):
+    """Make the submodules and exports of a package load lazily.
+
+    Parameters
+    ----------
+    name : str
+        The name of the package.
+    submodules : iterable of str
+        The submodules of the package that can be used as attributes of
+        it without being imported first.
+    exports : dict, optional
+        A dictionary mapping the name of each export of the package to
+        the module it is taken from, relative to the package.
+
+    Returns
+    -------
+    __getattr__ : callable
+        The ``__getattr__`` function of the package.
+    __dir__ : callable
+        The ``__dir__`` function of the package.
+    """
+
+    package = sys.modules[name]
+    submodules = set(submodules)
+    exports = dict(exports or {})
+
+    package.__class__ = _Package
+    package._exports = exports
+
+    def __getattr__(attr):
+        if attr in exports:
+            module = importlib.import_module(exports[attr], name)
+            value = getattr(module, attr)
+        elif attr in submodules:
+            value = importlib.import_module(f".{attr}", name)
+        else:
+            raise AttributeError(f"module {name!r} has no attribute {attr!r}")
+
+        setattr(package, attr, value)
+        return value
+
+    def __dir__():
+        return sorted(set(vars(package)) | submodules | set(exports))
+
+    return __getattr__, __dir__
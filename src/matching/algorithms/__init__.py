@@ -1,13 +1,34 @@
-"""Top-level imports for the `matching.algorithms` subpackage."""
+"""Top-level imports for the `matching.algorithms` subpackage.
 
-from .hospital_resident import hospital_resident
-from .stable_marriage import stable_marriage
-from .stable_roommates import stable_roommates
-from .student_allocation import student_allocation
+Each algorithm is only imported when it is first used.
+"""
+
+from matching._lazy import attach
 
 __all__ = [
+    "Progress",
     "hospital_resident",
+    "hospital_resident_iter",
     "stable_marriage",
+    "stable_marriage_iter",
     "stable_roommates",
+    "stable_roommates_iter",
     "student_allocation",
+    "student_allocation_iter",
 ]
+
+__getattr__, __dir__ = attach(
+    __name__,
+    submodules=["arrays", "kernels", "util"],
+    exports={
+        "Progress": ".util",
+        "hospital_resident": ".hospital_resident",
+        "hospital_resident_iter": ".hospital_resident",
+        "stable_marriage": ".stable_marriage",
+        "stable_marriage_iter": ".stable_marriage",
+        "stable_roommates": ".stable_roommates",
+        "stable_roommates_iter": ".stable_roommates",
+        "student_allocation": ".student_allocation",
+        "student_allocation_iter": ".student_allocation",
+    },
+)
@@ -0,0 +1,96 @@
+"""Functions for the array-based engines of the algorithms.
+
+These are only imported by the ``"rounds"`` engines and the ``"numba"``
+backends, so that numpy is not imported until one of them is used.
+"""
+
+import itertools
+
+import numpy as np
+
+
+def _prefs_to_arrays(players, index):
+    """Get the preferences of some players in compressed sparse row
+    form, as the positions of the players they rank in ``index``."""
+
+    lengths = np.fromiter(
+        (len(player.prefs) for player in players),
+        dtype=np.int64,
+        count=len(players),
+    )
+    indptr = np.zeros(len(players) + 1, dtype=np.int64)
+    np.cumsum(lengths, out=indptr[1:])
+    ranked = itertools.chain.from_iterable(player.prefs for player in players)
+    choices = np.fromiter(
+        map(index.__getitem__, ranked), dtype=np.int64, count=indptr[-1]
+    )
+
+    return indptr, choices
+
+
+def _get_ranks(indptr, choices, rows, cols):
+    """Get the rank of each of ``cols`` in the preferences of the player
+    at the same position in ``rows``.
+
+    The preferences are given in compressed sparse row form. Raise a
+    ``ValueError`` if any of the players do not rank the other.
+    """
+
+    owners = np.repeat(np.arange(len(indptr) - 1), np.diff(indptr))
+    size = 1 + max(
+        len(indptr) - 2, int(choices.max(initial=0)), int(cols.max(initial=0))
+    )
+    keys = owners * size + choices
+    order = np.argsort(keys, kind="stable")
+    sorted_keys = keys[order]
+
+    queries = rows * size + cols
+    query_order = np.argsort(queries)
+    positions = np.empty(len(queries), dtype=np.int64)
+    positions[query_order] = np.searchsorted(sorted_keys, queries[query_order])
+    positions = np.minimum(positions, max(len(sorted_keys) - 1, 0))
+    if len(queries) and not np.array_equal(sorted_keys[positions], queries):
+        raise ValueError(
+            "Every player must be ranked by all of the players they rank."
+        )
+
+    return order[positions] - indptr[rows]
+
+
+def _get_slots(capacities, degrees):
+    """Get the bounds of the block of slots that each player with many
+    matches has for them, which is no longer than their preferences."""
+
+    sizes = np.minimum(np.maximum(capacities, 0), degrees)
+    bounds = np.zeros(len(sizes) + 1, dtype=np.int64)
+    np.cumsum(sizes, out=bounds[1:])
+
+    return bounds
+
+
+def _get_ranges(starts, ends):
+    """Get the concatenation of the ranges between some starts and ends."""
+
+    lengths = ends - starts
+    offsets = np.repeat(ends - np.cumsum(lengths), lengths)
+
+    return offsets + np.arange(lengths.sum())
+
+
+def _keep_best(groups, ranks, capacities):
+    """Find which of some applicants are kept when each group keeps its
+    best ``capacity`` of them by rank, and rejects the others.
+
+    Return the positions of the applicants that are kept, ordered by
+    their group and rank, and their places in their group, followed by
+    the positions of the applicants that are rejected.
+    """
+
+    order = np.lexsort((ranks, groups))
+    sorted_groups = groups[order]
+    places = np.arange(len(order)) - np.searchsorted(
+        sorted_groups, sorted_groups
+    )
+    keep = places < capacities[sorted_groups]
+
+    return order[keep], places[keep], order[~keep]
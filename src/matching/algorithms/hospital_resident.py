@@ -1,6 +1,10 @@
 """Functions for the HR algorithms."""
 
-from .util import _delete_pair, _match_pair
+import collections
+import heapq
+import itertools
+
+from .util import Progress, _check_engine, _run, _use_kernels
 
 
 def _unmatch_pair(resident, hospital):
@@ -10,15 +14,13 @@ def _unmatch_pair(resident, hospital):
     hospital._unmatch(resident)
 
 
-def _check_available(hospital):
-    """Check if a hospital is willing and able to take an applicant."""
-
-    return len(hospital.matching) < hospital.capacity and set(
-        hospital.prefs
-    ).difference(hospital.matching)
-
-
-def hospital_resident(residents, hospitals, optimal="resident"):
+def hospital_resident(
+    residents,
+    hospitals,
+    optimal="resident",
+    engine="sequential",
+    backend="python",
+):
     """Solve an instance of HR using an adapted Gale-Shapley algorithm
     :cite:`Rot84`. A unique, stable and optimal matching is found for
     the given set of residents and hospitals. The optimality of the
@@ -36,6 +38,17 @@ def hospital_resident(residents, hospitals, optimal="resident"):
     optimal : str, optional
         Which party the matching should be optimised for. Must be one of
         ``"resident"`` and ``"hospital"``. Defaults to the former.
+    engine : str, optional
+        How the matching is found. With ``"sequential"`` (the default),
+        one player proposes at a time. With ``"rounds"``, every free
+        resident proposes at once in rounds of array operations. The
+        latter only finds resident-optimal matchings, and is much faster
+        on large instances. Both find the same matching.
+    backend : str, optional
+        How the sequential engine is run. With ``"numba"``, the
+        algorithm runs as a compiled kernel over integer arrays if numba
+        is installed, and in pure Python otherwise. Defaults to
+        ``"python"``.
 
     Returns
     -------
@@ -45,12 +58,54 @@ def hospital_resident(residents, hospitals, optimal="resident"):
         preference.
     """
 
+    _check_engine(engine, optimal, "resident")
+    compiled = _use_kernels(backend)
+    if engine == "rounds":
+        return resident_optimal_rounds(residents, hospitals)
+    if optimal == "resident" and compiled:
+        return resident_optimal_jit(residents, hospitals)
     if optimal == "resident":
         return resident_optimal(residents, hospitals)
+    if optimal == "hospital" and compiled:
+        return hospital_optimal_jit(hospitals)
     if optimal == "hospital":
         return hospital_optimal(hospitals)
 
 
+def hospital_resident_iter(
+    residents,
+    hospitals,
+    optimal="resident",
+    chunk=1000,
+    state=None,
+    engine="sequential",
+):
+    """Solve an instance of HR step by step, as in ``hospital_resident``.
+
+    This is a generator that yields the ``Progress`` of the algorithm
+    after every ``chunk`` proposals, and returns the matching once it
+    has finished. The players are changed as the algorithm goes on, so
+    they are only left as they would be after ``hospital_resident`` if
+    the generator is run to the end.
+
+    If a dictionary is passed as ``state``, the algorithm keeps its
+    worklist and cursors in it, so they can be saved whenever it yields.
+    If the dictionary holds a saved state already, the algorithm carries
+    on from there. See ``matching.checkpoint``.
+
+    With the ``"rounds"`` engine, the progress is yielded after every
+    round rather than every ``chunk`` proposals, and no state is kept.
+    """
+
+    _check_engine(engine, optimal, "resident", state)
+    if engine == "rounds":
+        return resident_optimal_rounds_iter(residents, hospitals)
+    if optimal == "resident":
+        return resident_optimal_iter(residents, hospitals, chunk, state)
+    if optimal == "hospital":
+        return hospital_optimal_iter(hospitals, chunk, state)
+
+
 def resident_optimal(residents, hospitals):
     """Solve the instance of HR to be resident-optimal.
 
@@ -75,28 +130,276 @@ def resident_optimal(residents, hospitals):
            Otherwise, go to 4.
 
         4. Go to 1 until there are no such residents left, then end.
+
+    The matches of each hospital are kept in a heap of their ranks, and
+    each resident keeps a cursor on their preference list. A deleted
+    pair is skipped when the resident's cursor reaches it, so free
+    residents never need to be searched for, and the pairs are removed
+    from the preference lists once the algorithm ends.
+    """
+
+    return _run(resident_optimal_iter(residents, hospitals))
+
+
+def resident_optimal_iter(residents, hospitals, chunk=1000, state=None):
+    """Solve the instance of HR to be resident-optimal, yielding the
+    progress of the algorithm after every ``chunk`` proposals.
+
+    The matches of each hospital are made again from those of the
+    residents when the algorithm carries on from a saved ``state``.
     """
 
-    free_residents = residents[:]
+    ranks = {
+        hospital: {resident: i for i, resident in enumerate(hospital.prefs)}
+        for hospital in hospitals
+    }
+    matches = {hospital: [] for hospital in hospitals}
+
+    state = {} if state is None else state
+    if "proposals" in state:
+        free_residents, cursors = state["free"], state["cursors"]
+        cutoffs = state["cutoffs"]
+        free_residents.append(state["current"])
+        proposals = state["proposals"] - 1
+        for resident in residents:
+            hospital = resident.matching
+            if hospital is not None:
+                matches[hospital].append(-ranks[hospital][resident])
+
+        for heap in matches.values():
+            heapq.heapify(heap)
+    else:
+        cutoffs = {
+            hospital: len(hospital.prefs) - 1 if hospital.capacity > 0 else -1
+            for hospital in hospitals
+        }
+        cursors = dict.fromkeys(residents, 0)
+        free_residents = residents[::-1]
+        proposals = 0
+        state.update(free=free_residents, cursors=cursors, cutoffs=cutoffs)
+
     while free_residents:
         resident = free_residents.pop()
-        hospital = resident.get_favourite()
-
-        if len(hospital.matching) == hospital.capacity:
-            worst = hospital.get_worst_match()
-            _unmatch_pair(worst, hospital)
+        prefs, cursor = resident.prefs, cursors[resident]
+        while cursor < len(prefs):
+            hospital = prefs[cursor]
+            rank = ranks[hospital][resident]
+            if rank <= cutoffs[hospital]:
+                break
+
+            cursor += 1
+
+        cursors[resident] = cursor
+        if cursor == len(prefs):
+            continue
+
+        proposals += 1
+        if proposals % chunk == 0:
+            state.update(current=resident, proposals=proposals)
+            yield Progress(len(free_residents) + 1, proposals)
+
+        heap = matches[hospital]
+        if len(heap) == hospital.capacity:
+            worst = hospital.prefs[-heapq.heapreplace(heap, -rank)]
+            worst._unmatch()
             free_residents.append(worst)
+        else:
+            heapq.heappush(heap, -rank)
+
+        resident._match(hospital)
+        if len(heap) == hospital.capacity:
+            cutoffs[hospital] = -heap[0]
+
+    for resident in residents:
+        resident.prefs = [
+            hospital
+            for hospital in resident.prefs
+            if ranks[hospital][resident] <= cutoffs[hospital]
+        ]
+
+    for hospital in hospitals:
+        prefs = hospital.prefs
+        hospital.matching = [
+            prefs[-rank] for rank in sorted(matches[hospital], reverse=True)
+        ]
+        hospital.prefs = prefs[: cutoffs[hospital] + 1]
+
+    return {r: r.matching for r in hospitals}
 
-        _match_pair(resident, hospital)
 
-        if len(hospital.matching) == hospital.capacity:
-            successors = hospital.get_successors()
-            for successor in successors:
-                _delete_pair(hospital, successor)
-                if not successor.prefs and successor in free_residents:
-                    free_residents.remove(successor)
+def resident_optimal_rounds(residents, hospitals):
+    """Solve the instance of HR to be resident-optimal in rounds.
 
-    return {r: r.matching for r in hospitals}
+    The order in which residents propose does not change the matching
+    that is found, so every free resident can propose at once. In each
+    round, every free resident proposes to the next hospital on their
+    preference list. Each hospital that is proposed to keeps the best
+    ``capacity`` of its current matches and new applicants, and rejects
+    the rest. The rounds end once no resident is left to propose.
+
+    The rounds are carried out with array operations over the residents
+    and their preferences, so the players are only looked at to set up
+    the arrays and to update them at the end. They are left as they
+    would be by ``resident_optimal``.
+    """
+
+    return _run(resident_optimal_rounds_iter(residents, hospitals))
+
+
+def resident_optimal_rounds_iter(residents, hospitals):
+    """Solve the instance of HR to be resident-optimal in rounds,
+    yielding the progress of the algorithm after every round.
+
+    Each hospital has a block of slots holding its matches in order of
+    preference, so that only the hospitals proposed to in a round are
+    looked at in that round.
+    """
+
+    import numpy as np
+
+    from .arrays import _get_ranges, _get_slots, _keep_best
+
+    arrays = _index(residents, hospitals)
+    indptr, choices = arrays["indptr"], arrays["choices"]
+    owners, ranks = arrays["owners"], arrays["ranks"]
+    capacities = arrays["capacities"]
+
+    bounds = _get_slots(capacities, np.diff(arrays["hospital_indptr"]))
+    slots = np.full(bounds[-1], -1, dtype=np.int64)
+
+    degrees = np.diff(indptr)
+    cursors = np.zeros(len(residents), dtype=np.int64)
+    free = np.flatnonzero(degrees > 0)
+    proposals = 0
+    while free.size:
+        proposals += free.size
+        proposed = np.unique(choices[indptr[free] + cursors[free]])
+        blocks = _get_ranges(bounds[proposed], bounds[proposed + 1])
+        held = slots[blocks]
+
+        entries = np.concatenate(
+            (indptr[free] + cursors[free], held[held >= 0])
+        )
+        groups = choices[entries]
+        kept, places, rejected = _keep_best(groups, ranks[entries], capacities)
+
+        slots[blocks] = -1
+        slots[bounds[groups[kept]] + places] = entries[kept]
+
+        rejected = owners[entries[rejected]]
+        cursors[rejected] += 1
+        free = rejected[cursors[rejected] < degrees[rejected]]
+        if free.size:
+            yield Progress(free.size, proposals)
+
+    return _set_resident_optimal(
+        residents, hospitals, arrays, slots[slots >= 0]
+    )
+
+
+def resident_optimal_jit(residents, hospitals):
+    """Solve the instance of HR to be resident-optimal with the compiled
+    kernel of ``resident_optimal``.
+
+    The matches of each hospital are kept in a heap of their ranks, as
+    they are by ``resident_optimal``, and the players are left as they
+    would be by it. See ``matching.algorithms.kernels``.
+    """
+
+    import numpy as np
+
+    from . import kernels
+    from .arrays import _get_slots
+
+    arrays = _index(residents, hospitals)
+    capacities = arrays["capacities"]
+    bounds = _get_slots(capacities, np.diff(arrays["hospital_indptr"]))
+    matches = kernels.resident_optimal_kernel(
+        arrays["indptr"],
+        arrays["choices"],
+        arrays["ranks"],
+        capacities,
+        bounds,
+    )
+
+    return _set_resident_optimal(
+        residents, hospitals, arrays, matches[matches >= 0]
+    )
+
+
+def _index(residents, hospitals):
+    """Get the arrays describing an instance of HR, with the preferences
+    of the residents in compressed sparse row form and the rank that
+    each hospital they rank gives them."""
+
+    import numpy as np
+
+    from .arrays import _get_ranks, _prefs_to_arrays
+
+    resident_index = {resident: i for i, resident in enumerate(residents)}
+    hospital_index = {hospital: i for i, hospital in enumerate(hospitals)}
+    indptr, choices = _prefs_to_arrays(residents, hospital_index)
+    hospital_indptr, hospital_choices = _prefs_to_arrays(
+        hospitals, resident_index
+    )
+    owners = np.repeat(np.arange(len(residents)), np.diff(indptr))
+
+    return {
+        "indptr": indptr,
+        "choices": choices,
+        "owners": owners,
+        "ranks": _get_ranks(
+            hospital_indptr, hospital_choices, choices, owners
+        ),
+        "hospital_indptr": hospital_indptr,
+        "capacities": np.array(
+            [hospital.capacity for hospital in hospitals], dtype=np.int64
+        ),
+    }
+
+
+def _set_resident_optimal(residents, hospitals, arrays, held):
+    """Update the players from the entries of the resident-optimal
+    matching, as ``resident_optimal`` leaves them.
+
+    Each full hospital deletes the residents it ranks below its worst
+    match, and the deleted pairs are removed from the preferences.
+    """
+
+    import numpy as np
+
+    choices, ranks = arrays["choices"], arrays["ranks"]
+    capacities = arrays["capacities"]
+
+    held = held[np.lexsort((ranks[held], choices[held]))]
+    counts = np.bincount(choices[held], minlength=len(hospitals))
+    edges = np.zeros(len(hospitals) + 1, dtype=np.int64)
+    np.cumsum(counts, out=edges[1:])
+
+    full = (counts == capacities) & (capacities > 0)
+    cutoffs = np.where(
+        capacities > 0, np.diff(arrays["hospital_indptr"]) - 1, -1
+    )
+    cutoffs[full] = ranks[held[edges[1:][full] - 1]]
+
+    keep = (ranks <= cutoffs[choices]).tolist()
+    indptr = arrays["indptr"].tolist()
+    for resident, start, end in zip(residents, indptr, indptr[1:]):
+        resident.prefs = list(
+            itertools.compress(resident.prefs, keep[start:end])
+        )
+
+    matches, edges = arrays["owners"][held].tolist(), edges.tolist()
+    for hospital, start, end, cutoff in zip(
+        hospitals, edges, edges[1:], cutoffs.tolist()
+    ):
+        hospital.matching = [residents[i] for i in matches[start:end]]
+        for resident in hospital.matching:
+            resident._match(hospital)
+
+        hospital.prefs = hospital.prefs[: cutoff + 1]
+
+    return {h: h.matching for h in hospitals}
 
 
 def hospital_optimal(hospitals):
@@ -121,27 +424,147 @@ def hospital_optimal(hospitals):
            game.
 
         4. Go to 1 until there are no such hospitals left, then end.
+
+    Each hospital keeps a cursor on its preference list, so residents
+    are proposed to at most once per hospital. Deleted pairs are skipped
+    as the cursors pass them, and are removed from the preference lists
+    once the algorithm ends.
+    """
+
+    return _run(hospital_optimal_iter(hospitals))
+
+
+def hospital_optimal_iter(hospitals, chunk=1000, state=None):
+    """Solve the instance of HR to be hospital-optimal, yielding the
+    progress of the algorithm after every ``chunk`` proposals.
+
+    When the algorithm yields, the cursor of the hospital proposing is
+    left on the resident it is proposing to, so that it proposes to
+    them again if the algorithm carries on from a saved ``state``.
     """
 
-    free_hospitals = hospitals[:]
+    residents = {r: None for hospital in hospitals for r in hospital.prefs}
+    ranks = {
+        resident: {hospital: i for i, hospital in enumerate(resident.prefs)}
+        for resident in residents
+    }
+
+    state = {} if state is None else state
+    if "proposals" in state:
+        free_hospitals = collections.deque(state["free"])
+        free_hospitals.appendleft(state["current"])
+        cursors = state["cursors"]
+        is_free = dict.fromkeys(hospitals, False)
+        is_free.update(dict.fromkeys(free_hospitals, True))
+        proposals = state["proposals"] - 1
+        state["free"] = free_hospitals
+    else:
+        cursors = dict.fromkeys(hospitals, 0)
+        free_hospitals = collections.deque(hospitals)
+        is_free = dict.fromkeys(hospitals, True)
+        proposals = 0
+        state.update(free=free_hospitals, cursors=cursors)
+
     while free_hospitals:
-        hospital = free_hospitals.pop()
-        resident = hospital.get_favourite()
-
-        if resident.matching:
-            current_match = resident.matching
-            _unmatch_pair(resident, current_match)
-            if current_match not in free_hospitals:
-                free_hospitals.append(current_match)
-
-        _match_pair(resident, hospital)
-        if _check_available(hospital):
-            free_hospitals.append(hospital)
-
-        successors = resident.get_successors()
-        for successor in successors:
-            _delete_pair(resident, successor)
-            if not _check_available(successor) and successor in free_hospitals:
-                free_hospitals.remove(successor)
+        hospital = free_hospitals.popleft()
+        is_free[hospital] = False
+
+        prefs, cursor = hospital.prefs, cursors[hospital]
+        while cursor < len(prefs):
+            if len(hospital.matching) >= hospital.capacity:
+                break
+
+            resident = prefs[cursor]
+            cursor += 1
+
+            proposals += 1
+            if proposals % chunk == 0:
+                cursors[hospital] = cursor - 1
+                state.update(current=hospital, proposals=proposals)
+                yield Progress(len(free_hospitals) + 1, proposals)
+
+            rank, current_match = ranks[resident], resident.matching
+            if current_match is not None:
+                if rank[current_match] < rank[hospital]:
+                    continue
+
+                _unmatch_pair(resident, current_match)
+                if not is_free[current_match]:
+                    is_free[current_match] = True
+                    free_hospitals.append(current_match)
+
+            resident._match(hospital)
+            hospital.matching.append(resident)
+
+        cursors[hospital] = cursor
+
+    for resident in residents:
+        if resident.matching is not None:
+            idx = ranks[resident][resident.matching]
+            resident.prefs = resident.prefs[: idx + 1]
+
+    for hospital in hospitals:
+        hospital.prefs = [
+            resident
+            for resident in hospital.prefs
+            if resident.matching is None
+            or ranks[resident][hospital] <= ranks[resident][resident.matching]
+        ]
+
+    return {r: r.matching for r in hospitals}
+
+
+def hospital_optimal_jit(hospitals):
+    """Solve the instance of HR to be hospital-optimal with the compiled
+    kernel of ``hospital_optimal``.
+
+    The hospitals propose in the same order as they do in
+    ``hospital_optimal``, and the players are left as they would be by
+    it. See ``matching.algorithms.kernels``.
+    """
+
+    import numpy as np
+
+    from . import kernels
+    from .arrays import _get_ranks, _prefs_to_arrays
+
+    residents = list(
+        dict.fromkeys(r for hospital in hospitals for r in hospital.prefs)
+    )
+    resident_index = {resident: i for i, resident in enumerate(residents)}
+    hospital_index = {hospital: i for i, hospital in enumerate(hospitals)}
+    indptr, choices = _prefs_to_arrays(hospitals, resident_index)
+    resident_indptr, resident_choices = _prefs_to_arrays(
+        residents, hospital_index
+    )
+    owners = np.repeat(np.arange(len(hospitals)), np.diff(indptr))
+    ranks = _get_ranks(resident_indptr, resident_choices, choices, owners)
+    capacities = np.array(
+        [hospital.capacity for hospital in hospitals], dtype=np.int64
+    )
+
+    matches = kernels.hospital_optimal_kernel(
+        indptr, choices, ranks, capacities, len(residents)
+    )
+
+    matched = matches >= 0
+    limits = np.where(matched, ranks[matches], len(hospitals))
+    for i in np.flatnonzero(matched).tolist():
+        residents[i].prefs = residents[i].prefs[: limits[i] + 1]
+
+    keep, edges = (ranks <= limits[choices]).tolist(), indptr.tolist()
+    for hospital, start, end in zip(hospitals, edges, edges[1:]):
+        hospital.prefs = list(
+            itertools.compress(hospital.prefs, keep[start:end])
+        )
+        hospital.matching = []
+
+    for entry in np.sort(matches[matched]).tolist():
+        resident, hospital = (
+            residents[choices[entry]],
+            hospitals[owners[entry]],
+        )
+        resident._match(hospital)
+        hospital.matching.append(resident)
 
     return {r: r.matching for r in hospitals}
@@ -0,0 +1,528 @@
+"""Integer-array kernels for the core loops of the algorithms.
+
+Each kernel takes the preferences of the proposing players in compressed
+sparse row form: ``indptr`` and ``choices`` give the positions of the
+players that each player ranks, and ``ranks`` gives, for each entry, the
+rank that the chosen player gives the player choosing them. The kernels
+take the same steps as the algorithms they stand in for, and return the
+arrays from which the players are then updated.
+
+If numba is installed, the kernels are compiled the first time the
+``"numba"`` backend of an algorithm is used, so that numba is only
+imported when it is needed. Otherwise, that backend falls back to the
+pure Python algorithms, while the kernels can still be called as
+ordinary Python functions.
+"""
+
+import threading
+
+import numpy as np
+
+_UNRANKED = 1 << 62
+_KERNELS = []
+_LOCK = threading.Lock()
+
+
+def _jit(func):
+    """Mark a function as a kernel to compile with numba."""
+
+    _KERNELS.append(func.__name__)
+    return func
+
+
+def _compile():
+    """Swap each kernel in this module for its compiled version.
+
+    The kernels are swapped before any are compiled, so the kernels that
+    call others call the compiled versions. The swap is made by one
+    thread at a time, and the list of kernels to swap is only emptied
+    once they have all been swapped.
+    """
+
+    if not _KERNELS:
+        return
+
+    import numba
+
+    jit = numba.njit(cache=True, nogil=True)
+    module = globals()
+    with _LOCK:
+        for name in _KERNELS:
+            module[name] = jit(module[name])
+
+        _KERNELS.clear()
+
+
+@_jit
+def _sift_up(heap, start, keys, positions, i):
+    """Move an item up a max-heap of items by their keys."""
+
+    item = heap[start + i]
+    while i > 0:
+        parent = (i - 1) // 2
+        other = heap[start + parent]
+        if keys[other] >= keys[item]:
+            break
+
+        heap[start + i] = other
+        positions[other] = i
+        i = parent
+
+    heap[start + i] = item
+    positions[item] = i
+
+
+@_jit
+def _sift_down(heap, start, size, keys, positions, i):
+    """Move an item down a max-heap of items by their keys."""
+
+    item = heap[start + i]
+    while 2 * i + 1 < size:
+        child = 2 * i + 1
+        if child + 1 < size and (
+            keys[heap[start + child + 1]] > keys[heap[start + child]]
+        ):
+            child += 1
+
+        other = heap[start + child]
+        if keys[other] <= keys[item]:
+            break
+
+        heap[start + i] = other
+        positions[other] = i
+        i = child
+
+    heap[start + i] = item
+    positions[item] = i
+
+
+@_jit
+def _push(heap, bounds, sizes, keys, positions, group, item):
+    """Add an item to the heap of a group, held in its block of
+    ``heap``."""
+
+    sizes[group] += 1
+    heap[bounds[group] + sizes[group] - 1] = item
+    _sift_up(heap, bounds[group], keys, positions, sizes[group] - 1)
+
+
+@_jit
+def _remove(heap, bounds, sizes, keys, positions, group, item):
+    """Remove an item from the heap of a group."""
+
+    i = positions[item]
+    sizes[group] -= 1
+    size, start = sizes[group], bounds[group]
+    if i < size:
+        last = heap[start + size]
+        heap[start + i] = last
+        positions[last] = i
+        _sift_up(heap, start, keys, positions, i)
+        _sift_down(heap, start, size, keys, positions, positions[last])
+
+
+@_jit
+def stable_marriage_kernel(indptr, choices, ranks, reviewers):
+    """Find the suitor-optimal matching of an instance of SM.
+
+    Return the position of the suitor that each of the ``reviewers``
+    holds at the end, or -1 if they hold no one, and the rank they give
+    that suitor.
+    """
+
+    suitors = len(indptr) - 1
+    holders = np.full(reviewers, -1, dtype=np.int64)
+    holder_ranks = np.full(reviewers, _UNRANKED, dtype=np.int64)
+    cursors = indptr[:-1].copy()
+
+    stack = np.arange(suitors)
+    size = suitors
+    while size:
+        size -= 1
+        suitor = stack[size]
+        end = indptr[suitor + 1]
+        while cursors[suitor] < end:
+            entry = cursors[suitor]
+            if ranks[entry] < holder_ranks[choices[entry]]:
+                break
+            cursors[suitor] += 1
+
+        if cursors[suitor] == end:
+            continue
+
+        entry = cursors[suitor]
+        reviewer = choices[entry]
+        if holders[reviewer] >= 0:
+            stack[size] = holders[reviewer]
+            size += 1
+
+        holders[reviewer] = suitor
+        holder_ranks[reviewer] = ranks[entry]
+
+    return holders, holder_ranks
+
+
+@_jit
+def resident_optimal_kernel(indptr, choices, ranks, capacities, bounds):
+    """Find the resident-optimal matching of an instance of HR.
+
+    The matches of each hospital are kept in a heap of their ranks in
+    its block of slots, given by ``bounds``. Return the entry of the
+    match of each resident, or -1 if they are unmatched.
+    """
+
+    residents = len(indptr) - 1
+    heap = np.empty(bounds[-1], dtype=np.int64)
+    sizes = np.zeros(len(capacities), dtype=np.int64)
+    keys = np.zeros(residents, dtype=np.int64)
+    positions = np.zeros(residents, dtype=np.int64)
+    matches = np.full(residents, -1, dtype=np.int64)
+    cursors = indptr[:-1].copy()
+
+    stack = np.arange(residents)
+    size = residents
+    while size:
+        size -= 1
+        resident = stack[size]
+        end = indptr[resident + 1]
+        while cursors[resident] < end:
+            entry = cursors[resident]
+            hospital = choices[entry]
+            if sizes[hospital] < capacities[hospital]:
+                break
+            if capacities[hospital] > 0 and (
+                ranks[entry] < keys[heap[bounds[hospital]]]
+            ):
+                break
+            cursors[resident] += 1
+
+        if cursors[resident] == end:
+            continue
+
+        entry = cursors[resident]
+        hospital = choices[entry]
+        if sizes[hospital] == capacities[hospital]:
+            worst = heap[bounds[hospital]]
+            _remove(heap, bounds, sizes, keys, positions, hospital, worst)
+            matches[worst] = -1
+            stack[size] = worst
+            size += 1
+
+        keys[resident] = ranks[entry]
+        matches[resident] = entry
+        _push(heap, bounds, sizes, keys, positions, hospital, resident)
+
+    return matches
+
+
+@_jit
+def hospital_optimal_kernel(indptr, choices, ranks, capacities, residents):
+    """Find the hospital-optimal matching of an instance of HR.
+
+    The hospitals wait their turn in a circular queue, and each keeps a
+    cursor on its preferences. Return the entry of the match of each of
+    the ``residents``, or -1 if they are unmatched.
+    """
+
+    hospitals = len(indptr) - 1
+    matches = np.full(residents, -1, dtype=np.int64)
+    match_hospitals = np.full(residents, -1, dtype=np.int64)
+    match_ranks = np.full(residents, _UNRANKED, dtype=np.int64)
+    counts = np.zeros(hospitals, dtype=np.int64)
+    cursors = indptr[:-1].copy()
+
+    queue = np.arange(hospitals)
+    is_free = np.ones(hospitals, dtype=np.bool_)
+    head, size = 0, hospitals
+    while size:
+        hospital = queue[head]
+        head = (head + 1) % hospitals
+        size -= 1
+        is_free[hospital] = False
+
+        while cursors[hospital] < indptr[hospital + 1]:
+            if counts[hospital] >= capacities[hospital]:
+                break
+
+            entry = cursors[hospital]
+            cursors[hospital] += 1
+
+            resident = choices[entry]
+            if matches[resident] >= 0:
+                if match_ranks[resident] < ranks[entry]:
+                    continue
+
+                current = match_hospitals[resident]
+                counts[current] -= 1
+                if not is_free[current]:
+                    is_free[current] = True
+                    queue[(head + size) % hospitals] = current
+                    size += 1
+
+            matches[resident] = entry
+            match_hospitals[resident] = hospital
+            match_ranks[resident] = ranks[entry]
+            counts[hospital] += 1
+
+    return matches
+
+
+@_jit
+def student_optimal_kernel(
+    indptr,
+    choices,
+    project_ranks,
+    supervisor_ranks,
+    offers,
+    capacities,
+    supervisor_capacities,
+    bounds,
+    supervisor_bounds,
+    cutoffs,
+    supervisor_cutoffs,
+):
+    """Find the student-optimal matching of an instance of SA.
+
+    The matches of each project and supervisor are kept in heaps of
+    their ranks, with room for one more than their capacity. The cutoff
+    ranks of the projects and supervisors, beyond which their pairs are
+    deleted, are lowered in place. Return the entry of the match of each
+    student, or -1 if they are unmatched.
+    """
+
+    students = len(indptr) - 1
+    heap = np.empty(bounds[-1], dtype=np.int64)
+    supervisor_heap = np.empty(supervisor_bounds[-1], dtype=np.int64)
+    sizes = np.zeros(len(capacities), dtype=np.int64)
+    supervisor_sizes = np.zeros(len(supervisor_capacities), dtype=np.int64)
+    keys = np.zeros(students, dtype=np.int64)
+    supervisor_keys = np.zeros(students, dtype=np.int64)
+    positions = np.zeros(students, dtype=np.int64)
+    supervisor_positions = np.zeros(students, dtype=np.int64)
+    matches = np.full(students, -1, dtype=np.int64)
+
+    cursors = indptr[:-1].copy()
+
+    stack = np.arange(students)
+    size = students
+    while size:
+        size -= 1
+        student = stack[size]
+        end = indptr[student + 1]
+        while cursors[student] < end:
+            entry = cursors[student]
+            project = choices[entry]
+            if project_ranks[entry] <= cutoffs[project] and (
+                supervisor_ranks[entry] <= supervisor_cutoffs[offers[project]]
+            ):
+                break
+            cursors[student] += 1
+
+        if cursors[student] == end:
+            continue
+
+        entry = cursors[student]
+        project = choices[entry]
+        supervisor = offers[project]
+
+        matches[student] = entry
+        keys[student] = project_ranks[entry]
+        supervisor_keys[student] = supervisor_ranks[entry]
+        _push(heap, bounds, sizes, keys, positions, project, student)
+        _push(
+            supervisor_heap,
+            supervisor_bounds,
+            supervisor_sizes,
+            supervisor_keys,
+            supervisor_positions,
+            supervisor,
+            student,
+        )
+
+        worst = -1
+        if sizes[project] > capacities[project]:
+            worst = heap[bounds[project]]
+        elif supervisor_sizes[supervisor] > supervisor_capacities[supervisor]:
+            worst = supervisor_heap[supervisor_bounds[supervisor]]
+
+        if worst >= 0:
+            other = choices[matches[worst]]
+            _remove(heap, bounds, sizes, keys, positions, other, worst)
+            _remove(
+                supervisor_heap,
+                supervisor_bounds,
+                supervisor_sizes,
+                supervisor_keys,
+                supervisor_positions,
+                offers[other],
+                worst,
+            )
+            matches[worst] = -1
+            stack[size] = worst
+            size += 1
+
+        if sizes[project] == capacities[project]:
+            rank = keys[heap[bounds[project]]]
+            cutoffs[project] = min(cutoffs[project], rank)
+
+        if supervisor_sizes[supervisor] == supervisor_capacities[supervisor]:
+            rank = supervisor_keys[
+                supervisor_heap[supervisor_bounds[supervisor]]
+            ]
+            supervisor_cutoffs[supervisor] = min(
+                supervisor_cutoffs[supervisor], rank
+            )
+
+    return matches
+
+
+@_jit
+def _get_head(indptr, alive, heads, player):
+    """Get the first entry of a player that has not been deleted."""
+
+    while heads[player] < indptr[player + 1] and not alive[heads[player]]:
+        heads[player] += 1
+
+    return heads[player]
+
+
+@_jit
+def _get_tail(indptr, alive, tails, player):
+    """Get the last entry of a player that has not been deleted."""
+
+    while tails[player] >= indptr[player] and not alive[tails[player]]:
+        tails[player] -= 1
+
+    return tails[player]
+
+
+@_jit
+def _delete_entry(choices, mirror, owners, alive, degrees, entry):
+    """Delete the pair of an entry from the preferences of both players,
+    and return the number of them left with no preferences."""
+
+    if not alive[entry]:
+        return 0
+
+    emptied = 0
+    for side in (entry, mirror[entry]):
+        alive[side] = False
+        degrees[owners[side]] -= 1
+        if degrees[owners[side]] == 0:
+            emptied += 1
+
+    return emptied
+
+
+@_jit
+def first_phase_kernel(indptr, choices, mirror, owners):
+    """Make the one-way proposals of the first phase of SR.
+
+    ``mirror`` gives the entry of the other side of each pair, and
+    ``owners`` the player each entry belongs to. Return which entries
+    are left, the player whose proposal each player holds (or -1), the
+    number of preferences each player has left, and the first and last
+    entry of each player that is left.
+    """
+
+    players = len(indptr) - 1
+    alive = np.ones(len(choices), dtype=np.bool_)
+    degrees = np.diff(indptr)
+    heads = indptr[:-1].copy()
+    tails = indptr[1:] - 1
+    holds = np.full(players, -1, dtype=np.int64)
+
+    stack = np.arange(players)
+    size = players
+    while size:
+        size -= 1
+        player = stack[size]
+        if degrees[player] == 0:
+            continue
+
+        entry = _get_head(indptr, alive, heads, player)
+        favourite = choices[entry]
+        if holds[favourite] >= 0:
+            stack[size] = holds[favourite]
+            size += 1
+
+        holds[favourite] = player
+        for successor in range(mirror[entry] + 1, indptr[favourite + 1]):
+            _delete_entry(choices, mirror, owners, alive, degrees, successor)
+
+    return alive, holds, degrees, heads, tails
+
+
+@_jit
+def second_phase_kernel(
+    indptr, choices, mirror, owners, alive, degrees, heads, tails
+):
+    """Remove all-or-nothing cycles in the second phase of SR.
+
+    The arrays left by the first phase are changed in place. Return the
+    partner of each player, or -1, and whether any player emptied their
+    preferences.
+    """
+
+    players = len(indptr) - 1
+    lasts = np.empty(players + 1, dtype=np.int64)
+    seconds = np.empty(players + 1, dtype=np.int64)
+    seen = np.full(players, -1, dtype=np.int64)
+    pairs = np.empty(len(choices), dtype=np.int64)
+    emptied = np.sum(degrees == 0)
+
+    player = 0
+    while degrees[player] <= 1:
+        player += 1
+
+    while True:
+        lasts[0] = player
+        seen[player] = 0
+        length = 1
+        while True:
+            entry = _get_head(indptr, alive, heads, player) + 1
+            while not alive[entry]:
+                entry += 1
+
+            second = choices[entry]
+            seconds[length - 1] = entry
+            player = choices[_get_tail(indptr, alive, tails, second)]
+            lasts[length] = player
+            length += 1
+            if seen[player] >= 0:
+                break
+            seen[player] = length - 1
+
+        start = seen[player]
+        for i in range(length):
+            seen[lasts[i]] = -1
+
+        count = 0
+        for i in range(start, length - 1):
+            right = choices[seconds[i]]
+            tail = _get_tail(indptr, alive, tails, right)
+            for successor in range(mirror[seconds[i]] + 1, tail + 1):
+                if alive[successor]:
+                    pairs[count] = successor
+                    count += 1
+
+        for i in range(count):
+            emptied += _delete_entry(
+                choices, mirror, owners, alive, degrees, pairs[i]
+            )
+
+        if emptied:
+            break
+
+        player = 0
+        while player < players and degrees[player] <= 1:
+            player += 1
+        if player == players:
+            break
+
+    partners = np.full(players, -1, dtype=np.int64)
+    for player in range(players):
+        if degrees[player]:
+            partners[player] = choices[_get_head(indptr, alive, heads, player)]
+
+    return partners, emptied > 0
@@ -1,6 +1,8 @@
 """Functions for the SM algorithms."""
 
-from .util import _delete_pair, _match_pair
+import itertools
+
+from .util import Progress, _delete_pair, _match_pair, _run, _use_kernels
 
 
 def _unmatch_pair(suitor, reviewer):
@@ -10,7 +12,7 @@ def _unmatch_pair(suitor, reviewer):
     reviewer._unmatch()
 
 
-def stable_marriage(suitors, reviewers, optimal="suitor"):
+def stable_marriage(suitors, reviewers, optimal="suitor", backend="python"):
     """An extended version of the original Gale-Shapley algorithm.
 
     This version makes use of the inherent structures of SM instances. A
@@ -30,6 +32,10 @@ def stable_marriage(suitors, reviewers, optimal="suitor"):
     optimal : str, optional
         Which party the matching should be optimised for. Must be one of
         ``"suitor"`` and ``"reviewer"``. Defaults to the former.
+    backend : str, optional
+        How the algorithm is run. With ``"numba"``, it runs as a compiled
+        kernel over integer arrays if numba is installed, and in pure
+        Python otherwise. Defaults to ``"python"``.
 
     Returns
     -------
@@ -38,14 +44,51 @@ def stable_marriage(suitors, reviewers, optimal="suitor"):
         ``suitors``, and the values are their match in ``reviewers``.
     """
 
+    if _use_kernels(backend):
+        return stable_marriage_jit(suitors, reviewers, optimal)
+
+    return _run(stable_marriage_iter(suitors, reviewers, optimal))
+
+
+def stable_marriage_iter(
+    suitors, reviewers, optimal="suitor", chunk=1000, state=None
+):
+    """Solve an instance of SM step by step, as in ``stable_marriage``.
+
+    This is a generator that yields the ``Progress`` of the algorithm
+    after every ``chunk`` proposals, and returns the matching once it
+    has finished. The players are changed as the algorithm goes on, so
+    they are only left as they would be after ``stable_marriage`` if the
+    generator is run to the end.
+
+    If a dictionary is passed as ``state``, the algorithm keeps its
+    worklist in it, so it can be saved whenever the algorithm yields.
+    If the dictionary holds a saved state already, the algorithm carries
+    on from there. See ``matching.checkpoint``.
+    """
+
     if optimal.lower() == "reviewer":
         suitors, reviewers = reviewers, suitors
 
-    free_suitors = suitors[:]
+    state = {} if state is None else state
+    if "proposals" in state:
+        free_suitors = state["free"]
+        free_suitors.append(state["current"])
+        proposals = state["proposals"] - 1
+    else:
+        free_suitors = suitors[:]
+        proposals = 0
+        state["free"] = free_suitors
+
     while free_suitors:
         suitor = free_suitors.pop()
         reviewer = suitor.get_favourite()
 
+        proposals += 1
+        if proposals % chunk == 0:
+            state.update(current=suitor, proposals=proposals)
+            yield Progress(len(free_suitors) + 1, proposals)
+
         if reviewer.matching:
             current_match = reviewer.matching
             _unmatch_pair(current_match, reviewer)
@@ -61,3 +104,51 @@ def stable_marriage(suitors, reviewers, optimal="suitor"):
         suitors, reviewers = reviewers, suitors
 
     return {s: s.matching for s in suitors}
+
+
+def stable_marriage_jit(suitors, reviewers, optimal="suitor"):
+    """Solve an instance of SM with the compiled kernel of
+    ``stable_marriage``.
+
+    The suitors propose in the same order as they do in
+    ``stable_marriage``, and the players are left as they would be by
+    it: each reviewer forgets the suitors it ranks below its match. See
+    ``matching.algorithms.kernels``.
+    """
+
+    import numpy as np
+
+    from . import kernels
+    from .arrays import _get_ranks, _prefs_to_arrays
+
+    if optimal.lower() == "reviewer":
+        suitors, reviewers = reviewers, suitors
+
+    suitor_index = {suitor: i for i, suitor in enumerate(suitors)}
+    reviewer_index = {reviewer: i for i, reviewer in enumerate(reviewers)}
+    indptr, choices = _prefs_to_arrays(suitors, reviewer_index)
+    reviewer_indptr, reviewer_choices = _prefs_to_arrays(
+        reviewers, suitor_index
+    )
+    owners = np.repeat(np.arange(len(suitors)), np.diff(indptr))
+    ranks = _get_ranks(reviewer_indptr, reviewer_choices, choices, owners)
+
+    holders, holder_ranks = kernels.stable_marriage_kernel(
+        indptr, choices, ranks, len(reviewers)
+    )
+
+    keep, edges = (ranks <= holder_ranks[choices]).tolist(), indptr.tolist()
+    for suitor, start, end in zip(suitors, edges, edges[1:]):
+        suitor.prefs = list(itertools.compress(suitor.prefs, keep[start:end]))
+
+    for reviewer, holder, rank in zip(
+        reviewers, holders.tolist(), holder_ranks.tolist()
+    ):
+        if holder >= 0:
+            reviewer.prefs = reviewer.prefs[: rank + 1]
+            _match_pair(suitors[holder], reviewer)
+
+    if optimal.lower() == "reviewer":
+        suitors, reviewers = reviewers, suitors
+
+    return {s: s.matching for s in suitors}
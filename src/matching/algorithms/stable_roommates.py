@@ -1,20 +1,44 @@
 """ Functions for the SR algorithm. """
 
+import itertools
 import warnings
 
 from matching.exceptions import NoStableMatchingWarning
 
-from .util import _delete_pair
+from .util import Progress, _delete_pair, _run, _use_kernels
 
 
 def first_phase(players):
     """Make one-way proposals and forget unpreferable pairs."""
 
-    free_players = players[:]
+    players, _ = _run(first_phase_iter(players))
+    return players
+
+
+def first_phase_iter(players, chunk=1000, state=None):
+    """Make one-way proposals and forget unpreferable pairs, yielding the
+    progress of the phase after every ``chunk`` proposals. Return the
+    players and the number of proposals made."""
+
+    state = {} if state is None else state
+    if "proposals" in state:
+        free_players = state["free"]
+        free_players.append(state["current"])
+        proposals = state["proposals"] - 1
+    else:
+        free_players = players[:]
+        proposals = 0
+        state["free"] = free_players
+
     while free_players:
         player = free_players.pop()
         favourite = player.get_favourite()
 
+        proposals += 1
+        if proposals % chunk == 0:
+            state.update(current=player, proposals=proposals)
+            yield Progress(len(free_players) + 1, proposals)
+
         current = favourite.matching
         if current is not None:
             favourite._unmatch()
@@ -27,7 +51,7 @@ def first_phase(players):
             if not successor.prefs and successor in free_players:
                 free_players.remove(successor)
 
-    return players
+    return players, proposals
 
 
 def locate_all_or_nothing_cycle(player):
@@ -88,8 +112,31 @@ def get_pairs_to_delete(cycle):
 def second_phase(players):
     """Locate and remove all-or-nothing cycles from the game."""
 
+    return _run(second_phase_iter(players))
+
+
+def second_phase_iter(players, chunk=1000, proposals=0, state=None):
+    """Locate and remove all-or-nothing cycles from the game, yielding the
+    progress of the phase after every ``chunk`` cycles.
+
+    Each cycle removed counts as a proposal, on top of the number of
+    ``proposals`` already made, and the players that still have more
+    than one preference count as free. The cycles are found from the
+    preferences alone, so only the number of proposals is kept in
+    ``state``.
+    """
+
+    state = {} if state is None else state
+    if "proposals" in state:
+        proposals = state["proposals"] - 1
+
     player = next(p for p in players if len(p.prefs) > 1)
     while True:
+        proposals += 1
+        if proposals % chunk == 0:
+            state["proposals"] = proposals
+            yield Progress(sum(len(p.prefs) > 1 for p in players), proposals)
+
         cycle = locate_all_or_nothing_cycle(player)
         pairs = get_pairs_to_delete(cycle)
         for player, other in pairs:
@@ -117,7 +164,7 @@ def second_phase(players):
     return players
 
 
-def stable_roommates(players):
+def stable_roommates(players, backend="python"):
     """Irving's algorithm for finding a stable solution to SR.
 
     The algorithm :cite:`Irv85` finds stable solutions to instances of
@@ -127,6 +174,10 @@ def stable_roommates(players):
     ----------
     players : list of Player
         The players in the game. Each must rank all other players.
+    backend : str, optional
+        How the algorithm is run. With ``"numba"``, both phases run as
+        compiled kernels over integer arrays if numba is installed, and
+        in pure Python otherwise. Defaults to ``"python"``.
 
     Returns
     -------
@@ -135,18 +186,103 @@ def stable_roommates(players):
         the members of ``players``.
     """
 
-    players = first_phase(players)
+    if _use_kernels(backend):
+        return stable_roommates_jit(players)
+
+    return _run(stable_roommates_iter(players))
+
+
+def stable_roommates_iter(players, chunk=1000, state=None):
+    """Solve an instance of SR step by step, as in ``stable_roommates``.
+
+    This is a generator that yields the ``Progress`` of the algorithm
+    after every ``chunk`` proposals in the first phase and every
+    ``chunk`` cycles removed in the second, and returns the matching
+    once it has finished. The players are changed as the algorithm goes
+    on, so they are only left as they would be after
+    ``stable_roommates`` if the generator is run to the end.
+
+    If a dictionary is passed as ``state``, the algorithm keeps the
+    phase it is in and its worklist in it, so they can be saved whenever
+    it yields. If the dictionary holds a saved state already, the
+    algorithm carries on from there. See ``matching.checkpoint``.
+    """
+
+    state = {} if state is None else state
+    proposals = 0
+    if state.setdefault("phase", 1) == 1:
+        players, proposals = yield from first_phase_iter(players, chunk, state)
+
+        if any(p.prefs == [] for p in players):
+            warnings.warn(
+                NoStableMatchingWarning(
+                    "The following players have been rejected by all "
+                    "others, emptying their preference list: "
+                    f"{[p for p in players if not p.prefs]}"
+                )
+            )
+
+        state.clear()
+        state["phase"] = 2
+
+    if any(len(p.prefs) > 1 for p in players):
+        players = yield from second_phase_iter(
+            players, chunk, proposals, state
+        )
+
+    return {player: player.matching for player in players}
+
+
+def stable_roommates_jit(players):
+    """Irving's algorithm for SR, with both of its phases run by compiled
+    kernels over the preferences of the players.
+
+    The phases take the same steps as ``first_phase`` and
+    ``second_phase``, and give the same warnings, and the players are
+    left as they would be by ``stable_roommates``. See
+    ``matching.algorithms.kernels``.
+    """
+
+    import numpy as np
+
+    from . import kernels
+    from .arrays import _get_ranks, _prefs_to_arrays
+
+    index = {player: i for i, player in enumerate(players)}
+    indptr, choices = _prefs_to_arrays(players, index)
+    owners = np.repeat(np.arange(len(players)), np.diff(indptr))
+    mirror = indptr[choices] + _get_ranks(indptr, choices, choices, owners)
 
-    if any(p.prefs == [] for p in players):
+    alive, partners, degrees, heads, tails = kernels.first_phase_kernel(
+        indptr, choices, mirror, owners
+    )
+
+    if not degrees.all():
         warnings.warn(
             NoStableMatchingWarning(
-                "The following players have been rejected by all others, "
-                "emptying their preference list: "
-                f"{[p for p in players if not p.prefs]}"
+                "The following players have been rejected by all "
+                "others, emptying their preference list: "
+                f"{[players[i] for i in np.flatnonzero(degrees == 0)]}"
             )
         )
 
-    if any(len(p.prefs) > 1 for p in players):
-        players = second_phase(players)
+    if (degrees > 1).any():
+        partners, emptied = kernels.second_phase_kernel(
+            indptr, choices, mirror, owners, alive, degrees, heads, tails
+        )
+        if emptied:
+            warnings.warn(
+                NoStableMatchingWarning(
+                    "The following players have emptied their preferences: "
+                    f"{[players[i] for i in np.flatnonzero(degrees == 0)]}"
+                )
+            )
+
+    keep, edges = alive.tolist(), indptr.tolist()
+    for player, start, end, partner in zip(
+        players, edges, edges[1:], partners.tolist()
+    ):
+        player.prefs = list(itertools.compress(player.prefs, keep[start:end]))
+        player.matching = players[partner] if partner >= 0 else None
 
     return {player: player.matching for player in players}
@@ -1,6 +1,16 @@
 """ Functions for the SA algorithm. """
 
-from .util import _delete_pair, _match_pair
+import heapq
+import itertools
+
+from .util import (
+    Progress,
+    _check_engine,
+    _delete_pair,
+    _match_pair,
+    _run,
+    _use_kernels,
+)
 
 
 def unmatch_pair(student, project):
@@ -10,7 +20,37 @@ def unmatch_pair(student, project):
     project._unmatch(student)
 
 
-def student_allocation(students, projects, supervisors, optimal="student"):
+def _is_deleted(student, project, ranks, cutoffs):
+    """Check whether a student-project pair has been deleted, either by the
+    project or by its supervisor."""
+
+    supervisor = project.supervisor
+    return (
+        ranks[project][student] > cutoffs[project]
+        or ranks[supervisor][student] > cutoffs[supervisor]
+    )
+
+
+def _get_worst(heap, owners, stamps):
+    """Get the worst current match in a heap of matches and their rank.
+
+    Entries for matches that have since been broken are discarded.
+    """
+
+    while stamps[owners[heap[0][1]]] != heap[0][1]:
+        heapq.heappop(heap)
+
+    return owners[heap[0][1]], -heap[0][0]
+
+
+def student_allocation(
+    students,
+    projects,
+    supervisors,
+    optimal="student",
+    engine="sequential",
+    backend="python",
+):
     """Solve an instance of SA by treating it as a bi-level HR instance.
 
     A unique, stable and optimal matching is found for the given set of
@@ -33,6 +73,17 @@ def student_allocation(students, projects, supervisors, optimal="student"):
     optimal : str, optional
         Which party the matching should be optimised for. Must be one of
         ``"student"`` and ``"supervisor"``. Defaults to the former.
+    engine : str, optional
+        How the matching is found. With ``"sequential"`` (the default),
+        one player proposes at a time. With ``"rounds"``, every free
+        student proposes at once in rounds of array operations. The
+        latter only finds student-optimal matchings, and is much faster
+        on large instances. Both find the same matching.
+    backend : str, optional
+        How the sequential engine is run. With ``"numba"``, the
+        student-optimal algorithm runs as a compiled kernel over integer
+        arrays if numba is installed, and in pure Python otherwise.
+        Defaults to ``"python"``.
 
     Returns
     -------
@@ -41,12 +92,54 @@ def student_allocation(students, projects, supervisors, optimal="student"):
         ``projects`` and their student matches are the values.
     """
 
+    _check_engine(engine, optimal, "student")
+    compiled = _use_kernels(backend)
+    if engine == "rounds":
+        return student_optimal_rounds(students, projects)
+    if optimal == "student" and compiled:
+        return student_optimal_jit(students, projects)
     if optimal == "student":
         return student_optimal(students, projects)
     if optimal == "supervisor":
         return supervisor_optimal(projects, supervisors)
 
 
+def student_allocation_iter(
+    students,
+    projects,
+    supervisors,
+    optimal="student",
+    chunk=1000,
+    state=None,
+    engine="sequential",
+):
+    """Solve an instance of SA step by step, as in
+    ``student_allocation``.
+
+    This is a generator that yields the ``Progress`` of the algorithm
+    after every ``chunk`` proposals, and returns the matching once it
+    has finished. The players are changed as the algorithm goes on, so
+    they are only left as they would be after ``student_allocation`` if
+    the generator is run to the end.
+
+    If a dictionary is passed as ``state``, the algorithm keeps its
+    worklist and cursors in it, so they can be saved whenever it yields.
+    If the dictionary holds a saved state already, the algorithm carries
+    on from there. See ``matching.checkpoint``.
+
+    With the ``"rounds"`` engine, the progress is yielded after every
+    round rather than every ``chunk`` proposals, and no state is kept.
+    """
+
+    _check_engine(engine, optimal, "student", state)
+    if engine == "rounds":
+        return student_optimal_rounds_iter(students, projects)
+    if optimal == "student":
+        return student_optimal_iter(students, projects, chunk, state)
+    if optimal == "supervisor":
+        return supervisor_optimal_iter(projects, supervisors, chunk, state)
+
+
 def student_optimal(students, projects):
     """Solve the instance of SA to be student-optimal.
 
@@ -79,51 +172,505 @@ def student_optimal(students, projects):
            acceptable, delete the pair :math:`(p', t)` from the game.
 
         5. Go to 1 until there are no such students left, then end.
+
+    The matches of each project and supervisor are kept in heaps of
+    their ranks, and each of them has a cutoff rank beyond which its
+    pairs have been deleted. Students keep a cursor on their preference
+    list and skip deleted pairs as they reach them. The deleted pairs
+    are removed from the preference lists once the algorithm ends.
+    """
+
+    return _run(student_optimal_iter(students, projects))
+
+
+def student_optimal_iter(students, projects, chunk=1000, state=None):
+    """Solve the instance of SA to be student-optimal, yielding the
+    progress of the algorithm after every ``chunk`` proposals.
+
+    The heaps of matches are made again from the matches of the
+    students when the algorithm carries on from a saved ``state``.
     """
 
-    free_students = students[:]
+    ranked = [project for student in students for project in student.prefs]
+    projects_ = list(dict.fromkeys(projects + ranked))
+    supervisors = list(dict.fromkeys(p.supervisor for p in projects_))
+    players = projects_ + supervisors
+    ranks = {
+        player: {student: i for i, student in enumerate(player.prefs)}
+        for player in players
+    }
+    heaps = {player: [] for player in players}
+    sizes = dict.fromkeys(players, 0)
+
+    stamps = dict.fromkeys(students)
+    owners = []
+
+    state = {} if state is None else state
+    if "proposals" in state:
+        free_students, cursors = state["free"], state["cursors"]
+        cutoffs = state["cutoffs"]
+        free_students.append(state["current"])
+        proposals = state["proposals"] - 1
+        for student in students:
+            project = student.matching
+            if project is not None:
+                stamps[student] = len(owners)
+                owners.append(student)
+                for player in (project, project.supervisor):
+                    entry = (-ranks[player][student], stamps[student])
+                    heaps[player].append(entry)
+                    sizes[player] += 1
+
+        for heap in heaps.values():
+            heapq.heapify(heap)
+    else:
+        cutoffs = {
+            player: len(player.prefs) - 1 if player.capacity > 0 else -1
+            for player in players
+        }
+        cursors = dict.fromkeys(students, 0)
+        free_students = students[:]
+        proposals = 0
+        state.update(free=free_students, cursors=cursors, cutoffs=cutoffs)
+
     while free_students:
         student = free_students.pop()
-        project = student.get_favourite()
+        prefs, cursor = student.prefs, cursors[student]
+        while cursor < len(prefs) and _is_deleted(
+            student, prefs[cursor], ranks, cutoffs
+        ):
+            cursor += 1
+
+        cursors[student] = cursor
+        if cursor == len(prefs):
+            continue
+
+        proposals += 1
+        if proposals % chunk == 0:
+            state.update(current=student, proposals=proposals)
+            yield Progress(len(free_students) + 1, proposals)
+
+        project = prefs[cursor]
         supervisor = project.supervisor
 
-        _match_pair(student, project)
-
-        if len(project.matching) > project.capacity:
-            worst = project.get_worst_match()
-            unmatch_pair(worst, project)
+        stamps[student] = len(owners)
+        owners.append(student)
+        student._match(project)
+        for player in (project, supervisor):
+            entry = (-ranks[player][student], stamps[student])
+            heapq.heappush(heaps[player], entry)
+            sizes[player] += 1
+
+        worst = None
+        if sizes[project] > project.capacity:
+            worst, _ = _get_worst(heaps[project], owners, stamps)
+        elif sizes[supervisor] > supervisor.capacity:
+            worst, _ = _get_worst(heaps[supervisor], owners, stamps)
+
+        if worst is not None:
+            sizes[worst.matching] -= 1
+            sizes[worst.matching.supervisor] -= 1
+            stamps[worst] = None
+            worst._unmatch()
             free_students.append(worst)
 
-        elif len(supervisor.matching) > supervisor.capacity:
-            worst = supervisor.get_worst_match()
-            worst_project = worst.matching
-            unmatch_pair(worst, worst_project)
-            free_students.append(worst)
+        for player in (project, supervisor):
+            if sizes[player] == player.capacity:
+                _, rank = _get_worst(heaps[player], owners, stamps)
+                cutoffs[player] = min(cutoffs[player], rank)
+
+    forgotten = set()
+    for project in projects_:
+        supervisor = project.supervisor
+        prefs, deleted = [], []
+        for student in project.prefs:
+            if _is_deleted(student, project, ranks, cutoffs):
+                deleted.append(student)
+            else:
+                prefs.append(student)
+
+        project.prefs = prefs
+        supervisor._update_counts(deleted, -1)
+        forgotten.update((supervisor, student) for student in deleted)
+
+    for supervisor in supervisors:
+        supervisor.prefs = [
+            student
+            for student in supervisor.prefs
+            if supervisor._project_counts[student]
+            or (supervisor, student) not in forgotten
+        ]
+
+    for student in students:
+        student.prefs = [
+            project
+            for project in student.prefs
+            if not _is_deleted(student, project, ranks, cutoffs)
+        ]
+
+    for player in players:
+        player.matching = []
 
-        if len(project.matching) == project.capacity:
-            successors = project.get_successors()
-            for successor in successors:
-                _delete_pair(project, successor)
-                if not successor.prefs:
-                    free_students.remove(successor)
-
-        if len(supervisor.matching) == supervisor.capacity:
-            successors = supervisor.get_successors()
-            for successor in successors:
-                supervisor_projects = [
-                    project
-                    for project in supervisor.projects
-                    if project in successor.prefs
-                ]
-
-                for project in supervisor_projects:
-                    _delete_pair(project, successor)
-                if not successor.prefs:
-                    free_students.remove(successor)
+    for student in students:
+        if student.matching is not None:
+            student.matching.matching.append(student)
+            student.matching.supervisor.matching.append(student)
+
+    for player in players:
+        player.matching.sort(key=ranks[player].get)
+
+    return {p: p.matching for p in projects}
+
+
+def student_optimal_rounds(students, projects):
+    """Solve the instance of SA to be student-optimal in rounds.
+
+    In each round, every free student proposes to the next project on
+    their preference list that has not been deleted. Each project keeps
+    the best ``capacity`` of its current matches and new applicants, and
+    then each supervisor keeps the best ``capacity`` of those kept by
+    its projects. The rest are rejected. Since a project ranks students
+    in the same order as its supervisor, this keeps the same students as
+    taking the proposals one at a time would.
+
+    At the end of each round, the cutoffs of the projects and
+    supervisors that are full are updated as in ``student_optimal``, and
+    the deleted pairs are removed from the preference lists once the
+    rounds end. The rounds are carried out with array operations, and
+    the players are left as they would be by ``student_optimal``.
+    """
+
+    return _run(student_optimal_rounds_iter(students, projects))
+
+
+def student_optimal_rounds_iter(students, projects):
+    """Solve the instance of SA to be student-optimal in rounds,
+    yielding the progress of the algorithm after every round.
+
+    Each supervisor has a block of slots holding its matches in order of
+    preference, so that only the supervisors whose projects are proposed
+    to in a round are looked at in that round.
+    """
+
+    import numpy as np
+
+    from .arrays import _get_ranges, _get_slots, _keep_best
+
+    arrays = _index(students, projects)
+    indptr, choices, offers = (
+        arrays["indptr"],
+        arrays["choices"],
+        arrays["offers"],
+    )
+    owners = arrays["owners"]
+    project_ranks = arrays["project_ranks"]
+    supervisor_ranks = arrays["supervisor_ranks"]
+    project_capacities = arrays["project_capacities"]
+    supervisor_capacities = arrays["supervisor_capacities"]
+    project_cutoffs, supervisor_cutoffs = _get_cutoffs(arrays)
+
+    bounds = _get_slots(
+        supervisor_capacities, np.diff(arrays["supervisor_indptr"])
+    )
+    slots = np.full(bounds[-1], -1, dtype=np.int64)
+
+    degrees = np.diff(indptr)
+    cursors = np.zeros(len(students), dtype=np.int64)
+    free = np.flatnonzero(degrees > 0)
+    proposals = 0
+    while True:
+        while free.size:
+            entries = indptr[free] + cursors[free]
+            deleted = (
+                project_ranks[entries] > project_cutoffs[choices[entries]]
+            ) | (
+                supervisor_ranks[entries]
+                > supervisor_cutoffs[offers[choices[entries]]]
+            )
+            if not deleted.any():
+                break
+
+            cursors[free[deleted]] += 1
+            free = free[cursors[free] < degrees[free]]
+
+        if not free.size:
+            break
+
+        proposals += free.size
+        proposed = np.unique(offers[choices[entries]])
+        blocks = _get_ranges(bounds[proposed], bounds[proposed + 1])
+        held = slots[blocks]
+
+        entries = np.concatenate((entries, held[held >= 0]))
+        kept, _, project_rejected = _keep_best(
+            choices[entries], project_ranks[entries], project_capacities
+        )
+        rejected = entries[project_rejected]
+
+        entries = entries[kept]
+        groups = offers[choices[entries]]
+        kept, places, supervisor_rejected = _keep_best(
+            groups, supervisor_ranks[entries], supervisor_capacities
+        )
+        rejected = np.concatenate((rejected, entries[supervisor_rejected]))
+
+        slots[blocks] = -1
+        slots[bounds[groups[kept]] + places] = entries[kept]
+        _update_cutoffs(
+            entries[kept],
+            choices,
+            project_ranks,
+            project_capacities,
+            project_cutoffs,
+        )
+        _update_cutoffs(
+            entries[kept],
+            offers[choices],
+            supervisor_ranks,
+            supervisor_capacities,
+            supervisor_cutoffs,
+        )
+
+        rejected = owners[rejected]
+        cursors[rejected] += 1
+        free = rejected[cursors[rejected] < degrees[rejected]]
+        if free.size:
+            yield Progress(free.size, proposals)
+
+    return _set_student_optimal(
+        students,
+        projects,
+        arrays,
+        project_cutoffs,
+        supervisor_cutoffs,
+        slots[slots >= 0],
+    )
+
+
+def student_optimal_jit(students, projects):
+    """Solve the instance of SA to be student-optimal with the compiled
+    kernel of ``student_optimal``.
+
+    The matches of each project and supervisor are kept in heaps of
+    their ranks, as they are by ``student_optimal``, and the players are
+    left as they would be by it. See ``matching.algorithms.kernels``.
+    """
+
+    import numpy as np
+
+    from . import kernels
+    from .arrays import _get_slots
+
+    arrays = _index(students, projects)
+    project_capacities = arrays["project_capacities"]
+    supervisor_capacities = arrays["supervisor_capacities"]
+    project_cutoffs, supervisor_cutoffs = _get_cutoffs(arrays)
+
+    matches = kernels.student_optimal_kernel(
+        arrays["indptr"],
+        arrays["choices"],
+        arrays["project_ranks"],
+        arrays["supervisor_ranks"],
+        arrays["offers"],
+        project_capacities,
+        supervisor_capacities,
+        _get_slots(project_capacities + 1, np.diff(arrays["project_indptr"])),
+        _get_slots(
+            supervisor_capacities + 1, np.diff(arrays["supervisor_indptr"])
+        ),
+        project_cutoffs,
+        supervisor_cutoffs,
+    )
+
+    return _set_student_optimal(
+        students,
+        projects,
+        arrays,
+        project_cutoffs,
+        supervisor_cutoffs,
+        matches[matches >= 0],
+    )
+
+
+def _index(students, projects):
+    """Get the arrays describing an instance of SA, with the preferences
+    of the students in compressed sparse row form and the ranks that
+    each project they rank, and its supervisor, give them.
+
+    The projects and supervisors are taken as ``student_optimal`` takes
+    them, and are kept alongside the arrays.
+    """
+
+    import numpy as np
+
+    from .arrays import _get_ranks, _prefs_to_arrays
+
+    ranked = [project for student in students for project in student.prefs]
+    projects_ = list(dict.fromkeys(projects + ranked))
+    supervisors = list(dict.fromkeys(p.supervisor for p in projects_))
+
+    student_index = {student: i for i, student in enumerate(students)}
+    project_index = {project: i for i, project in enumerate(projects_)}
+    supervisor_index = {sup: i for i, sup in enumerate(supervisors)}
+
+    indptr, choices = _prefs_to_arrays(students, project_index)
+    project_indptr, project_choices = _prefs_to_arrays(
+        projects_, student_index
+    )
+    supervisor_indptr, supervisor_choices = _prefs_to_arrays(
+        supervisors, student_index
+    )
+    offers = np.array(
+        [supervisor_index[p.supervisor] for p in projects_], dtype=np.int64
+    )
+    owners = np.repeat(np.arange(len(students)), np.diff(indptr))
+
+    return {
+        "projects": projects_,
+        "supervisors": supervisors,
+        "indptr": indptr,
+        "choices": choices,
+        "owners": owners,
+        "offers": offers,
+        "project_indptr": project_indptr,
+        "project_choices": project_choices,
+        "supervisor_indptr": supervisor_indptr,
+        "supervisor_choices": supervisor_choices,
+        "project_ranks": _get_ranks(
+            project_indptr, project_choices, choices, owners
+        ),
+        "supervisor_ranks": _get_ranks(
+            supervisor_indptr, supervisor_choices, offers[choices], owners
+        ),
+        "project_capacities": np.array(
+            [project.capacity for project in projects_], dtype=np.int64
+        ),
+        "supervisor_capacities": np.array(
+            [supervisor.capacity for supervisor in supervisors],
+            dtype=np.int64,
+        ),
+    }
+
+
+def _get_cutoffs(arrays):
+    """Get the starting cutoffs of the projects and supervisors: the end
+    of their preferences, or -1 if they have no capacity."""
+
+    import numpy as np
+
+    return tuple(
+        np.where(
+            arrays[f"{party}_capacities"] > 0,
+            np.diff(arrays[f"{party}_indptr"]) - 1,
+            -1,
+        )
+        for party in ("project", "supervisor")
+    )
+
+
+def _set_student_optimal(
+    students, projects, arrays, project_cutoffs, supervisor_cutoffs, held
+):
+    """Update the players from the entries of the student-optimal
+    matching and the final cutoffs, as ``student_optimal`` leaves
+    them."""
+
+    import numpy as np
+
+    from .arrays import _get_ranks
+
+    projects_, supervisors = arrays["projects"], arrays["supervisors"]
+    choices, offers = arrays["choices"], arrays["offers"]
+    project_ranks = arrays["project_ranks"]
+    supervisor_ranks = arrays["supervisor_ranks"]
+    project_indptr = arrays["project_indptr"]
+
+    project_owners = np.repeat(
+        np.arange(len(projects_)), np.diff(project_indptr)
+    )
+    project_deleted = (
+        np.arange(len(arrays["project_choices"]))
+        - project_indptr[project_owners]
+        > project_cutoffs[project_owners]
+    ) | (
+        _get_ranks(
+            arrays["supervisor_indptr"],
+            arrays["supervisor_choices"],
+            offers[project_owners],
+            arrays["project_choices"],
+        )
+        > supervisor_cutoffs[offers[project_owners]]
+    )
+
+    forgotten = set()
+    deletions, edges = project_deleted.tolist(), project_indptr.tolist()
+    for project, start, end in zip(projects_, edges, edges[1:]):
+        supervisor = project.supervisor
+        prefs, deleted = [], []
+        for student, is_deleted in zip(project.prefs, deletions[start:end]):
+            (deleted if is_deleted else prefs).append(student)
+
+        project.prefs = prefs
+        supervisor._update_counts(deleted, -1)
+        forgotten.update((supervisor, student) for student in deleted)
+
+    for supervisor in supervisors:
+        supervisor.prefs = [
+            student
+            for student in supervisor.prefs
+            if supervisor._project_counts[student]
+            or (supervisor, student) not in forgotten
+        ]
+
+    keep = (
+        (project_ranks <= project_cutoffs[choices])
+        & (supervisor_ranks <= supervisor_cutoffs[offers[choices]])
+    ).tolist()
+    edges = arrays["indptr"].tolist()
+    for student, start, end in zip(students, edges, edges[1:]):
+        student.prefs = list(
+            itertools.compress(student.prefs, keep[start:end])
+        )
+
+    for player in projects_ + supervisors:
+        player.matching = []
+
+    owners = arrays["owners"]
+    by_project = held[np.lexsort((project_ranks[held], choices[held]))]
+    for student, project in zip(
+        owners[by_project].tolist(), choices[by_project].tolist()
+    ):
+        students[student].matching = projects_[project]
+        projects_[project].matching.append(students[student])
+
+    groups = offers[choices[held]]
+    order = np.lexsort((supervisor_ranks[held], groups))
+    for student, supervisor in zip(
+        owners[held[order]].tolist(), groups[order].tolist()
+    ):
+        supervisors[supervisor].matching.append(students[student])
 
     return {p: p.matching for p in projects}
 
 
+def _update_cutoffs(entries, groups, ranks, capacities, cutoffs):
+    """Lower the cutoffs of the players that are full to the rank of
+    their worst match, given the entries of all the matches of the
+    players that have changed."""
+
+    import numpy as np
+
+    groups, ranks = groups[entries], ranks[entries]
+    order = np.lexsort((ranks, groups))
+    players, starts, counts = np.unique(
+        groups[order], return_index=True, return_counts=True
+    )
+    worst = ranks[order][starts + counts - 1]
+
+    full = counts == capacities[players]
+    cutoffs[players[full]] = np.minimum(cutoffs[players[full]], worst[full])
+
+
 def supervisor_optimal(projects, supervisors):
     """Solve the instance of SA to be supervisor-optimal.
 
@@ -151,11 +698,33 @@ def supervisor_optimal(projects, supervisors):
         4. Go to 1 until there are no such supervisors, then end.
     """
 
-    free_supervisors = supervisors[:]
+    return _run(supervisor_optimal_iter(projects, supervisors))
+
+
+def supervisor_optimal_iter(projects, supervisors, chunk=1000, state=None):
+    """Solve the instance of SA to be supervisor-optimal, yielding the
+    progress of the algorithm after every ``chunk`` proposals.
+
+    The free supervisors are found again after every proposal, so only
+    the number of proposals is kept in ``state``.
+    """
+
+    free_supervisors = [
+        supervisor
+        for supervisor in supervisors
+        if supervisor.get_favourite() is not None
+    ]
+    state = {} if state is None else state
+    proposals = state["proposals"] - 1 if "proposals" in state else 0
     while free_supervisors:
         supervisor = free_supervisors.pop()
         student, project = supervisor.get_favourite()
 
+        proposals += 1
+        if proposals % chunk == 0:
+            state.update(current=supervisor, proposals=proposals)
+            yield Progress(len(free_supervisors) + 1, proposals)
+
         if student.matching:
             curr_match = student.matching
             unmatch_pair(student, curr_match)
@@ -1,5 +1,30 @@
 """ Useful functions for the running of the various core algorithms. """
 
+import collections
+import importlib.util
+
+Progress = collections.namedtuple("Progress", ("free", "proposals"))
+Progress.__doc__ = """The progress of an algorithm that is yet to finish.
+
+Parameters
+----------
+free : int
+    The number of players yet to be matched or rejected by everyone.
+proposals : int
+    The number of proposals made so far.
+"""
+
+
+def _run(steps):
+    """Run the steps of an algorithm to the end, and return the matching
+    that it finds."""
+
+    while True:
+        try:
+            next(steps)
+        except StopIteration as stop:
+            return stop.value
+
 
 def _delete_pair(player, other):
     """Make a player forget another (and vice versa), deleting the pair from
@@ -14,3 +39,42 @@ def _match_pair(player, other):
 
     player._match(other)
     other._match(player)
+
+
+def _check_engine(engine, optimal, proposer, state=None):
+    """Check that the engine of an algorithm is known, and that it can
+    find a matching that is optimal for ``optimal``."""
+
+    if engine not in ("sequential", "rounds"):
+        raise ValueError(
+            f'The engine must be "sequential" or "rounds", not {engine!r}.'
+        )
+
+    if engine == "rounds" and optimal != proposer:
+        raise ValueError(
+            f'The "rounds" engine only finds {proposer}-optimal matchings.'
+        )
+
+    if engine == "rounds" and state:
+        raise ValueError(
+            "A solve saved part of the way through can only be taken up by "
+            'the "sequential" engine.'
+        )
+
+
+def _use_kernels(backend):
+    """Check that the backend of an algorithm is known, and whether its
+    compiled kernels can be used."""
+
+    if backend not in ("python", "numba"):
+        raise ValueError(
+            f'The backend must be "python" or "numba", not {backend!r}.'
+        )
+
+    if backend != "numba" or importlib.util.find_spec("numba") is None:
+        return False
+
+    from . import kernels
+
+    kernels._compile()
+    return True
@@ -1,12 +1,15 @@
 """Abstract base classes for inheritance."""
 
 import abc
-import warnings
+import time
+from collections.abc import Mapping
 
 from matching.exceptions import (
     PlayerExcludedWarning,
     PreferencesChangedWarning,
+    SolveInterruptedError,
 )
+from matching.validation import check_mode, report_issue
 
 
 class BasePlayer:
@@ -43,6 +46,21 @@ class BasePlayer:
     def __repr__(self):
         return str(self.name)
 
+    def __reduce__(self):
+        from matching.pickling import from_state, get_state
+
+        return from_state, get_state(self)
+
+    def __copy__(self):
+        from matching.pickling import shallow_copy
+
+        return shallow_copy(self)
+
+    def __deepcopy__(self, memo):
+        from matching.pickling import deep_copy
+
+        return deep_copy(self, memo)
+
     def _forget(self, other):
         """Forget another player by removing them from the player's preference
         list."""
@@ -120,10 +138,331 @@ class BaseGame(metaclass=abc.ABCMeta):
         Otherwise, ``None``.
     """
 
+    _player_classes = {}
+    _prefs_parties = {}
+    _matching_parties = ()
+    _matching_keys = None
+    _matching_class = None
+
     def __init__(self, clean=False):
         self.matching = None
         self.blocking_pairs = None
         self.clean = clean
+        self._indexes = {}
+        self._checked = None
+        self._checkpoint = None
+        self._solving = None
+
+    @classmethod
+    def _from_players(cls, clean=False, **parties):
+        """Create an instance from some players without copying or
+        checking them."""
+
+        game = cls.__new__(cls)
+        BaseGame.__init__(game, clean)
+        for party, players in parties.items():
+            setattr(game, party, players)
+
+        return game
+
+    def __getstate__(self):
+        from matching.pickling import get_state
+
+        return get_state(self)
+
+    def __setstate__(self, state):
+        from matching.pickling import from_state
+
+        from_state(*state, obj=self)
+
+    def __copy__(self):
+        from matching.pickling import shallow_copy
+
+        return shallow_copy(self)
+
+    def __deepcopy__(self, memo):
+        from matching.pickling import deep_copy
+
+        return deep_copy(self, memo)
+
+    def _validate(self, validate):
+        """Check the inputs of the game in the way given by ``validate``.
+
+        This must be one of ``"full"``, ``"fast"`` and ``"none"``. See
+        ``matching.validation`` for what each of them does.
+        """
+
+        check_mode(validate)
+        if validate == "full":
+            self.check_inputs()
+        elif validate == "fast":
+            self.verify_inputs()
+
+    def _get_index(self, party):
+        """Get a dictionary of the players in a party keyed by name.
+
+        The index is made the first time it is needed and is kept up to
+        date as players are removed. It is made again if the party has
+        been replaced since.
+        """
+
+        players = getattr(self, party)
+        index = self._indexes.get(party)
+        if index is None or index[0] is not players:
+            index = (players, {player.name: player for player in players})
+            self._indexes[party] = index
+
+        return index[1]
+
+    def get_player(self, name, party=None):
+        """Get the player in the game with the given name.
+
+        If ``party`` is ``None``, each party of the game is searched in
+        turn. Otherwise, only the named party is. Raise a ``ValueError``
+        if there is no such player.
+        """
+
+        parties = self._player_classes if party is None else (party,)
+        for party in parties:
+            player = self._get_index(party).get(name)
+            if player is not None:
+                return player
+
+        raise ValueError(f"There is no player named {name!r} in this game.")
+
+    def _get_positions(self, party):
+        """Get a dictionary of the position of each player in a party.
+
+        Like the name index, this is made again if the party has been
+        replaced since it was last needed.
+        """
+
+        players = getattr(self, party)
+        positions = self._indexes.get(("positions", party))
+        if positions is None or positions[0] is not players:
+            positions = (players, {p: i for i, p in enumerate(players)})
+            self._indexes[("positions", party)] = positions
+
+        return positions[1]
+
+    def _set_blocking_pairs(self, blocking_pairs):
+        """Record the blocking pairs of the matching as it stands."""
+
+        self.blocking_pairs = blocking_pairs
+        self._checked = self.matching
+        if self.matching is not None:
+            self.matching._changed.clear()
+
+    def recheck_stability(self):
+        """Check for blocking pairs again after some matches have been
+        changed through the matching.
+
+        Only the pairs with a player whose match has changed since the
+        last check are looked at again, and the blocking pairs of the
+        others are kept. If the matching has not been checked since it
+        was made, every pair is checked with ``check_stability``.
+        """
+
+        if self.matching is None or self._checked is not self.matching:
+            return self.check_stability()
+
+        party, other_party = self._matching_parties
+        positions = self._get_positions(party)
+        other_positions = self._get_positions(other_party)
+
+        pairs = set()
+        for player in self.matching._changed:
+            pairs.update(
+                (first, second)
+                for first, second in self._get_pairs_with(player)
+                if first in positions and second in other_positions
+            )
+
+        blocking_pairs = [
+            pair for pair in self.blocking_pairs if pair not in pairs
+        ]
+        blocking_pairs.extend(
+            pair for pair in pairs if self._is_blocking_pair(*pair)
+        )
+        blocking_pairs.sort(
+            key=lambda pair: (positions[pair[0]], other_positions[pair[1]])
+        )
+
+        self._set_blocking_pairs(blocking_pairs)
+        return not any(blocking_pairs)
+
+    def _get_solve_state(self, optimal=None):
+        """Get the state for the algorithm of a solve to keep its
+        worklist and cursors in.
+
+        If the game was loaded from a checkpoint, the state holds the
+        saved worklist and cursors, so that the algorithm carries on
+        from there. Otherwise, it is empty.
+        """
+
+        if self._checkpoint is None:
+            return {}
+
+        from matching.checkpoint import state_from_arrays
+
+        saved, arrays = self._checkpoint
+        if optimal != saved:
+            raise ValueError(
+                f"The checkpoint is of a solve with optimal={saved!r}, not "
+                f"optimal={optimal!r}."
+            )
+
+        return state_from_arrays(self, arrays)
+
+    def _solve_steps(self, steps, state=None, optimal=None):
+        """Run the steps of an algorithm, yielding its progress, and set
+        the matching once they finish.
+
+        The state of every player is kept beforehand, and if the steps
+        are closed before they finish, the players are put back as they
+        were. While the steps are under way, the ``state`` of their
+        algorithm can be saved with the ``checkpoint`` method.
+        """
+
+        states = [
+            (player, _copy_state(player))
+            for party in self._player_classes
+            for player in getattr(self, party)
+        ]
+        self._solving = (optimal, state)
+        try:
+            matching = yield from steps
+        except GeneratorExit:
+            for player, attributes in states:
+                vars(player).update(attributes)
+            raise
+        finally:
+            self._solving = None
+
+        self._checkpoint = None
+        self.matching = self._matching_class(matching)
+        return self.matching
+
+    def _solve_until(self, steps, time_budget=None, cancel_event=None):
+        """Run the steps of a solve until they finish, they run out of
+        time, or the cancel event is set. In the last two cases, the
+        steps are closed and a ``SolveInterruptedError`` is raised."""
+
+        if time_budget is None:
+            deadline = None
+        else:
+            deadline = time.monotonic() + time_budget
+
+        progress = None
+        while True:
+            if cancel_event is not None and cancel_event.is_set():
+                reason = "cancelled"
+            elif deadline is not None and time.monotonic() >= deadline:
+                reason = "time_budget"
+            else:
+                reason = None
+
+            if reason is not None:
+                steps.close()
+                raise SolveInterruptedError(reason, progress)
+
+            try:
+                progress = next(steps)
+            except StopIteration as stop:
+                return stop.value
+
+    def save(self, path):
+        """Save the game (and its matching, if solved) to ``path``.
+
+        The game is stored as an uncompressed archive of arrays. See
+        ``matching.io`` for a description of its contents, and for the
+        names of players that can be stored. A ``ValueError`` is raised
+        for any others.
+        """
+
+        from matching.io import game_to_arrays, write_arrays
+
+        write_arrays(path, game_to_arrays(self))
+
+    def checkpoint(self, path):
+        """Save the state of a solve that is under way to ``path``.
+
+        This can only be done while the steps of ``solve_iter`` are
+        paused between progress reports. The game can be loaded with
+        ``load_checkpoint`` later on, in this process or another, and
+        solving it again carries on from where the solve was. See
+        ``matching.checkpoint`` for the contents of the archive. Player
+        names are stored as they are by ``save``, and the same ones
+        cannot be.
+        """
+
+        from matching.checkpoint import save_checkpoint
+
+        save_checkpoint(self, path)
+
+    def spec(self):
+        """Get an immutable specification of the game as it stands.
+
+        The specification can be shared between threads, and each can
+        solve the instance with a game of its own. See
+        ``matching.spec.GameSpec``.
+        """
+
+        from matching.spec import GameSpec
+
+        return GameSpec.from_game(self)
+
+    async def solve_async(
+        self, *args, executor=None, timeout=None, serialise=None, **kwargs
+    ):
+        """Solve the game in an executor without blocking the event loop.
+
+        Any other arguments are passed to the ``solve`` method. See
+        ``matching.batch.solve_async`` for the keyword arguments and how
+        cancellation and timeouts are handled.
+        """
+
+        from matching.batch import solve_async
+
+        return await solve_async(
+            self,
+            *args,
+            executor=executor,
+            timeout=timeout,
+            serialise=serialise,
+            **kwargs,
+        )
+
+    @classmethod
+    def load(cls, path, mmap=True):
+        """Load a game saved with the ``save`` method.
+
+        If ``mmap`` is ``True``, the arrays in the archive are mapped
+        from disk rather than read into memory first, which makes the
+        file quicker to read. It does not lower the memory the game
+        uses: every player and preference list is built from the arrays
+        as the game is loaded, whichever way they are read. The game is
+        not checked again when it is loaded.
+        """
+
+        from matching.io import game_from_arrays, read_arrays
+
+        return game_from_arrays(cls, read_arrays(path, mmap))
+
+    @classmethod
+    def load_checkpoint(cls, path, mmap=True):
+        """Load a game saved part of the way through a solve with the
+        ``checkpoint`` method.
+
+        The players are left as they were when the checkpoint was made,
+        and the next call to ``solve`` or ``solve_iter`` carries on with
+        the solve and finds the same matching it would have found. As
+        with ``load``, ``mmap`` only makes the file quicker to read.
+        """
+
+        from matching.checkpoint import load_checkpoint
+
+        return load_checkpoint(cls, path, mmap)
 
     def _remove_player(self, player, player_party, other_party):
         """Remove a player from the game.
@@ -134,10 +473,20 @@ class BaseGame(metaclass=abc.ABCMeta):
 
         party = getattr(self, player_party)[:]
         setattr(self, player_party, [p for p in party if p != player])
+        self._forget_index(player, player_party)
         for other in getattr(self, other_party):
             if player in other.prefs:
                 other._forget(player)
 
+    def _forget_index(self, player, party):
+        """Remove a player from the name index of their party, if there
+        is one, and make it point at the current party."""
+
+        index = self._indexes.get(party)
+        if index is not None:
+            index[1].pop(player.name, None)
+            self._indexes[party] = (getattr(self, party), index[1])
+
     def _check_inputs_player_prefs_unique(self, party):
         """Check that noone has ranked another player more than once.
 
@@ -151,10 +500,11 @@ class BaseGame(metaclass=abc.ABCMeta):
                 if other not in unique_prefs:
                     unique_prefs.append(other)
                 else:
-                    warnings.warn(
-                        PreferencesChangedWarning(
-                            f"{player} has ranked {other} multiple times."
-                        )
+                    report_issue(
+                        PreferencesChangedWarning,
+                        "{} has ranked {} multiple times.",
+                        player,
+                        other,
                     )
 
             if self.clean:
@@ -171,11 +521,12 @@ class BaseGame(metaclass=abc.ABCMeta):
         for player in players:
             for other in player.prefs:
                 if other not in others:
-                    warnings.warn(
-                        PreferencesChangedWarning(
-                            f"{player} has ranked a non-{other_party[:-1]}: "
-                            f"{other}."
-                        )
+                    report_issue(
+                        PreferencesChangedWarning,
+                        "{} has ranked a non-{}: {}.",
+                        player,
+                        other_party[:-1],
+                        other,
                     )
                     if self.clean:
                         player._forget(other)
@@ -188,10 +539,10 @@ class BaseGame(metaclass=abc.ABCMeta):
 
         for player in vars(self)[party]:
             if not player.prefs:
-                warnings.warn(
-                    PlayerExcludedWarning(
-                        f"{player} has an empty preference list."
-                    )
+                report_issue(
+                    PlayerExcludedWarning,
+                    "{} has an empty preference list.",
+                    player,
                 )
                 if self.clean:
                     self._remove_player(player, party, other_party)
@@ -208,6 +559,25 @@ class BaseGame(metaclass=abc.ABCMeta):
     def check_validity(self):
         """Placeholder for checking the validity of the matching."""
 
+    @abc.abstractmethod
+    def _get_pairs_with(self, player):
+        """Placeholder for getting the pairs that could block with a
+        player in them."""
+
+    @abc.abstractmethod
+    def _is_blocking_pair(self, player, other):
+        """Placeholder for checking whether a pair blocks the matching."""
+
+
+def _copy_state(player):
+    """Copy the attributes of a player, along with any lists or
+    dictionaries among them."""
+
+    return {
+        key: value.copy() if isinstance(value, (list, dict)) else value
+        for key, value in vars(player).items()
+    }
+
 
 class BaseMatching(dict, metaclass=abc.ABCMeta):
     """An abstract base class for storing and updating a matching.
@@ -224,11 +594,41 @@ class BaseMatching(dict, metaclass=abc.ABCMeta):
         if dictionary is not None:
             self._data.update(dictionary)
 
+        self._names = None
+        self._changed = set()
         super().__init__(self._data)
 
     def __repr__(self):
         return repr(self._data)
 
+    def __reduce__(self):
+        from matching.pickling import from_state, get_state
+
+        return from_state, get_state(self)
+
+    def __copy__(self):
+        from matching.pickling import shallow_copy
+
+        return shallow_copy(self)
+
+    def __deepcopy__(self, memo):
+        from matching.pickling import deep_copy
+
+        return deep_copy(self, memo)
+
+    @property
+    def by_name(self):
+        """A read-only view of the matching keyed by player names.
+
+        The names are indexed the first time the view is needed. The keys
+        of a matching do not change, so the index never goes stale.
+        """
+
+        if self._names is None:
+            self._names = {player.name: player for player in self.keys()}
+
+        return MatchingNames(self)
+
     def keys(self):
         """Get the underlying dictionary keys."""
 
@@ -242,10 +642,87 @@ class BaseMatching(dict, metaclass=abc.ABCMeta):
     def __getitem__(self, player):
         return self._data[player]
 
+    def update_many(self, assignments, validate="full"):
+        """Update the matches of many players at once.
+
+        The ``assignments`` are a dictionary, or an iterable of pairs,
+        of players and their new matches. How they are checked is given
+        by ``validate``:
+
+        - ``"full"`` sets each match in turn, checking it as usual;
+        - ``"fast"`` checks all of the assignments in one pass before
+          setting any of them;
+        - ``"none"`` sets them without checking them.
+        """
+
+        check_mode(validate)
+        assignments = list(dict(assignments).items())
+        if validate == "full":
+            for player, new in assignments:
+                self[player] = new
+
+            return
+
+        if validate == "fast":
+            missing = {player for player, _ in assignments} - self._data.keys()
+            if missing:
+                raise ValueError(
+                    f"{missing.pop()} is not a key in this matching."
+                )
+
+            self._check_many(assignments)
+
+        for player, new in assignments:
+            self._record_change(player, new)
+
+        self._link_many(assignments)
+        self._data.update(assignments)
+
+    def compact(self):
+        """Get a copy of the matching that is stored as arrays. See
+        ``matching.compact``."""
+
+        from matching.compact import compact
+
+        return compact(self)
+
+    def to_numpy(self):
+        """Get the arrays of positions describing the matching. See
+        ``matching.compact`` for their form."""
+
+        return self.compact().to_numpy()
+
+    def to_records(self):
+        """Get a record array of the names of each matched pair."""
+
+        return self.compact().to_records()
+
+    def to_pandas(self):
+        """Get a data frame of the names of each matched pair. This
+        requires ``pandas`` to be installed."""
+
+        from matching.compact import to_pandas
+
+        return to_pandas(self.to_records())
+
     @abc.abstractmethod
     def __setitem__(self, player, new_match):
         """A placeholder function for how to update the matching."""
 
+    @abc.abstractmethod
+    def _record_change(self, player, new):
+        """A placeholder function for recording the players whose matches
+        change."""
+
+    @abc.abstractmethod
+    def _check_many(self, assignments):
+        """A placeholder function for checking many new matches."""
+
+    @abc.abstractmethod
+    def _link_many(self, assignments):
+        """A placeholder function for linking players to many new
+        matches."""
+
     def _check_player_in_keys(self, player):
         """Raise an error if ``player`` is not in the dictionary."""
 
@@ -257,3 +734,31 @@ class BaseMatching(dict, metaclass=abc.ABCMeta):
 
         if not isinstance(new, types):
             raise ValueError(f"{new} is not one of {types} and is not valid.")
+
+
+class MatchingNames(Mapping):
+    """A view of a matching that is keyed by the names of its players.
+
+    The view has no data of its own, so it reflects any updates to the
+    matching.
+
+    Parameters
+    ----------
+    matching : BaseMatching
+        The matching to view.
+    """
+
+    def __init__(self, matching):
+        self._matching = matching
+
+    def __repr__(self):
+        return f"{type(self).__name__}({dict(self)})"
+
+    def __getitem__(self, name):
+        return self._matching[self._matching._names[name]]
+
+    def __iter__(self):
+        return iter(self._matching._names)
+
+    def __len__(self):
+        return len(self._matching._names)
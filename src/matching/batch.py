@@ -0,0 +1,168 @@
+"""Functions for solving many game instances, possibly asynchronously."""
+
+import asyncio
+import concurrent.futures
+
+from matching.io import get_partners, set_matching
+
+
+def solve_many(games, *args, executor=None, serialise=None, **kwargs):
+    """Solve some games, possibly in parallel. Return their matchings.
+
+    Any other arguments are passed to the ``solve`` method of each game.
+
+    Parameters
+    ----------
+    games : list of BaseGame
+        The games to solve.
+    executor : concurrent.futures.Executor, optional
+        The executor in which to solve the games. If ``None``, the games
+        are solved one after another in this thread.
+    serialise : bool, optional
+        Whether to solve each game by sending its specification (see
+        ``matching.spec``) to the executor rather than the game itself.
+        Each game is then left untouched until its matching is set from
+        the result. If ``None``, games are serialised for process pools
+        only, so that their players need not be pickled.
+
+    Returns
+    -------
+    matchings : list
+        The matching of each game, in order.
+    """
+
+    if executor is None:
+        return [game.solve(*args, **kwargs) for game in games]
+
+    futures = [
+        _submit(executor, game, args, kwargs, serialise) for game in games
+    ]
+
+    return [
+        _finish(game, future.result(), serialise, executor)
+        for game, future in zip(games, futures)
+    ]
+
+
+async def solve_async(
+    game, *args, executor=None, timeout=None, serialise=None, **kwargs
+):
+    """Solve a game in an executor without blocking the event loop.
+
+    Any other arguments are passed to the ``solve`` method of the game.
+
+    If the solve is cancelled, or does not finish within ``timeout``
+    seconds, then ``asyncio.CancelledError`` or ``asyncio.TimeoutError``
+    is raised. A solve that has started cannot be stopped, so it runs to
+    completion in the executor. When the game is serialised, as it is
+    for process pools by default, the result is then thrown away and the
+    game is left as it was. Otherwise, the game is solved in place by a
+    thread, so it is changed once that thread finishes.
+
+    Parameters
+    ----------
+    game : BaseGame
+        The game to solve.
+    executor : concurrent.futures.Executor, optional
+        The executor in which to solve the game. If ``None``, the default
+        executor of the event loop is used.
+    timeout : float, optional
+        The number of seconds to wait for the matching.
+    serialise : bool, optional
+        Whether to send the specification of the game to the executor
+        rather than the game itself. If ``None``, games are serialised
+        for process pools only.
+
+    Returns
+    -------
+    matching : BaseMatching
+        The matching of the game.
+    """
+
+    loop = asyncio.get_running_loop()
+    if _serialises(executor, serialise):
+        func, func_args = _solve_spec, (game.spec(), args, kwargs)
+    else:
+        func, func_args = _solve_game, (game, args, kwargs)
+
+    result = await asyncio.wait_for(
+        loop.run_in_executor(executor, func, *func_args), timeout
+    )
+
+    return _finish(game, result, serialise, executor)
+
+
+async def solve_many_async(
+    games,
+    *args,
+    executor=None,
+    timeout=None,
+    serialise=None,
+    return_exceptions=False,
+    **kwargs,
+):
+    """Solve some games in an executor without blocking the event loop.
+
+    The games are solved concurrently, and their matchings are returned
+    in order once they have all finished. The ``timeout`` applies to the
+    whole batch, and cancelling the batch cancels any solve that has not
+    finished. If ``return_exceptions`` is ``True``, any exception raised
+    by a solve is returned in place of its matching rather than raised.
+
+    See ``solve_async`` for the other parameters.
+    """
+
+    solves = asyncio.gather(
+        *(
+            solve_async(
+                game,
+                *args,
+                executor=executor,
+                serialise=serialise,
+                **kwargs,
+            )
+            for game in games
+        ),
+        return_exceptions=return_exceptions,
+    )
+
+    return await asyncio.wait_for(solves, timeout)
+
+
+def _serialises(executor, serialise):
+    """Determine whether games should be sent as specifications."""
+
+    if serialise is None:
+        return isinstance(executor, concurrent.futures.ProcessPoolExecutor)
+
+    return serialise
+
+
+def _submit(executor, game, args, kwargs, serialise):
+    """Submit a game to an executor to be solved."""
+
+    if _serialises(executor, serialise):
+        return executor.submit(_solve_spec, game.spec(), args, kwargs)
+
+    return executor.submit(_solve_game, game, args, kwargs)
+
+
+def _finish(game, result, serialise, executor):
+    """Get the matching of a game from the result of its solve."""
+
+    if _serialises(executor, serialise):
+        return set_matching(game, result, compact=False)
+
+    return result
+
+
+def _solve_game(game, args, kwargs):
+    """Solve a game in place."""
+
+    return game.solve(*args, **kwargs)
+
+
+def _solve_spec(spec, args, kwargs):
+    """Solve the game of a specification and get its partners."""
+
+    return get_partners(spec.solve(*args, **kwargs))
@@ -0,0 +1,255 @@
+"""A cache for the matchings of solved game instances."""
+
+import collections
+import hashlib
+import os
+import tempfile
+import threading
+
+import numpy as np
+
+from matching.io import game_to_arrays, get_partners, set_matching
+
+CacheInfo = collections.namedtuple(
+    "CacheInfo", ["hits", "misses", "maxsize", "currsize"]
+)
+
+
+class SolveCache:
+    """A cache of matchings keyed by the content of their game.
+
+    Games are identified by a hash of their type, the names,
+    capacities and preferences of their players, and the optimality
+    asked of the solution. The order in which players are given does not
+    affect the hash, so identical instances built from differently
+    ordered inputs share an entry. Players whose names cannot be stored
+    in an array, such as tuples or a mix of strings and integers, are
+    identified by the ``repr`` of their names instead, and games where
+    those clash are solved without the cache.
+
+    Pass an instance to the ``solve`` method of a game to use it. When
+    a game has been seen before, its matching is set from the cache and
+    the algorithm is not run, so the preferences of its players are left
+    as they are.
+
+    Parameters
+    ----------
+    maxsize : int or None
+        The number of matchings to keep in memory. The least recently
+        used matching is discarded when there are more. If ``None``, the
+        cache is unbounded. Defaults to 128.
+    directory : str or None
+        A directory in which to keep every matching on disk as well, so
+        that it can be shared between processes and runs. Defaults to
+        ``None``.
+
+    Attributes
+    ----------
+    hits : int
+        The number of times a matching has been found in the cache.
+    misses : int
+        The number of times a game has been solved by the cache.
+    """
+
+    def __init__(self, maxsize=128, directory=None):
+        self.maxsize = maxsize
+        self.directory = directory
+        self.hits = 0
+        self.misses = 0
+
+        self._entries = collections.OrderedDict()
+        self._lock = threading.Lock()
+
+        if directory is not None:
+            os.makedirs(directory, exist_ok=True)
+
+    def __len__(self):
+        return len(self._entries)
+
+    def cache_info(self):
+        """Get the hits, misses, maximum and current size of the cache."""
+
+        return CacheInfo(self.hits, self.misses, self.maxsize, len(self))
+
+    def clear(self):
+        """Empty the in-memory cache and reset its statistics.
+
+        Any matchings stored on disk are kept.
+        """
+
+        with self._lock:
+            self._entries.clear()
+            self.hits = self.misses = 0
+
+    def solve(self, game, optimal=None, **kwargs):
+        """Get the matching of a game from the cache, or solve it.
+
+        If ``optimal`` is ``None``, the game is solved without passing
+        it, as for SR. Otherwise, it is passed to the ``solve`` method of
+        the game, along with any other keyword arguments, such as
+        ``time_budget`` or ``engine``. A matching found in the cache is
+        set at once, without running the algorithm.
+        """
+
+        try:
+            key, orders = _canonical_key(game, optimal)
+        except ValueError:
+            return _solve(game, optimal, **kwargs)
+
+        party, other_party = type(game)._matching_parties
+
+        partners = self._get(key)
+        if partners is not None:
+            original = np.full(len(partners), -1, dtype=np.int64)
+            matched = partners >= 0
+            original[matched] = orders[other_party][partners[matched]]
+            return set_matching(
+                game, original[_inverse(orders[party])], compact=False
+            )
+
+        _solve(game, optimal, **kwargs)
+        partners = get_partners(game)[orders[party]]
+        matched = partners >= 0
+        partners[matched] = _inverse(orders[other_party])[partners[matched]]
+        self._put(key, partners)
+
+        return game.matching
+
+    def _get(self, key):
+        """Get the partners for a key, counting the hit or miss."""
+
+        with self._lock:
+            partners = self._entries.get(key)
+            if partners is not None:
+                self._entries.move_to_end(key)
+
+        if partners is None and self.directory is not None:
+            path = self._path(key)
+            if os.path.exists(path):
+                partners = np.load(path)
+                self._remember(key, partners)
+
+        with self._lock:
+            if partners is None:
+                self.misses += 1
+            else:
+                self.hits += 1
+
+        return partners
+
+    def _put(self, key, partners):
+        """Store the partners for a key in memory and on disk."""
+
+        self._remember(key, partners)
+
+        if self.directory is not None:
+            handle, temporary = tempfile.mkstemp(dir=self.directory)
+            with os.fdopen(handle, "wb") as f:
+                np.save(f, partners)
+            os.replace(temporary, self._path(key))
+
+    def _remember(self, key, partners):
+        """Keep the partners for a key in memory, evicting as needed."""
+
+        with self._lock:
+            self._entries[key] = partners
+            self._entries.move_to_end(key)
+            while self.maxsize is not None and len(self) > self.maxsize:
+                self._entries.popitem(last=False)
+
+    def _path(self, key):
+        """Get the path to the file for a key."""
+
+        return os.path.join(self.directory, f"{key}.npy")
+
+
+def _solve(game, optimal, **kwargs):
+    """Solve a game, passing ``optimal`` only if it is given."""
+
+    if optimal is None:
+        return game.solve(**kwargs)
+
+    return game.solve(optimal, **kwargs)
+
+
+def _canonical_key(game, optimal):
+    """Get the hash of a game and the orders of its parties.
+
+    The players of each party are put in order of their names before
+    hashing, and the order of each party is returned with the hash.
+    """
+
+    try:
+        arrays, names = game_to_arrays(game), "names"
+    except ValueError:
+        arrays, names = game_to_arrays(game, _repr_names), "reprs"
+
+    cls = type(game)
+
+    orders = {
+        party: np.argsort(arrays[party], kind="stable")
+        for party in cls._player_classes
+    }
+    ranks = {party: _inverse(order) for party, order in orders.items()}
+
+    canonical = {party: arrays[party][orders[party]] for party in orders}
+    for party in orders:
+        if f"{party}_capacity" in arrays:
+            canonical[f"{party}_capacity"] = arrays[f"{party}_capacity"][
+                orders[party]
+            ]
+
+    for party, other_party in cls._prefs_parties.items():
+        indptr, indices = _reorder_csr(
+            arrays[f"{party}_indptr"],
+            arrays[f"{party}_indices"],
+            orders[party],
+        )
+        canonical[f"{party}_indptr"] = indptr
+        canonical[f"{party}_indices"] = ranks[other_party][indices]
+
+    if "projects_supervisor" in arrays:
+        canonical["projects_supervisor"] = ranks["supervisors"][
+            arrays["projects_supervisor"][orders["projects"]]
+        ]
+
+    digest = hashlib.sha256()
+    digest.update(f"{cls.__name__}:{optimal}:{names}".encode())
+    for key in sorted(canonical):
+        array = np.ascontiguousarray(canonical[key])
+        digest.update(f"{key}:{array.dtype.str}:{array.shape}".encode())
+        digest.update(array.tobytes())
+
+    return digest.hexdigest(), orders
+
+
+def _repr_names(players, party):
+    """Make an array of the ``repr`` of the name of each player."""
+
+    names = [repr(player.name) for player in players]
+    if len(set(names)) < len(names):
+        raise ValueError(f"The names of the {party} have clashing reprs.")
+
+    return np.array(names, dtype=str)
+
+
+def _reorder_csr(indptr, indices, order):
+    """Reorder the rows of some CSR arrays."""
+
+    lengths = np.diff(indptr)[order]
+    new_indptr = np.zeros_like(indptr)
+    np.cumsum(lengths, out=new_indptr[1:])
+
+    starts = np.repeat(indptr[:-1][order] - new_indptr[:-1], lengths)
+    positions = starts + np.arange(new_indptr[-1])
+
+    return new_indptr, indices[positions]
+
+
+def _inverse(order):
+    """Get the inverse of a permutation."""
+
+    inverse = np.empty_like(order)
+    inverse[order] = np.arange(len(order))
+
+    return inverse
@@ -0,0 +1,236 @@
+"""Functions for saving a solve part of the way through and carrying on.
+
+A long solve can be saved between the progress reports of
+``solve_iter`` and finished later, in another process if need be::
+
+    steps = game.solve_iter(chunk=100_000)
+    for progress in steps:
+        if preempted():
+            game.checkpoint("solve.npz")
+            break
+
+    game = StudentAllocation.load_checkpoint("solve.npz")
+    matching = game.solve()
+
+The checkpoint is an archive like those written by ``BaseGame.save``
+(see ``matching.io``), holding the players as they are part of the way
+through the solve: their preferences, as the algorithm has cut them
+down so far, and their original preferences. Besides these, it holds
+the following members:
+
+- ``__optimal__``: the party the solve is optimal for, or an empty
+  string for games without one.
+- ``{party}_partial``: the position of the current match of each player
+  in the party with single matches, or -1 if they are unmatched.
+- ``state_{key}``: an entry of the state of the algorithm. Players are
+  stored as their position among all the players of the game, taking
+  the parties in order. The worklist ``free`` is an array of players,
+  ``current`` is the player proposing when the solve was paused, and
+  ``proposals`` and ``phase`` are integers.
+- ``state_{key}_players`` and ``state_{key}_values``: an entry of the
+  state that maps players to integers, such as the ``cursors`` on the
+  preference lists of the proposing players and the ``cutoffs`` beyond
+  which pairs have been deleted.
+
+Carrying on from the checkpoint finds the matching that the solve would
+have found had it not been paused.
+"""
+
+import numpy as np
+
+from matching.io import (
+    _prefs_to_csr,
+    _to_list,
+    game_from_arrays,
+    game_to_arrays,
+    get_partners,
+    read_arrays,
+    write_arrays,
+)
+from matching.players import Hospital, Project
+
+_STATE_KINDS = {
+    "free": "players",
+    "current": "player",
+    "cursors": "mapping",
+    "cutoffs": "mapping",
+    "proposals": "integer",
+    "phase": "integer",
+}
+
+
+def save_checkpoint(game, path):
+    """Save the state of a solve that is under way to ``path``."""
+
+    write_arrays(path, checkpoint_to_arrays(game))
+
+
+def load_checkpoint(cls, path, mmap=True):
+    """Load a game from a checkpoint, ready to carry on with its solve.
+
+    If ``mmap`` is ``True``, the arrays in the archive are mapped from
+    disk rather than read into memory first. The players are built from
+    them in full either way, so this only makes the file quicker to read.
+    """
+
+    return checkpoint_from_arrays(cls, read_arrays(path, mmap))
+
+
+def checkpoint_to_arrays(game):
+    """Get the arrays describing a game part of the way through a solve.
+
+    Raise a ``ValueError`` if the game is not being solved, or its solve
+    has not been paused yet.
+    """
+
+    if game._solving is None or "proposals" not in game._solving[1]:
+        raise ValueError(
+            "Only a solve that has been paused by solve_iter can be saved."
+        )
+
+    cls = type(game)
+    optimal, state = game._solving
+    arrays = game_to_arrays(game)
+
+    indices = {
+        party: {player: i for i, player in enumerate(getattr(game, party))}
+        for party in cls._player_classes
+    }
+    for party, other_party in cls._prefs_parties.items():
+        indptr, prefs = _prefs_to_csr(
+            getattr(game, party), indices[other_party], "_original_prefs"
+        )
+        arrays[f"{party}_original_indptr"] = indptr
+        arrays[f"{party}_original_indices"] = prefs
+
+    party, _ = cls._matching_parties
+    arrays.pop(f"{party}_matching", None)
+    arrays[f"{party}_partial"] = get_partners(game)
+    arrays["__optimal__"] = np.array(optimal or "")
+    arrays.update(state_to_arrays(game, state))
+
+    return arrays
+
+
+def checkpoint_from_arrays(cls, arrays):
+    """Create an instance of a game from the arrays of a checkpoint.
+
+    The players are matched as they were when the checkpoint was made,
+    and the state of the algorithm is kept to be taken up by the next
+    solve.
+    """
+
+    game = game_from_arrays(cls, arrays)
+
+    party, _ = cls._matching_parties
+    _restore_matches(game, arrays[f"{party}_partial"])
+
+    optimal = str(arrays["__optimal__"]) or None
+    state = {
+        key: value for key, value in arrays.items() if key.startswith("state_")
+    }
+    game._checkpoint = (optimal, state)
+
+    return game
+
+
+def state_to_arrays(game, state):
+    """Get the arrays describing the state of the algorithm of a solve."""
+
+    index = {player: i for i, player in enumerate(_get_players(game))}
+
+    arrays = {}
+    for key, value in state.items():
+        kind = _STATE_KINDS[key]
+        if kind == "players":
+            arrays[f"state_{key}"] = np.fromiter(
+                (index[player] for player in value),
+                dtype=np.int64,
+                count=len(value),
+            )
+        elif kind == "player":
+            arrays[f"state_{key}"] = np.array(index.get(value, -1))
+        elif kind == "mapping":
+            arrays[f"state_{key}_players"] = np.fromiter(
+                (index[player] for player in value),
+                dtype=np.int64,
+                count=len(value),
+            )
+            arrays[f"state_{key}_values"] = np.fromiter(
+                value.values(), dtype=np.int64, count=len(value)
+            )
+        else:
+            arrays[f"state_{key}"] = np.array(value, dtype=np.int64)
+
+    return arrays
+
+
+def state_from_arrays(game, arrays):
+    """Get the state of the algorithm of a solve from its arrays.
+
+    The state is made afresh each time, so the algorithm can change it
+    as it goes without changing the arrays.
+    """
+
+    players = _get_players(game)
+
+    state = {}
+    for key, kind in _STATE_KINDS.items():
+        if kind == "mapping" and f"state_{key}_players" in arrays:
+            keys = _to_list(arrays[f"state_{key}_players"])
+            values = _to_list(arrays[f"state_{key}_values"])
+            state[key] = {players[i]: value for i, value in zip(keys, values)}
+        elif f"state_{key}" not in arrays:
+            continue
+        elif kind == "players":
+            state[key] = [players[i] for i in _to_list(arrays[f"state_{key}"])]
+        elif kind == "player":
+            i = int(arrays[f"state_{key}"])
+            state[key] = players[i] if i >= 0 else None
+        else:
+            state[key] = int(arrays[f"state_{key}"])
+
+    return state
+
+
+def _get_players(game):
+    """Get all the players of a game, taking its parties in order."""
+
+    return [
+        player
+        for party in type(game)._player_classes
+        for player in getattr(game, party)
+    ]
+
+
+def _restore_matches(game, partners):
+    """Match the players of a game as given by an array of partners,
+    without setting the matching of the game.
+
+    The matches of players with many are put in the order of their
+    preferences, as they are kept by the algorithms.
+    """
+
+    cls = type(game)
+    party, other_party = cls._matching_parties
+    others = getattr(game, other_party)
+    for player, i in zip(getattr(game, party), _to_list(partners)):
+        if i < 0:
+            continue
+
+        other = others[i]
+        player.matching = other
+        if party == other_party:
+            continue
+
+        if isinstance(other, Hospital):
+            other.matching.append(player)
+            if isinstance(other, Project):
+                other.supervisor.matching.append(player)
+        else:
+            other.matching = player
+
+    for player in _get_players(game):
+        if isinstance(player, Hospital) and player.matching:
+            ranks = {other: i for i, other in enumerate(player.prefs)}
+            player.matching.sort(key=ranks.__getitem__)
@@ -0,0 +1,365 @@
+"""A command-line interface for solving many instances at once.
+
+Instances are read from JSON or JSON lines files, with their
+preferences inline or in CSV or JSON lines files of ranked pairs, solved
+across a pool of worker processes, and their matchings are written as
+JSON lines as each instance finishes. For example::
+
+    python -m matching hr nightly/*.jsonl --capacity 2 --workers 8 \\
+        --stability --output matchings.jsonl
+
+An instance is an object whose keys depend on the game:
+
+- ``hr``: ``residents`` and ``hospitals`` map names to preference lists,
+  and ``capacities`` maps hospital names to their capacities.
+- ``sa``: ``students`` and ``supervisors`` map names to preference lists,
+  ``project_supervisors`` maps project names to their supervisor, and
+  ``project_capacities`` and ``supervisor_capacities`` map names to
+  capacities.
+- ``sm``: ``suitors`` and ``reviewers`` map names to preference lists.
+- ``sr``: ``players`` maps names to preference lists.
+
+Any preference or capacity dictionary may instead be given as the path
+of a file of rows, read as in ``matching.io.read_hospital_resident``:
+preferences as ``(player, other, rank)`` rows, where lower ranks are
+preferred, and capacities as ``(name, capacity)`` rows. Files ending in
+``.jsonl`` or ``.ndjson`` are read as JSON lines of arrays, and others
+as CSV, where a first row whose last field is not an integer is skipped
+as a header. Relative paths are taken from the directory of the file
+holding the instance.
+
+Any capacity that is not given is taken from ``--capacity``. An instance
+may also have a ``name`` under which its matching is written, and
+otherwise it is named by its file and position. All player names are
+read as strings.
+
+A ``.json`` file holds one instance or a list of them, and each line of
+a ``.jsonl`` or ``.ndjson`` file holds one. The lines are read as they
+are needed, so the number of instances held in memory at once is
+bounded by the number of workers.
+
+Each line of output is an object with the ``instance`` name and its
+``matching``, along with any ``issues`` found in the inputs and, if
+asked for, whether the matching is ``stable`` and ``valid``. If an
+instance cannot be solved, the line gives the ``error`` instead and the
+command exits with a status of 1 once every instance is done.
+"""
+
+import argparse
+import collections
+import concurrent.futures
+import json
+import operator
+import os
+import sys
+
+from matching.exceptions import MatchingError
+from matching.validation import collect_issues
+
+GAMES = {
+    "hr": (
+        "HospitalResident",
+        ("residents", "hospitals"),
+        {"capacities": "hospitals"},
+    ),
+    "sa": (
+        "StudentAllocation",
+        ("students", "supervisors", "project_supervisors"),
+        {
+            "project_capacities": "project_supervisors",
+            "supervisor_capacities": "supervisors",
+        },
+    ),
+    "sm": ("StableMarriage", ("suitors", "reviewers"), {}),
+    "sr": ("StableRoommates", ("players",), {}),
+}
+
+
+def main(argv=None):
+    """Run the command-line interface with some arguments."""
+
+    args = _get_parser().parse_args(argv)
+
+    instances = _read_instances(args.paths)
+    options = {
+        "game": args.game,
+        "capacity": args.capacity,
+        "clean": args.clean,
+        "validate": args.validate,
+        "optimal": args.optimal,
+        "stability": args.stability,
+        "validity": args.validity,
+    }
+
+    if args.output == "-":
+        output = sys.stdout
+    else:
+        output = open(args.output, "w")
+
+    failed = False
+    try:
+        for result in _solve_all(instances, options, args.workers):
+            failed = failed or "error" in result
+            output.write(json.dumps(result) + "\n")
+            output.flush()
+    finally:
+        if output is not sys.stdout:
+            output.close()
+
+    return 1 if failed else 0
+
+
+def _get_parser():
+    """Make the parser for the command-line arguments."""
+
+    parser = argparse.ArgumentParser(
+        prog="matching",
+        description="Solve matching game instances read from files.",
+    )
+    parser.add_argument("game", choices=GAMES, help="the game to solve")
+    parser.add_argument(
+        "paths", nargs="+", help="JSON or JSON lines files of instances"
+    )
+    parser.add_argument(
+        "-w",
+        "--workers",
+        type=int,
+        default=os.cpu_count() or 1,
+        help="the number of worker processes, or 0 to solve in this one",
+    )
+    parser.add_argument(
+        "-o", "--output", default="-", help="the file to write to"
+    )
+    parser.add_argument(
+        "--optimal",
+        help="the party to optimise for, as in the solve method of the game",
+    )
+    parser.add_argument(
+        "--capacity", type=int, help="the capacity of anyone not given one"
+    )
+    parser.add_argument(
+        "--clean", action="store_true", help="clean the instances"
+    )
+    parser.add_argument(
+        "--validate",
+        choices=("full", "fast", "none"),
+        default="full",
+        help="how to check the instances",
+    )
+    parser.add_argument(
+        "--stability",
+        action="store_true",
+        help="check whether each matching is stable",
+    )
+    parser.add_argument(
+        "--validity",
+        action="store_true",
+        help="check whether each matching is valid",
+    )
+
+    return parser
+
+
+def _read_instances(paths):
+    """Read the instances in some files, one at a time."""
+
+    for path in paths:
+        _, extension = os.path.splitext(path)
+        if extension in (".jsonl", ".ndjson"):
+            instances = _read_json_lines(path)
+        else:
+            with open(path, "r") as f:
+                instances = json.load(f)
+            if isinstance(instances, dict):
+                instances = [instances]
+
+        directory = os.path.dirname(path)
+        for i, instance in enumerate(instances):
+            name = instance.get("name", f"{path}:{i}")
+            yield name, _resolve_paths(instance, directory)
+
+
+def _read_json_lines(path):
+    """Read the instances in a JSON lines file, one line at a time."""
+
+    with open(path, "r") as f:
+        for line in f:
+            if line.strip():
+                yield json.loads(line)
+
+
+def _resolve_paths(instance, directory):
+    """Make the paths of the files in an instance relative to the
+    directory of the file it was read from."""
+
+    return {
+        key: os.path.join(directory, value)
+        if isinstance(value, str) and key != "name"
+        else value
+        for key, value in instance.items()
+    }
+
+
+def _read_prefs(path):
+    """Read a preference dictionary from a file of ranked pairs."""
+
+    from matching.io import _read_rows
+
+    ranked = collections.defaultdict(list)
+    for player, other, rank in _read_rows(path):
+        ranked[player].append((int(rank), other))
+
+    return {
+        player: [
+            other for _, other in sorted(prefs, key=operator.itemgetter(0))
+        ]
+        for player, prefs in ranked.items()
+    }
+
+
+def _read_capacities(path):
+    """Read a capacity dictionary from a file of rows."""
+
+    from matching.io import _read_rows
+
+    return {name: capacity for name, capacity in _read_rows(path)}
+
+
+def _solve_all(instances, options, workers):
+    """Solve some instances, yielding the result of each as it finishes.
+
+    At most twice as many instances as there are workers are read ahead
+    of those being solved.
+    """
+
+    if workers < 1:
+        for name, instance in instances:
+            yield _solve_instance(name, instance, options)
+
+        return
+
+    with concurrent.futures.ProcessPoolExecutor(workers) as executor:
+        pending = set()
+        for name, instance in instances:
+            pending.add(
+                executor.submit(_solve_instance, name, instance, options)
+            )
+            if len(pending) >= 2 * workers:
+                done, pending = concurrent.futures.wait(
+                    pending, return_when=concurrent.futures.FIRST_COMPLETED
+                )
+                for future in done:
+                    yield future.result()
+
+        for future in concurrent.futures.as_completed(pending):
+            yield future.result()
+
+
+def _solve_instance(name, instance, options):
+    """Make a game from an instance, solve it and describe the result."""
+
+    result = {"instance": name}
+    try:
+        with collect_issues() as report:
+            game = _make_game(instance, options)
+
+        if report.issues:
+            result["issues"] = report.messages()
+
+        kwargs = {}
+        if options["optimal"] is not None:
+            kwargs["optimal"] = options["optimal"]
+
+        matching = game.solve(**kwargs)
+        result["matching"] = {
+            str(player): _match_names(match)
+            for player, match in matching.items()
+        }
+
+        if options["stability"]:
+            result["stable"] = bool(game.check_stability())
+        if options["validity"]:
+            result["valid"] = _is_valid(game)
+    except Exception as error:
+        result = {
+            "instance": name,
+            "error": f"{type(error).__name__}: {error}",
+        }
+
+    return result
+
+
+def _make_game(instance, options):
+    """Make a game from the dictionaries of an instance."""
+
+    import matching.games
+
+    class_name, prefs_keys, capacity_keys = GAMES[options["game"]]
+    game_class = getattr(matching.games, class_name)
+
+    dictionaries = {}
+    for key in prefs_keys:
+        dictionary = instance.get(key, {})
+        if isinstance(dictionary, str) and key != "project_supervisors":
+            dictionary = _read_prefs(dictionary)
+
+        dictionaries[key] = _stringify(dictionary, key)
+
+    for key, owner in capacity_keys.items():
+        capacities = instance.get(key, {})
+        if isinstance(capacities, str):
+            capacities = _read_capacities(capacities)
+
+        capacities = {
+            str(name): int(capacity) for name, capacity in capacities.items()
+        }
+        for name in dictionaries[owner]:
+            if name not in capacities:
+                if options["capacity"] is None:
+                    raise ValueError(f"No capacity was given for {name}.")
+                capacities[name] = options["capacity"]
+
+        dictionaries[key] = capacities
+
+    kwargs = {"clean": options["clean"], "validate": options["validate"]}
+
+    if options["game"] == "sr":
+        return game_class.create_from_dictionary(
+            *dictionaries.values(), **kwargs
+        )
+
+    return game_class.create_from_dictionaries(
+        *dictionaries.values(), **kwargs
+    )
+
+
+def _stringify(dictionary, key):
+    """Make the names in a dictionary of an instance strings."""
+
+    if key == "project_supervisors":
+        return {str(name): str(value) for name, value in dictionary.items()}
+
+    return {
+        str(name): [str(other) for other in prefs]
+        for name, prefs in dictionary.items()
+    }
+
+
+def _match_names(match):
+    """Get the name, or names, of a match."""
+
+    if match is None:
+        return None
+    if isinstance(match, (list, tuple)):
+        return [str(player) for player in match]
+
+    return str(match)
+
+
+def _is_valid(game):
+    """Check the validity of a matching without raising an error."""
+
+    try:
+        return bool(game.check_validity())
+    except MatchingError:
+        return False
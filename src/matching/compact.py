@@ -0,0 +1,354 @@
+"""Matchings that are stored as arrays of integers.
+
+A matching between two parties of players can be described by the
+position of each player's matches among the other party:
+
+- ``CompactSingleMatching`` holds an array of partners for games with
+  single matches like SM or SR. The ``i``-th entry is the position of
+  the match of the ``i``-th player, or -1 if they are unmatched.
+- ``CompactMultipleMatching`` holds the matches of games like HR or SA
+  in compressed sparse row (CSR) form. The matches of the ``i``-th
+  player are those at positions ``indices[indptr[i]:indptr[i + 1]]``.
+
+Both keep the interface of the matching they extend. The dictionary of
+players that it implies is only made the first time the matching is
+used as a mapping, so a compact matching costs little more than its
+arrays until then, and can be exported without walking any players::
+
+    game = HospitalResident.load("instance.npz")
+    game.matching.to_records()
+
+Any matching can be made compact with its ``compact`` method.
+"""
+
+import numpy as np
+
+from matching.io import _names_to_array
+from matching.matchings import MultipleMatching, SingleMatching
+
+
+class _CompactMatching:
+    """A mixin for matchings that are made into a dictionary lazily."""
+
+    _filled = True
+    _stale = False
+
+    def _fill(self):
+        """Make the dictionary of the matching, if it is not made yet."""
+
+        if not self._filled:
+            self._filled = True
+            data = self._make_data()
+            self._data.update(data)
+            dict.update(self, data)
+
+        return self._data
+
+    def __repr__(self):
+        return repr(self._fill())
+
+    def __len__(self):
+        return len(self.players)
+
+    def __iter__(self):
+        return iter(self.players)
+
+    def __contains__(self, player):
+        return player in self._fill()
+
+    def __eq__(self, other):
+        return self._fill() == other
+
+    def __ne__(self, other):
+        return self._fill() != other
+
+    __hash__ = None
+
+    def keys(self):
+        """Get the underlying dictionary keys."""
+
+        return self._fill().keys()
+
+    def values(self):
+        """Get the underlying dictionary values."""
+
+        return self._fill().values()
+
+    def items(self):
+        """Get the underlying dictionary items."""
+
+        return self._fill().items()
+
+    def get(self, player, default=None):
+        """Get the match of a player, or ``default`` if they are not in
+        the matching."""
+
+        return self._fill().get(player, default)
+
+    def __getitem__(self, player):
+        return self._fill()[player]
+
+    def _check_player_in_keys(self, player):
+        """Raise an error if ``player`` is not in the dictionary."""
+
+        self._fill()
+        super()._check_player_in_keys(player)
+
+    def __setitem__(self, player, new):
+        """Update the matching as usual. The arrays of the matching no
+        longer describe it, and so they are discarded."""
+
+        super().__setitem__(player, new)
+        dict.__setitem__(self, player, new)
+        self._stale = True
+
+    def update_many(self, assignments, validate="full"):
+        """Update the matches of many players at once, as usual. The
+        arrays of the matching no longer describe it, and so they are
+        discarded."""
+
+        self._fill()
+        assignments = dict(assignments)
+        super().update_many(assignments, validate)
+        dict.update(self, assignments)
+        self._stale = True
+
+    def compact(self):
+        """Get the matching in compact form."""
+
+        if self._stale:
+            return compact(self)
+
+        return self
+
+    def to_records(self):
+        """Get a record array of the names of each matched pair.
+
+        The array has a ``player`` and a ``match`` field, and a row for
+        each pair in the matching, in the order of the players.
+        """
+
+        if self._stale:
+            return compact(self).to_records()
+
+        players, others = self._get_pairs()
+        player_names = _names(self.players)[players]
+        other_names = _names(self.others)[others]
+
+        return np.rec.fromarrays(
+            [player_names, other_names], names=["player", "match"]
+        )
+
+
+class CompactSingleMatching(_CompactMatching, SingleMatching):
+    """A matching with single matches, stored as an array of partners.
+
+    Parameters
+    ----------
+    players : list of Player
+        The players that are the keys of the matching.
+    others : list of Player
+        The players that may be matched to them.
+    partners : numpy.ndarray
+        The position in ``others`` of the match of each player in
+        ``players``, or -1 if they are unmatched.
+    """
+
+    def __init__(self, players, others, partners):
+        SingleMatching.__init__(self, None)
+        self.players = players
+        self.others = others
+        self.partners = np.asarray(partners, dtype=np.int64)
+        self._filled = False
+        self._stale = False
+
+    def _make_data(self):
+        """Make the dictionary described by the partners."""
+
+        others = self.others
+        return {
+            player: others[i] if i >= 0 else None
+            for player, i in zip(self.players, self.partners.tolist())
+        }
+
+    def _get_pairs(self):
+        """Get the positions of the players and matches of each pair."""
+
+        (players,) = np.nonzero(self.partners >= 0)
+        return players, self.partners[players]
+
+    def to_numpy(self):
+        """Get the array of partners of the matching."""
+
+        if self._stale:
+            return compact(self).to_numpy()
+
+        return self.partners
+
+
+class CompactMultipleMatching(_CompactMatching, MultipleMatching):
+    """A matching with multiple matches, stored in CSR form.
+
+    Parameters
+    ----------
+    players : list of Player
+        The players that are the keys of the matching.
+    others : list of Player
+        The players that may be matched to them.
+    indptr : numpy.ndarray
+        The offsets of the matches of each player in ``indices``.
+    indices : numpy.ndarray
+        The positions in ``others`` of the matches of every player, in
+        turn.
+    """
+
+    def __init__(self, players, others, indptr, indices):
+        MultipleMatching.__init__(self, None)
+        self.players = players
+        self.others = others
+        self.indptr = np.asarray(indptr, dtype=np.int64)
+        self.indices = np.asarray(indices, dtype=np.int64)
+        self._filled = False
+        self._stale = False
+
+    def _make_data(self):
+        """Make the dictionary described by the CSR arrays."""
+
+        others = self.others
+        flat = [others[i] for i in self.indices.tolist()]
+        indptr = self.indptr.tolist()
+
+        return {
+            player: flat[start:end]
+            for player, start, end in zip(self.players, indptr, indptr[1:])
+        }
+
+    def _get_pairs(self):
+        """Get the positions of the players and matches of each pair."""
+
+        counts = np.diff(self.indptr)
+        players = np.repeat(np.arange(len(self.players)), counts)
+        return players, self.indices
+
+    def to_numpy(self):
+        """Get the ``indptr`` and ``indices`` arrays of the matching."""
+
+        if self._stale:
+            return compact(self).to_numpy()
+
+        return self.indptr, self.indices
+
+
+def compact(matching):
+    """Get a compact copy of a matching.
+
+    The players that may be matched to the keys of the matching are
+    taken in the order they first appear as matches.
+    """
+
+    players = list(matching.keys())
+    if isinstance(matching, MultipleMatching):
+        flat = [other for player in players for other in matching[player]]
+        others = list(dict.fromkeys(flat))
+        index = {other: i for i, other in enumerate(others)}
+
+        indptr = np.zeros(len(players) + 1, dtype=np.int64)
+        np.cumsum(
+            [len(matching[player]) for player in players], out=indptr[1:]
+        )
+        indices = np.array([index[other] for other in flat], dtype=np.int64)
+
+        return CompactMultipleMatching(players, others, indptr, indices)
+
+    matches = [matching[player] for player in players]
+    others = list(dict.fromkeys(m for m in matches if m is not None))
+    index = {other: i for i, other in enumerate(others)}
+    partners = np.array(
+        [-1 if m is None else index[m] for m in matches], dtype=np.int64
+    )
+
+    return CompactSingleMatching(players, others, partners)
+
+
+def check_partners(matching):
+    """Check that the partners of a compact matching describe a matching.
+
+    Raise a ``ValueError`` if there is not a partner for each player,
+    if any partner is out of range or matched more than once, or if the
+    players are matched among themselves and the partners are not
+    symmetric.
+    """
+
+    partners = matching.partners
+    if partners.shape != (len(matching.players),):
+        raise ValueError(
+            f"There are {len(matching.players)} players but the partners "
+            f"have shape {partners.shape}."
+        )
+
+    _check_positions(partners[partners != -1], len(matching.others))
+
+    if matching.others is matching.players:
+        (matched,) = np.nonzero(partners >= 0)
+        if np.any(partners[partners[matched]] != matched):
+            raise ValueError("The partners of the players are not symmetric.")
+
+
+def check_csr(matching):
+    """Check that the CSR arrays of a compact matching describe a
+    matching.
+
+    Raise a ``ValueError`` if the offsets do not fit the players and
+    the matches, or if any match is out of range or matched more than
+    once.
+    """
+
+    indptr, indices = matching.indptr, matching.indices
+    if (
+        indptr.shape != (len(matching.players) + 1,)
+        or indices.ndim != 1
+        or indptr[0] != 0
+        or indptr[-1] != len(indices)
+        or np.any(np.diff(indptr) < 0)
+    ):
+        raise ValueError(
+            "The offsets of the matches do not fit the players and their "
+            "matches."
+        )
+
+    _check_positions(indices, len(matching.others))
+
+
+def _check_positions(positions, size):
+    """Check that some positions are distinct and in a range of ``size``."""
+
+    if positions.size and (positions.min() < 0 or positions.max() >= size):
+        raise ValueError(
+            f"Some matches are not between 0 and {size - 1}, or -1 for no "
+            "match."
+        )
+
+    if np.unique(positions).size != positions.size:
+        raise ValueError("Some players are matched more than once.")
+
+
+def to_pandas(records):
+    """Make a data frame from the records of a matching."""
+
+    try:
+        import pandas as pd
+    except ImportError as error:
+        raise ImportError(
+            "Exporting a matching to a data frame requires pandas."
+        ) from error
+
+    return pd.DataFrame.from_records(records)
+
+
+def _names(players):
+    """Get an array of the names of some players."""
+
+    try:
+        return _names_to_array(players, "players")
+    except ValueError:
+        return np.array([player.name for player in players], dtype=object)
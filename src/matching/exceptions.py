@@ -12,6 +12,20 @@ class MatchingError(Exception):
         super().__init__(self.message)
 
 
+class SolveInterruptedError(Exception):
+    """For when a solve is stopped before it finishes.
+
+    The ``reason`` is ``"time_budget"`` if the solve ran out of time and
+    ``"cancelled"`` if it was cancelled, and ``progress`` is the last
+    progress of the algorithm, if any.
+    """
+
+    def __init__(self, reason, progress=None):
+        self.reason = reason
+        self.progress = progress
+        super().__init__(f"The solve was stopped: {reason}.")
+
+
 class NoStableMatchingWarning(UserWarning):
     """For when a game does not have a complete stable matching."""
 
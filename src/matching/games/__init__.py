@@ -1,9 +1,9 @@
-"""Top-level imports for the `matching.games` subpackage."""
+"""Top-level imports for the `matching.games` subpackage.
 
-from .hospital_resident import HospitalResident
-from .stable_marriage import StableMarriage
-from .stable_roommates import StableRoommates
-from .student_allocation import StudentAllocation
+Each game is only imported when it is first used.
+"""
+
+from matching._lazy import attach
 
 __all__ = [
     "HospitalResident",
@@ -11,3 +11,13 @@ __all__ = [
     "StableRoommates",
     "StudentAllocation",
 ]
+
+__getattr__, __dir__ = attach(
+    __name__,
+    exports={
+        "HospitalResident": ".hospital_resident",
+        "StableMarriage": ".stable_marriage",
+        "StableRoommates": ".stable_roommates",
+        "StudentAllocation": ".student_allocation",
+    },
+)
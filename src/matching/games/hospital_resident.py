@@ -1,17 +1,23 @@
 """The HR game class and supporting functions."""
 
+import collections
 import copy
-import warnings
 
 from matching import BaseGame, MultipleMatching
 from matching import Player as Resident
-from matching.algorithms import hospital_resident
+from matching.algorithms import hospital_resident, hospital_resident_iter
 from matching.exceptions import (
     MatchingError,
     PlayerExcludedWarning,
     PreferencesChangedWarning,
 )
 from matching.players import Hospital
+from matching.validation import (
+    report_issue,
+    verify_capacities,
+    verify_prefs,
+    verify_reciprocated,
+)
 
 
 class HospitalResident(BaseGame):
@@ -39,6 +45,10 @@ class HospitalResident(BaseGame):
         Cleaning is reductive in nature, removing players from the game
         and/or other player's preferences if they do not meet the
         requirements of the game.
+    validate : str
+        How to check the inputs of the game. Must be one of ``"full"``
+        (the default), ``"fast"`` and ``"none"``. See
+        ``matching.validation`` for what each of them does.
 
     Attributes
     ----------
@@ -51,7 +61,13 @@ class HospitalResident(BaseGame):
         resident-hospital blocking pairs.
     """
 
-    def __init__(self, residents, hospitals, clean=False):
+    _player_classes = {"residents": Resident, "hospitals": Hospital}
+    _prefs_parties = {"residents": "hospitals", "hospitals": "residents"}
+    _matching_parties = ("residents", "hospitals")
+    _matching_keys = "hospitals"
+    _matching_class = MultipleMatching
+
+    def __init__(self, residents, hospitals, clean=False, validate="full"):
         residents, hospitals = copy.deepcopy([residents, hospitals])
         self.residents = residents
         self.hospitals = hospitals
@@ -61,11 +77,27 @@ class HospitalResident(BaseGame):
         self._all_hospitals = hospitals
 
         super().__init__(clean)
-        self.check_inputs()
+        self._validate(validate)
+
+    @classmethod
+    def _from_players(cls, clean=False, **parties):
+        """Create an instance from some players without copying or
+        checking them."""
+
+        game = super()._from_players(clean, **parties)
+        for party, players in parties.items():
+            setattr(game, f"_all_{party}", players)
+
+        return game
 
     @classmethod
     def create_from_dictionaries(
-        cls, resident_prefs, hospital_prefs, capacities, clean=False
+        cls,
+        resident_prefs,
+        hospital_prefs,
+        capacities,
+        clean=False,
+        validate="full",
     ):
         """Create an instance from a set of dictionaries.
 
@@ -73,27 +105,193 @@ class HospitalResident(BaseGame):
         along with a dictionary detailing the hospital capacities. If
         ``clean``, then remove players from the game and/or player
         preferences if they do not satisfy the conditions of the game.
+        The players are made afresh, so they are not copied again, and
+        they are checked as ``validate`` says.
         """
 
         residents, hospitals = _make_players(
             resident_prefs, hospital_prefs, capacities
         )
-        game = cls(residents, hospitals, clean)
+        game = cls._from_players(
+            clean, residents=residents, hospitals=hospitals
+        )
+        game._validate(validate)
 
         return game
 
-    def solve(self, optimal="resident"):
+    def solve(
+        self,
+        optimal="resident",
+        cache=None,
+        time_budget=None,
+        cancel_event=None,
+        engine="sequential",
+        backend="python",
+    ):
         """Solve the instance of HR. Return the matching.
 
         The party optimality can be controlled using the ``optimal``
-        parameter.
+        parameter. If a ``matching.cache.SolveCache`` is passed as
+        ``cache``, the matching is taken from there if this instance has
+        been solved before. Otherwise, the cache solves it with the other
+        arguments given here.
+
+        If a ``time_budget`` in seconds or a ``cancel_event``, such as a
+        ``threading.Event``, is given, the solve is stopped once it runs
+        out of time or the event is set. The players are then put back
+        as they were, and a ``matching.exceptions.SolveInterruptedError``
+        is raised. See ``solve_iter``. If the game was loaded with
+        ``load_checkpoint``, the solve carries on from the checkpoint.
+
+        With ``engine="rounds"``, every free resident proposes at once in
+        rounds of array operations, which is much faster on large
+        instances. This engine only finds resident-optimal matchings.
+        See ``matching.algorithms.hospital_resident``. With
+        ``backend="numba"``, a sequential solve run at once uses the
+        compiled kernel of the algorithm if numba is installed. See
+        ``matching.algorithms.kernels``.
         """
 
+        if self._checkpoint is not None:
+            return self._solve_until(
+                self.solve_iter(optimal, engine=engine),
+                time_budget,
+                cancel_event,
+            )
+
+        if cache is not None:
+            return cache.solve(
+                self,
+                optimal,
+                time_budget=time_budget,
+                cancel_event=cancel_event,
+                engine=engine,
+                backend=backend,
+            )
+
+        if time_budget is not None or cancel_event is not None:
+            return self._solve_until(
+                self.solve_iter(optimal, engine=engine),
+                time_budget,
+                cancel_event,
+            )
+
         self.matching = MultipleMatching(
-            hospital_resident(self.residents, self.hospitals, optimal)
+            hospital_resident(
+                self.residents, self.hospitals, optimal, engine, backend
+            )
         )
         return self.matching
 
+    def solve_iter(self, optimal="resident", chunk=1000, engine="sequential"):
+        """Solve the instance of HR step by step.
+
+        This is a generator that yields a
+        ``matching.algorithms.Progress`` after every ``chunk`` proposals,
+        giving the number of free residents (or hospitals, if
+        ``optimal`` is ``"hospital"``) and of proposals so far. Once the
+        algorithm finishes, the matching is set and returned. If the
+        generator is closed before then, the players are put back as
+        they were. While the generator is paused, the state of the
+        solve can be saved with ``checkpoint``.
+
+        With ``engine="rounds"``, the progress is yielded after every
+        round of proposals instead, and the solve cannot be saved.
+        """
+
+        state = self._get_solve_state(optimal)
+        return self._solve_steps(
+            hospital_resident_iter(
+                self.residents, self.hospitals, optimal, chunk, state, engine
+            ),
+            state,
+            optimal,
+        )
+
+    def sweep_capacities(self, scenarios, workers=None):
+        """Find how the resident-optimal matching changes under some
+        scenarios of hospital capacities.
+
+        Each scenario is a dictionary mapping the names of some
+        hospitals to new capacities. The instance is indexed and solved
+        once, and scenarios that only lower capacities carry on from
+        that solution. The game itself is left as it is. See
+        ``matching.sweep.sweep_capacities`` for the table of changes
+        that is returned.
+        """
+
+        from matching.sweep import sweep_capacities
+
+        return sweep_capacities(self, scenarios, workers)
+
+    def reduce(self):
+        """Remove pairs that cannot be part of any stable matching.
+
+        Two rules are applied until neither removes any more pairs:
+
+            - If at least as many residents rank a hospital first as it
+              has capacity, then the hospital takes its favourite such
+              residents in every stable matching. Any resident it ranks
+              below all of them is removed from its preferences.
+            - If a resident is among the first ``capacity`` residents in
+              the preferences of a hospital, then they are matched to
+              that hospital or one they prefer in every stable matching.
+              Any hospital they rank below it is removed from their
+              preferences.
+
+        The stable matchings of the game are the same after reducing it,
+        but they are found faster. This method should be used before
+        the game is solved. Return the number of pairs removed.
+        """
+
+        removed = 0
+        pairs = self._get_redundant_pairs()
+        while pairs:
+            self._remove_pairs(pairs)
+            removed += len(pairs)
+            pairs = self._get_redundant_pairs()
+
+        return removed
+
+    def _get_redundant_pairs(self):
+        """Get the resident-hospital pairs that either rule of the
+        reduction removes."""
+
+        pairs = set()
+        for hospital in self.hospitals:
+            capacity = hospital.capacity
+            firsts = [
+                resident
+                for resident in hospital.prefs
+                if resident.prefs and resident.prefs[0] == hospital
+            ]
+            if 0 < capacity <= len(firsts):
+                idx = hospital.prefs.index(firsts[capacity - 1])
+                pairs.update(
+                    (resident, hospital)
+                    for resident in hospital.prefs[idx + 1 :]
+                )
+
+        guarantees = {
+            hospital: set(hospital.prefs[: max(hospital.capacity, 0)])
+            for hospital in self.hospitals
+        }
+        pairs.update(_get_guaranteed_successors(self.residents, guarantees))
+
+        return pairs
+
+    def _remove_pairs(self, pairs):
+        """Remove some resident-hospital pairs from the preferences of
+        both players."""
+
+        forgotten = collections.defaultdict(set)
+        for resident, hospital in pairs:
+            forgotten[resident].add(hospital)
+            forgotten[hospital].add(resident)
+
+        for player, others in forgotten.items():
+            player.set_prefs([o for o in player.prefs if o not in others])
+
     def check_validity(self):
         """Check whether the current matching is valid."""
 
@@ -143,16 +341,30 @@ class HospitalResident(BaseGame):
         blocking_pairs = []
         for resident in self.residents:
             for hospital in self.hospitals:
-                if (
-                    _check_mutual_preference(resident, hospital)
-                    and _check_resident_unhappy(resident, hospital)
-                    and _check_hospital_unhappy(resident, hospital)
-                ):
+                if self._is_blocking_pair(resident, hospital):
                     blocking_pairs.append((resident, hospital))
 
-        self.blocking_pairs = blocking_pairs
+        self._set_blocking_pairs(blocking_pairs)
         return not any(blocking_pairs)
 
+    def _get_pairs_with(self, player):
+        """Get the pairs that could block with a player in them. These
+        are the pairs of the player and those they rank."""
+
+        if isinstance(player, Hospital):
+            return [(resident, player) for resident in player.prefs]
+
+        return [(player, hospital) for hospital in player.prefs]
+
+    def _is_blocking_pair(self, resident, hospital):
+        """Check whether a resident-hospital pair blocks the matching."""
+
+        return (
+            _check_mutual_preference(resident, hospital)
+            and _check_resident_unhappy(resident, hospital)
+            and _check_hospital_unhappy(resident, hospital)
+        )
+
     def check_inputs(self):
         """Check if any rules of the game have been broken.
 
@@ -176,16 +388,34 @@ class HospitalResident(BaseGame):
 
         self._check_inputs_player_capacity("hospitals", "residents")
 
+    def verify_inputs(self):
+        """Check the structure of the game in time linear in its size.
+
+        A ``ValueError`` is raised at the first violation found, except
+        for empty preference lists, which are flagged as warnings and
+        removed as in ``check_inputs``.
+        """
+
+        verify_prefs(self.residents, self.hospitals)
+        verify_prefs(self.hospitals, self.residents)
+        verify_reciprocated(self.residents, self.hospitals)
+
+        self._check_inputs_player_prefs_nonempty("residents", "hospitals")
+        self._check_inputs_player_prefs_nonempty("hospitals", "residents")
+
+        verify_capacities(self.hospitals)
+
     def _check_inputs_player_prefs_all_reciprocated(self, party):
         """Check everyone has only ranked players who ranked them."""
 
         for player in vars(self)[party]:
             for other in player.prefs:
                 if player not in other.prefs:
-                    warnings.warn(
-                        PreferencesChangedWarning(
-                            f"{player} ranked {other} but they did not."
-                        )
+                    report_issue(
+                        PreferencesChangedWarning,
+                        "{} ranked {} but they did not.",
+                        player,
+                        other,
                     )
                     if self.clean:
                         player._forget(other)
@@ -201,10 +431,11 @@ class HospitalResident(BaseGame):
             ]
             for other in others_that_ranked:
                 if other not in player.prefs:
-                    warnings.warn(
-                        PreferencesChangedWarning(
-                            f"{other} ranked {player} but they did not."
-                        )
+                    report_issue(
+                        PreferencesChangedWarning,
+                        "{} ranked {} but they did not.",
+                        other,
+                        player,
                     )
                     if self.clean:
                         other._forget(player)
@@ -214,12 +445,29 @@ class HospitalResident(BaseGame):
 
         for player in vars(self)[party]:
             if player.capacity < 1:
-                warnings.warn(PlayerExcludedWarning(player))
+                report_issue(PlayerExcludedWarning, "{}", player)
 
                 if self.clean:
                     self._remove_player(player, party, other_party)
 
 
+def _get_guaranteed_successors(residents, guarantees):
+    """Get the pairs of each resident with the hospitals they rank below
+    the first hospital that guarantees them a place."""
+
+    pairs = []
+    for resident in residents:
+        for idx, hospital in enumerate(resident.prefs):
+            if resident in guarantees.get(hospital, ()):
+                pairs.extend(
+                    (resident, successor)
+                    for successor in resident.prefs[idx + 1 :]
+                )
+                break
+
+    return pairs
+
+
 def _check_mutual_preference(resident, hospital):
     """Check whether two players have a preference of each other."""
 
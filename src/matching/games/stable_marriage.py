@@ -3,7 +3,7 @@
 import copy
 
 from matching import BaseGame, Player, SingleMatching
-from matching.algorithms import stable_marriage
+from matching.algorithms import stable_marriage, stable_marriage_iter
 from matching.exceptions import MatchingError
 
 
@@ -18,6 +18,14 @@ class StableMarriage(BaseGame):
     reviewers : list of Player
         The reviewers in the game. Each reviewer must rank all elements
         in ``suitors``.
+    clean : bool
+        Indicator for whether the players of the game should be cleaned.
+        If so, anyone ranked more than once is kept only where they
+        first appear, before the other checks are made.
+    validate : str
+        How to check the inputs of the game. Must be one of ``"full"``
+        (the default), ``"fast"`` and ``"none"``. See
+        ``matching.validation`` for what each of them does.
 
     Attributes
     ----------
@@ -30,35 +38,105 @@ class StableMarriage(BaseGame):
         current match. Initialises as ``None``.
     """
 
-    def __init__(self, suitors, reviewers):
+    _player_classes = {"suitors": Player, "reviewers": Player}
+    _prefs_parties = {"suitors": "reviewers", "reviewers": "suitors"}
+    _matching_parties = ("suitors", "reviewers")
+    _matching_keys = "suitors"
+    _matching_class = SingleMatching
+
+    def __init__(self, suitors, reviewers, clean=False, validate="full"):
         suitors, reviewers = copy.deepcopy([suitors, reviewers])
         self.suitors = suitors
         self.reviewers = reviewers
 
-        super().__init__()
-        self.check_inputs()
+        super().__init__(clean)
+        self._validate(validate)
 
     @classmethod
-    def create_from_dictionaries(cls, suitor_prefs, reviewer_prefs):
+    def create_from_dictionaries(
+        cls, suitor_prefs, reviewer_prefs, clean=False, validate="full"
+    ):
         """Create an instance of SM from two preference dictionaries."""
 
         suitors, reviewers = _make_players(suitor_prefs, reviewer_prefs)
-        game = cls(suitors, reviewers)
+        game = cls._from_players(clean, suitors=suitors, reviewers=reviewers)
+        game._validate(validate)
 
         return game
 
-    def solve(self, optimal="suitor"):
+    def solve(
+        self,
+        optimal="suitor",
+        cache=None,
+        time_budget=None,
+        cancel_event=None,
+        backend="python",
+    ):
         """Solve the instance of SM. Return the matching.
 
         The party optimality can be controlled using the ``optimal``
-        parameter.
+        parameter. If a ``matching.cache.SolveCache`` is passed as
+        ``cache``, the matching is taken from there if this instance has
+        been solved before. Otherwise, the cache solves it with the other
+        arguments given here.
+
+        If a ``time_budget`` in seconds or a ``cancel_event``, such as a
+        ``threading.Event``, is given, the solve is stopped once it runs
+        out of time or the event is set. The players are then put back
+        as they were, and a ``matching.exceptions.SolveInterruptedError``
+        is raised. See ``solve_iter``. If the game was loaded with
+        ``load_checkpoint``, the solve carries on from the checkpoint.
+
+        With ``backend="numba"``, a solve run at once uses the compiled
+        kernel of the algorithm if numba is installed. See
+        ``matching.algorithms.kernels``.
         """
 
+        if self._checkpoint is not None:
+            return self._solve_until(
+                self.solve_iter(optimal), time_budget, cancel_event
+            )
+
+        if cache is not None:
+            return cache.solve(
+                self,
+                optimal,
+                time_budget=time_budget,
+                cancel_event=cancel_event,
+                backend=backend,
+            )
+
+        if time_budget is not None or cancel_event is not None:
+            return self._solve_until(
+                self.solve_iter(optimal), time_budget, cancel_event
+            )
+
         self.matching = SingleMatching(
-            stable_marriage(self.suitors, self.reviewers, optimal)
+            stable_marriage(self.suitors, self.reviewers, optimal, backend)
         )
         return self.matching
 
+    def solve_iter(self, optimal="suitor", chunk=1000):
+        """Solve the instance of SM step by step.
+
+        This is a generator that yields a
+        ``matching.algorithms.Progress`` after every ``chunk`` proposals,
+        giving the number of free players in the proposing party and of
+        proposals so far. Once the algorithm finishes, the matching is
+        set and returned. If the generator is closed before then, the
+        players are put back as they were. While the generator is
+        paused, the state of the solve can be saved with ``checkpoint``.
+        """
+
+        state = self._get_solve_state(optimal)
+        return self._solve_steps(
+            stable_marriage_iter(
+                self.suitors, self.reviewers, optimal, chunk, state
+            ),
+            state,
+            optimal,
+        )
+
     def check_validity(self):
         """Check whether the current matching is valid."""
 
@@ -81,14 +159,28 @@ class StableMarriage(BaseGame):
         blocking_pairs = []
         for suitor in self.suitors:
             for reviewer in self.reviewers:
-                if suitor.prefers(
-                    reviewer, suitor.matching
-                ) and reviewer.prefers(suitor, reviewer.matching):
+                if self._is_blocking_pair(suitor, reviewer):
                     blocking_pairs.append((suitor, reviewer))
 
-        self.blocking_pairs = blocking_pairs
+        self._set_blocking_pairs(blocking_pairs)
         return not any(blocking_pairs)
 
+    def _get_pairs_with(self, player):
+        """Get the pairs that could block with a player in them. These
+        are the pairs of the player and everyone in the other party."""
+
+        if player in self._get_positions("suitors"):
+            return [(player, reviewer) for reviewer in self.reviewers]
+
+        return [(suitor, player) for suitor in self.suitors]
+
+    def _is_blocking_pair(self, suitor, reviewer):
+        """Check whether a suitor-reviewer pair blocks the matching."""
+
+        return suitor.prefers(reviewer, suitor.matching) and reviewer.prefers(
+            suitor, reviewer.matching
+        )
+
     def _check_for_unmatched_players(self):
         """Check everyone has a match."""
 
@@ -128,7 +220,15 @@ class StableMarriage(BaseGame):
         return issues
 
     def check_inputs(self):
-        """Raise an error if any of the game's rules do not hold."""
+        """Raise an error if any of the game's rules do not hold.
+
+        If the game is to be cleaned, any repeated preferences are
+        removed first.
+        """
+
+        if self.clean:
+            self._check_inputs_player_prefs_unique("suitors")
+            self._check_inputs_player_prefs_unique("reviewers")
 
         self._check_num_players()
         for suitor in self.suitors:
@@ -136,6 +236,17 @@ class StableMarriage(BaseGame):
         for reviewer in self.reviewers:
             self._check_player_ranks(reviewer)
 
+    def verify_inputs(self):
+        """Raise an error if any of the game's rules do not hold, or if
+        anyone has ranked another player more than once."""
+
+        self.check_inputs()
+        for player in self.suitors + self.reviewers:
+            if len(player.prefs) != len(set(player.prefs)):
+                raise ValueError(
+                    f"{player} has ranked a player multiple times."
+                )
+
     def _check_num_players(self):
         """Check that the number of suitors and reviewers are equal."""
 
@@ -3,7 +3,7 @@
 import copy
 
 from matching import BaseGame, Player, SingleMatching
-from matching.algorithms import stable_roommates
+from matching.algorithms import stable_roommates, stable_roommates_iter
 from matching.exceptions import MatchingError
 
 
@@ -14,6 +14,14 @@ class StableRoommates(BaseGame):
     ----------
     players : list of Player
         The players in the game. Each must rank all other players.
+    clean : bool
+        Indicator for whether the players of the game should be cleaned.
+        If so, anyone ranked more than once is kept only where they
+        first appear, before the other checks are made.
+    validate : str
+        How to check the inputs of the game. Must be one of ``"full"``
+        (the default), ``"fast"`` and ``"none"``. See
+        ``matching.validation`` for what each of them does.
 
     Attributes
     ----------
@@ -23,28 +31,93 @@ class StableRoommates(BaseGame):
         Initialises as ``None``.
     """
 
-    def __init__(self, players):
+    _player_classes = {"players": Player}
+    _prefs_parties = {"players": "players"}
+    _matching_parties = ("players", "players")
+    _matching_keys = "players"
+    _matching_class = SingleMatching
+
+    def __init__(self, players, clean=False, validate="full"):
         players = copy.deepcopy(players)
         self.players = players
 
-        super().__init__()
-        self.check_inputs()
+        super().__init__(clean)
+        self._validate(validate)
 
     @classmethod
-    def create_from_dictionary(cls, player_prefs):
+    def create_from_dictionary(
+        cls, player_prefs, clean=False, validate="full"
+    ):
         """Create an instance of SR from a preference dictionary."""
 
         players = _make_players(player_prefs)
-        game = cls(players)
+        game = cls._from_players(clean, players=players)
+        game._validate(validate)
 
         return game
 
-    def solve(self):
-        """Attempt to solve the instance of SR. Return the matching."""
+    def solve(
+        self, cache=None, time_budget=None, cancel_event=None, backend="python"
+    ):
+        """Attempt to solve the instance of SR. Return the matching.
+
+        If a ``matching.cache.SolveCache`` is passed as ``cache``, the
+        matching is taken from there if this instance has been solved
+        before. Otherwise, the cache solves it with the other arguments
+        given here.
+
+        If a ``time_budget`` in seconds or a ``cancel_event``, such as a
+        ``threading.Event``, is given, the solve is stopped once it runs
+        out of time or the event is set. The players are then put back
+        as they were, and a ``matching.exceptions.SolveInterruptedError``
+        is raised. See ``solve_iter``. If the game was loaded with
+        ``load_checkpoint``, the solve carries on from the checkpoint.
+
+        With ``backend="numba"``, a solve run at once uses the compiled
+        kernels of the algorithm if numba is installed. See
+        ``matching.algorithms.kernels``.
+        """
 
-        self.matching = SingleMatching(stable_roommates(self.players))
+        if self._checkpoint is not None:
+            return self._solve_until(
+                self.solve_iter(), time_budget, cancel_event
+            )
+
+        if cache is not None:
+            return cache.solve(
+                self,
+                time_budget=time_budget,
+                cancel_event=cancel_event,
+                backend=backend,
+            )
+
+        if time_budget is not None or cancel_event is not None:
+            return self._solve_until(
+                self.solve_iter(), time_budget, cancel_event
+            )
+
+        self.matching = SingleMatching(stable_roommates(self.players, backend))
         return self.matching
 
+    def solve_iter(self, chunk=1000):
+        """Attempt to solve the instance of SR step by step.
+
+        This is a generator that yields a
+        ``matching.algorithms.Progress`` after every ``chunk`` proposals
+        in the first phase of the algorithm, and every ``chunk`` cycles
+        removed in the second. In the second phase, the players that
+        still have more than one preference count as free. Once the
+        algorithm finishes, the matching is set and returned. If the
+        generator is closed before then, the players are put back as
+        they were. While the generator is paused, the state of the
+        solve can be saved with ``checkpoint``.
+        """
+
+        state = self._get_solve_state()
+        return self._solve_steps(
+            stable_roommates_iter(self.players, chunk, state), state
+        )
+
     def check_validity(self):
         """Check whether the current matching is valid."""
 
@@ -74,18 +147,54 @@ class StableRoommates(BaseGame):
             others = [p for p in self.players if p != player]
             for other in others:
                 if (other, player) not in blocking_pairs:
-                    both_matched = player.matching and other.matching
-                    prefer_each_other = player.prefers(
-                        other, player.matching
-                    ) and other.prefers(player, other.matching)
-                    if both_matched and prefer_each_other:
+                    if self._is_blocking_pair(player, other):
                         blocking_pairs.append((player, other))
 
-        self.blocking_pairs = blocking_pairs
+        self._set_blocking_pairs(blocking_pairs)
         return not any(blocking_pairs)
 
+    def recheck_stability(self):
+        """Check for blocking pairs again after some matches have been
+        changed through the matching. As with ``check_stability``, the
+        matching is not stable if anyone is unmatched."""
+
+        if None in self.matching.values():
+            return False
+
+        return super().recheck_stability()
+
+    def _get_pairs_with(self, player):
+        """Get the pairs that could block with a player in them. These
+        are the pairs of the player and everyone else, with whoever
+        comes first in the game first."""
+
+        positions = self._get_positions("players")
+        position = positions.get(player)
+        return [
+            (player, other) if position < positions[other] else (other, player)
+            for other in self.players
+            if other != player
+        ]
+
+    def _is_blocking_pair(self, player, other):
+        """Check whether a pair of players blocks the matching."""
+
+        both_matched = player.matching and other.matching
+        prefer_each_other = player.prefers(
+            other, player.matching
+        ) and other.prefers(player, other.matching)
+
+        return both_matched and prefer_each_other
+
     def check_inputs(self):
-        """Check that all players have ranked all other players."""
+        """Check that all players have ranked all other players.
+
+        If the game is to be cleaned, any repeated preferences are
+        removed first.
+        """
+
+        if self.clean:
+            self._check_inputs_player_prefs_unique("players")
 
         for player in self.players:
             others = {p for p in self.players if p != player}
@@ -97,6 +206,17 @@ class StableRoommates(BaseGame):
 
         return True
 
+    def verify_inputs(self):
+        """Raise an error if any player has not ranked all other players
+        exactly once."""
+
+        self.check_inputs()
+        for player in self.players:
+            if len(player.prefs) != len(self.players) - 1:
+                raise ValueError(
+                    f"{player} has ranked a player multiple times."
+                )
+
 
 def _make_players(player_prefs):
     """Make a set of ``Player`` instances from the dictionary."""
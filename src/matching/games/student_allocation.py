@@ -1,18 +1,25 @@
 """The SA game class and supporting functions."""
 
+import collections
 import copy
-import warnings
 
 from matching import MultipleMatching
 from matching import Player as Student
-from matching.algorithms import student_allocation
+from matching.algorithms import student_allocation, student_allocation_iter
 from matching.exceptions import (
     CapacityChangedWarning,
     MatchingError,
     PreferencesChangedWarning,
 )
 from matching.games import HospitalResident
+from matching.games.hospital_resident import _get_guaranteed_successors
 from matching.players import Project, Supervisor
+from matching.validation import (
+    report_issue,
+    verify_capacities,
+    verify_prefs,
+    verify_reciprocated,
+)
 
 
 class StudentAllocation(HospitalResident):
@@ -49,6 +56,10 @@ class StudentAllocation(HospitalResident):
     clean : bool
         An indicator as to whether the players passed to the game should
         be cleaned in a reductive fashion. Defaults to ``False``.
+    validate : str
+        How to check the inputs of the game. Must be one of ``"full"``
+        (the default), ``"fast"`` and ``"none"``. See
+        ``matching.validation`` for what each of them does.
 
     Attributes
     ----------
@@ -62,7 +73,22 @@ class StudentAllocation(HospitalResident):
         student-project blocking pairs.
     """
 
-    def __init__(self, students, projects, supervisors, clean=False):
+    _player_classes = {
+        "students": Student,
+        "projects": Project,
+        "supervisors": Supervisor,
+    }
+    _prefs_parties = {
+        "students": "projects",
+        "projects": "students",
+        "supervisors": "students",
+    }
+    _matching_parties = ("students", "projects")
+    _matching_keys = "projects"
+
+    def __init__(
+        self, students, projects, supervisors, clean=False, validate="full"
+    ):
         students, projects, supervisors = copy.deepcopy(
             [students, projects, supervisors]
         )
@@ -76,8 +102,19 @@ class StudentAllocation(HospitalResident):
 
         self.clean = clean
 
-        super().__init__(students, projects, clean)
-        self.check_inputs()
+        super().__init__(students, projects, clean, validate)
+        self._validate(validate)
+
+    @classmethod
+    def _from_players(cls, clean=False, **parties):
+        """Create an instance from some players without copying or
+        checking them."""
+
+        game = super()._from_players(clean, **parties)
+        game.residents = game.students
+        game.hospitals = game.projects
+
+        return game
 
     def _remove_player(self, player, player_party, other_party=None):
         """Remove a player from the game.
@@ -88,6 +125,7 @@ class StudentAllocation(HospitalResident):
 
         if player_party == "supervisors":
             self.supervisors.remove(player)
+            self._forget_index(player, "supervisors")
             for project in player.projects:
                 super()._remove_player(project, "projects", "students")
 
@@ -103,12 +141,15 @@ class StudentAllocation(HospitalResident):
         project_capacities,
         supervisor_capacities,
         clean=False,
+        validate="full",
     ):
         """Create an instance of SA from a set of dictionaries.
 
         SA requires preference dictionaries for students and
         supervisors, a project-supervisor affiliation dictionary, and
         a capacity dictionary for both the projects and supervisors.
+        The players are made afresh, so they are not copied again, and
+        they are checked as ``validate`` says.
         """
 
         students, projects, supervisors = _make_players(
@@ -118,25 +159,165 @@ class StudentAllocation(HospitalResident):
             project_capacities,
             supervisor_capacities,
         )
-        game = cls(students, projects, supervisors, clean)
+        game = cls._from_players(
+            clean,
+            students=students,
+            projects=projects,
+            supervisors=supervisors,
+        )
+        game._validate(validate)
 
         return game
 
-    def solve(self, optimal="student"):
+    def solve(
+        self,
+        optimal="student",
+        cache=None,
+        time_budget=None,
+        cancel_event=None,
+        engine="sequential",
+        backend="python",
+    ):
         """Solve the instance of SA.
 
         Party optimality can be controlled using the ``optimal``
         parameter. Solutions can either be student-optimal or
-        supervisor-optimal.
+        supervisor-optimal. If a ``matching.cache.SolveCache`` is passed
+        as ``cache``, the matching is taken from there if this instance
+        has been solved before. Otherwise, the cache solves it with the
+        other arguments given here.
+
+        If a ``time_budget`` in seconds or a ``cancel_event``, such as a
+        ``threading.Event``, is given, the solve is stopped once it runs
+        out of time or the event is set. The players are then put back
+        as they were, and a ``matching.exceptions.SolveInterruptedError``
+        is raised. See ``solve_iter``. If the game was loaded with
+        ``load_checkpoint``, the solve carries on from the checkpoint.
+
+        With ``engine="rounds"``, every free student proposes at once in
+        rounds of array operations, which is much faster on large
+        instances. This engine only finds student-optimal matchings.
+        See ``matching.algorithms.student_allocation``. With
+        ``backend="numba"``, a sequential student-optimal solve run at
+        once uses the compiled kernel of the algorithm if numba is
+        installed. See ``matching.algorithms.kernels``.
         """
 
+        if self._checkpoint is not None:
+            return self._solve_until(
+                self.solve_iter(optimal, engine=engine),
+                time_budget,
+                cancel_event,
+            )
+
+        if cache is not None:
+            return cache.solve(
+                self,
+                optimal,
+                time_budget=time_budget,
+                cancel_event=cancel_event,
+                engine=engine,
+                backend=backend,
+            )
+
+        if time_budget is not None or cancel_event is not None:
+            return self._solve_until(
+                self.solve_iter(optimal, engine=engine),
+                time_budget,
+                cancel_event,
+            )
+
         self.matching = MultipleMatching(
             student_allocation(
-                self.students, self.projects, self.supervisors, optimal
+                self.students,
+                self.projects,
+                self.supervisors,
+                optimal,
+                engine,
+                backend,
             )
         )
         return self.matching
 
+    def solve_iter(self, optimal="student", chunk=1000, engine="sequential"):
+        """Solve the instance of SA step by step.
+
+        This is a generator that yields a
+        ``matching.algorithms.Progress`` after every ``chunk`` proposals,
+        giving the number of free students (or supervisors, if
+        ``optimal`` is ``"supervisor"``) and of proposals so far. Once
+        the algorithm finishes, the matching is set and returned. If the
+        generator is closed before then, the players are put back as
+        they were. While the generator is paused, the state of the
+        solve can be saved with ``checkpoint``.
+
+        With ``engine="rounds"``, the progress is yielded after every
+        round of proposals instead, and the solve cannot be saved.
+        """
+
+        state = self._get_solve_state(optimal)
+        return self._solve_steps(
+            student_allocation_iter(
+                self.students,
+                self.projects,
+                self.supervisors,
+                optimal,
+                chunk,
+                state,
+                engine,
+            ),
+            state,
+            optimal,
+        )
+
+    def reduce(self):
+        """Remove pairs that cannot be part of any stable matching.
+
+        If a student is among the first ``capacity`` students in the
+        preferences of both a project and its supervisor, then they are
+        matched to that project or one they prefer in every stable
+        matching. Any project they rank below it is removed from their
+        preferences, and this is repeated until no more pairs are
+        removed.
+
+        The other rule used for HR does not hold in SA, since a
+        supervisor may be full before all of its projects are. Return
+        the number of pairs removed.
+        """
+
+        return super().reduce()
+
+    def _get_redundant_pairs(self):
+        """Get the student-project pairs that the reduction removes."""
+
+        guarantees = {}
+        for project in self.projects:
+            supervisor = project.supervisor
+            guarantees[project] = set(
+                project.prefs[: max(project.capacity, 0)]
+            ).intersection(supervisor.prefs[: max(supervisor.capacity, 0)])
+
+        return set(_get_guaranteed_successors(self.students, guarantees))
+
+    def _remove_pairs(self, pairs):
+        """Remove some student-project pairs from the preferences of both
+        players, and make supervisors forget any student that none of
+        their projects rank any longer."""
+
+        super()._remove_pairs(pairs)
+
+        forgotten = collections.defaultdict(set)
+        for student, project in pairs:
+            forgotten[project.supervisor].add(student)
+
+        for supervisor, students in forgotten.items():
+            supervisor.prefs = [
+                student
+                for student in supervisor.prefs
+                if supervisor._project_counts[student]
+                or student not in students
+            ]
+
     def check_validity(self):
         """Check whether the current matching is valid."""
 
@@ -164,16 +345,39 @@ class StudentAllocation(HospitalResident):
         blocking_pairs = []
         for student in self.students:
             for project in self.projects:
-                if (
-                    project in student.prefs
-                    and _check_student_unhappy(student, project)
-                    and _check_project_unhappy(project, student)
-                ):
+                if self._is_blocking_pair(student, project):
                     blocking_pairs.append((student, project))
 
-        self.blocking_pairs = blocking_pairs
+        self._set_blocking_pairs(blocking_pairs)
         return not any(blocking_pairs)
 
+    def _get_pairs_with(self, player):
+        """Get the pairs that could block with a player in them.
+
+        For a student, these are the pairs of the student and the
+        projects they rank. For a project, these are the pairs of every
+        project offered by its supervisor and the students they rank,
+        since the supervisor is affected by any change to the project.
+        """
+
+        if isinstance(player, Project):
+            return [
+                (student, project)
+                for project in player.supervisor.projects
+                for student in project.prefs
+            ]
+
+        return [(player, project) for project in player.prefs]
+
+    def _is_blocking_pair(self, student, project):
+        """Check whether a student-project pair blocks the matching."""
+
+        return (
+            project in student.prefs
+            and _check_student_unhappy(student, project)
+            and _check_project_unhappy(project, student)
+        )
+
     def check_inputs(self):
         """Check if any rules of the game have been broken.
 
@@ -208,6 +412,55 @@ class StudentAllocation(HospitalResident):
         self._check_inputs_supervisor_capacities_sufficient()
         self._check_inputs_supervisor_capacities_necessary()
 
+    def verify_inputs(self):
+        """Check the structure of the game in time linear in its size.
+
+        A ``ValueError`` is raised at the first violation found, except
+        for empty preference lists, which are flagged as warnings and
+        removed as in ``check_inputs``.
+        """
+
+        verify_prefs(self.students, self.projects)
+        verify_prefs(self.projects, self.students)
+        verify_prefs(self.supervisors, self.students)
+        verify_reciprocated(self.students, self.projects)
+
+        self._check_inputs_player_prefs_nonempty("students", "projects")
+        self._check_inputs_player_prefs_nonempty("supervisors", "students")
+        self._check_inputs_player_prefs_nonempty("projects", "students")
+
+        verify_capacities(self.projects)
+        verify_capacities(self.supervisors)
+
+        ranked_by = collections.defaultdict(set)
+        for student in self.students:
+            for project in student.prefs:
+                ranked_by[project.supervisor].add(student)
+
+        for supervisor in self.supervisors:
+            if set(supervisor.prefs) != ranked_by[supervisor]:
+                raise ValueError(
+                    f"{supervisor} has not ranked exactly the students that "
+                    "ranked their projects."
+                )
+
+            total_project_capacity = 0
+            for project in supervisor.projects:
+                if project.capacity > supervisor.capacity:
+                    raise ValueError(
+                        f"{project} has a capacity of {project.capacity} but "
+                        f"its supervisor has a capacity of "
+                        f"{supervisor.capacity}."
+                    )
+                total_project_capacity += project.capacity
+
+            if supervisor.capacity > total_project_capacity:
+                raise ValueError(
+                    f"{supervisor} has a capacity of {supervisor.capacity} "
+                    "but their projects have a capacity of "
+                    f"{total_project_capacity}."
+                )
+
     def _check_inputs_player_prefs_all_reciprocated(self, party):
         """Check everyone has only ranked players who ranked them.
 
@@ -222,11 +475,12 @@ class StudentAllocation(HospitalResident):
                         p.supervisor for p in student.prefs
                     }
                     if supervisor not in student_prefs_supervisors:
-                        warnings.warn(
-                            PreferencesChangedWarning(
-                                f"{supervisor} ranked {student} but they did "
-                                "not rank any of their projects."
-                            )
+                        report_issue(
+                            PreferencesChangedWarning,
+                            "{} ranked {} but they did not rank any of their "
+                            "projects.",
+                            supervisor,
+                            student,
                         )
 
                         if self.clean:
@@ -256,11 +510,12 @@ class StudentAllocation(HospitalResident):
 
                 for student in students_that_ranked:
                     if student not in supervisor.prefs:
-                        warnings.warn(
-                            PreferencesChangedWarning(
-                                f"{student} ranked a project provided by "
-                                f"{supervisor} but they did not."
-                            )
+                        report_issue(
+                            PreferencesChangedWarning,
+                            "{} ranked a project provided by {} but they did "
+                            "not.",
+                            student,
+                            supervisor,
                         )
 
                         if self.clean:
@@ -280,12 +535,13 @@ class StudentAllocation(HospitalResident):
         for supervisor in self.supervisors:
             for project in supervisor.projects:
                 if project.capacity > supervisor.capacity:
-                    warnings.warn(
-                        CapacityChangedWarning(
-                            f"{project} has a capacity of {project.capacity} "
-                            "but its supervisor has a capacity of "
-                            f"{supervisor.capacity}."
-                        )
+                    report_issue(
+                        CapacityChangedWarning,
+                        "{} has a capacity of {} but its supervisor has a "
+                        "capacity of {}.",
+                        project,
+                        project.capacity,
+                        supervisor.capacity,
                     )
 
                     if self.clean:
@@ -300,12 +556,13 @@ class StudentAllocation(HospitalResident):
             )
 
             if supervisor.capacity > total_project_capacity:
-                warnings.warn(
-                    CapacityChangedWarning(
-                        f"{supervisor} has a capacity of "
-                        f"{supervisor.capacity} but their projects have a "
-                        f"capacity of {total_project_capacity}"
-                    )
+                report_issue(
+                    CapacityChangedWarning,
+                    "{} has a capacity of {} but their projects have a "
+                    "capacity of {}",
+                    supervisor,
+                    supervisor.capacity,
+                    total_project_capacity,
                 )
 
                 if self.clean:
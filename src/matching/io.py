@@ -0,0 +1,592 @@
+"""Functions for reading and writing game instances as arrays.
+
+Instances can also be read from large files of preferences in chunks,
+building the arrays for the game directly. See
+``read_hospital_resident``.
+
+A game is saved as an uncompressed ``.npz`` archive in which every
+member is a plain ``.npy`` array. Since nothing is compressed, each
+member can be mapped straight from disk with ``numpy.memmap`` by
+``read_arrays``, which makes large archives quick to read. A game made
+from the arrays with ``game_from_arrays`` builds all of its players in
+memory, so mapping the arrays does not lower the memory a loaded game
+uses.
+
+For each party of players in a game (``residents`` and ``hospitals``
+in HR, say), the archive holds the following members:
+
+- ``{party}``: the names of the players. Names must all be strings or
+  all be integers. Arrays of strings drop any null characters at the
+  end of a string, so names that end in one cannot be stored, and
+  saving a game with such names raises a ``ValueError``.
+- ``{party}_capacity``: the capacity of each player, if the players of
+  the party have capacities.
+- ``{party}_indptr`` and ``{party}_indices``: the preferences of the
+  party in compressed sparse row (CSR) form. The preferences of the
+  ``i``-th player are the players of the party they rank at positions
+  ``indices[indptr[i]:indptr[i + 1]]``.
+- ``{party}_original_indptr`` and ``{party}_original_indices``: the
+  original preferences of the party, in the same form. These are only
+  stored for solved games since solving a game changes the preferences
+  of its players.
+
+In addition, the archive holds ``__game__`` (the name of the game
+class) and ``__clean__``. Student allocation games also hold
+``projects_supervisor``, the position of each project's supervisor. If
+the game has been solved, ``{party}_matching`` gives the position of the
+match of each player in the party with single matches, or -1 if they
+are unmatched.
+"""
+
+import array
+import csv
+import itertools
+import json
+import os
+import struct
+import zipfile
+
+import numpy as np
+
+from matching.base import BasePlayer
+from matching.players import Hospital, Supervisor
+
+
+def write_arrays(path, arrays):
+    """Write a dictionary of arrays to an uncompressed archive."""
+
+    with open(path, "wb") as f:
+        np.savez(f, **arrays)
+
+
+def read_arrays(path, mmap=True):
+    """Read the arrays in an archive written by ``write_arrays``.
+
+    If ``mmap`` is ``True``, the arrays are read-only memory maps of the
+    archive. Otherwise, they are read into memory.
+    """
+
+    if not mmap:
+        with np.load(path, allow_pickle=False) as archive:
+            return {key: archive[key] for key in archive.files}
+
+    arrays = {}
+    with zipfile.ZipFile(path) as archive, open(path, "rb") as f:
+        for info in archive.infolist():
+            key = info.filename[: -len(".npy")]
+            arrays[key] = _map_member(path, f, info)
+
+    return arrays
+
+
+def _map_member(path, f, info):
+    """Memory-map an array from an uncompressed member of an archive."""
+
+    if info.compress_type != zipfile.ZIP_STORED:
+        raise ValueError(
+            f"{info.filename} is compressed and cannot be mapped."
+        )
+
+    f.seek(info.header_offset)
+    header = struct.unpack("<4s5H3L2H", f.read(30))
+    f.seek(info.header_offset + 30 + header[-2] + header[-1])
+
+    version = np.lib.format.read_magic(f)
+    if version == (1, 0):
+        shape, fortran_order, dtype = np.lib.format.read_array_header_1_0(f)
+    else:
+        shape, fortran_order, dtype = np.lib.format.read_array_header_2_0(f)
+
+    if dtype.hasobject:
+        raise ValueError(f"{info.filename} holds Python objects.")
+
+    order = "F" if fortran_order else "C"
+    if not np.prod(shape, dtype=np.int64):
+        return np.empty(shape, dtype=dtype, order=order)
+
+    return np.memmap(
+        path, dtype=dtype, mode="r", offset=f.tell(), shape=shape, order=order
+    )
+
+
+def game_to_arrays(game, names=None):
+    """Get the arrays describing a game and any matching it has.
+
+    The names of each party are stored by ``names``, a function taking
+    the players and the name of their party, if it is given. By default,
+    the names must all be strings or all be integers.
+    """
+
+    names = names or _names_to_array
+
+    cls = type(game)
+    indices = {
+        party: {player: i for i, player in enumerate(getattr(game, party))}
+        for party in cls._player_classes
+    }
+
+    arrays = {
+        "__game__": np.array(cls.__name__),
+        "__clean__": np.array(bool(game.clean)),
+    }
+    for party, player_class in cls._player_classes.items():
+        players = getattr(game, party)
+        arrays[party] = names(players, party)
+        if issubclass(player_class, Hospital):
+            arrays[f"{party}_capacity"] = np.array(
+                [player.capacity for player in players], dtype=np.int64
+            )
+
+    for party, other_party in cls._prefs_parties.items():
+        players = getattr(game, party)
+        index = indices[other_party]
+        indptr, prefs = _prefs_to_csr(players, index, "prefs")
+        arrays[f"{party}_indptr"], arrays[f"{party}_indices"] = indptr, prefs
+
+        if game.matching is not None:
+            indptr, prefs = _prefs_to_csr(players, index, "_original_prefs")
+            arrays[f"{party}_original_indptr"] = indptr
+            arrays[f"{party}_original_indices"] = prefs
+
+    if "projects" in cls._player_classes:
+        arrays["projects_supervisor"] = np.array(
+            [indices["supervisors"][p.supervisor] for p in game.projects],
+            dtype=np.int64,
+        )
+
+    if game.matching is not None:
+        party, _ = cls._matching_parties
+        arrays[f"{party}_matching"] = get_partners(game)
+
+    return arrays
+
+
+def get_partners(game):
+    """Get the array of partners describing the matching of a game.
+
+    This is the inverse of ``set_matching``.
+    """
+
+    party, other_party = type(game)._matching_parties
+    index = {other: i for i, other in enumerate(getattr(game, other_party))}
+
+    return np.array(
+        [index.get(player.matching, -1) for player in getattr(game, party)],
+        dtype=np.int64,
+    )
+
+
+def game_from_arrays(cls, arrays):
+    """Create an instance of a game from its arrays.
+
+    The players are built from the arrays in a single pass, reading
+    each array into memory once. The game is neither copied nor checked
+    since the arrays are taken to describe a game that has been created
+    already.
+    """
+
+    game_name = str(arrays["__game__"])
+    if game_name != cls.__name__:
+        raise ValueError(f"Arrays describe a {game_name}, not {cls.__name__}.")
+
+    parties = {}
+    for party, player_class in cls._player_classes.items():
+        names = _to_list(arrays[party])
+        if issubclass(player_class, Hospital):
+            capacities = arrays[f"{party}_capacity"].tolist()
+            players = [
+                player_class(name, capacity)
+                for name, capacity in zip(names, capacities)
+            ]
+        else:
+            players = [player_class(name) for name in names]
+
+        parties[party] = players
+
+    if "projects_supervisor" in arrays:
+        supervisors = parties["supervisors"]
+        for project, i in zip(
+            parties["projects"], arrays["projects_supervisor"].tolist()
+        ):
+            project.set_supervisor(supervisors[i])
+
+    for party, other_party in cls._prefs_parties.items():
+        players, others = parties[party], parties[other_party]
+        all_prefs = _csr_to_prefs(
+            arrays[f"{party}_indptr"], arrays[f"{party}_indices"], others
+        )
+        # Supervisors would pass their preferences on to their projects,
+        # which have their own already.
+        player_class = cls._player_classes[party]
+        set_prefs = (
+            BasePlayer.set_prefs
+            if issubclass(player_class, Supervisor)
+            else player_class.set_prefs
+        )
+        for player, prefs in zip(players, all_prefs):
+            set_prefs(player, prefs)
+
+        if f"{party}_original_indptr" in arrays:
+            all_prefs = _csr_to_prefs(
+                arrays[f"{party}_original_indptr"],
+                arrays[f"{party}_original_indices"],
+                others,
+            )
+            for player, prefs in zip(players, all_prefs):
+                player._original_prefs = prefs
+
+    game = cls._from_players(bool(arrays["__clean__"]), **parties)
+
+    party, _ = cls._matching_parties
+    if f"{party}_matching" in arrays:
+        set_matching(game, arrays[f"{party}_matching"])
+
+    return game
+
+
+def set_matching(game, partners, compact=True):
+    """Set the matching of a game from an array of partners.
+
+    The ``i``-th entry of ``partners`` is the position of the match of
+    the ``i``-th player in the party of the game with single matches,
+    or -1 if they are unmatched. Any existing matches are discarded.
+
+    If ``compact`` is ``True``, the matching is compact; see
+    ``matching.compact``. Otherwise, it is of the class the ``solve``
+    method of the game gives.
+    """
+
+    cls = type(game)
+    for party, player_class in cls._player_classes.items():
+        for player in getattr(game, party):
+            player.matching = (
+                [] if issubclass(player_class, Hospital) else None
+            )
+
+    party, other_party = cls._matching_parties
+    others = getattr(game, other_party)
+    for player, i in zip(getattr(game, party), _to_list(partners)):
+        if i >= 0 and party == other_party:
+            player.matching = others[i]
+        elif i >= 0:
+            _link(player, others[i])
+
+    if compact:
+        game.matching = _compact_matching(game, partners)
+    else:
+        game.matching = _solved_matching(game)
+
+    return game.matching
+
+
+def _solved_matching(game):
+    """Make the matching that solving a game gives, once the players have
+    been linked to their matches."""
+
+    from matching.matchings import MultipleMatching, SingleMatching
+
+    cls = type(game)
+    party, _ = cls._matching_parties
+    matching_class = (
+        SingleMatching if cls._matching_keys == party else MultipleMatching
+    )
+
+    return matching_class(
+        {key: key.matching for key in getattr(game, cls._matching_keys)}
+    )
+
+
+def _compact_matching(game, partners):
+    """Make the compact form of the matching given by some partners, once
+    the players have been linked to their matches."""
+
+    from matching.compact import (
+        CompactMultipleMatching,
+        CompactSingleMatching,
+    )
+
+    cls = type(game)
+    party, other_party = cls._matching_parties
+    players, others = getattr(game, party), getattr(game, other_party)
+    if cls._matching_keys == party:
+        return CompactSingleMatching(players, others, partners)
+
+    index = {player: i for i, player in enumerate(players)}
+    indptr = np.zeros(len(others) + 1, dtype=np.int64)
+    np.cumsum([len(other.matching) for other in others], out=indptr[1:])
+    indices = np.array(
+        [index[player] for other in others for player in other.matching],
+        dtype=np.int64,
+    )
+
+    return CompactMultipleMatching(others, players, indptr, indices)
+
+
+def _link(player, other):
+    """Match a player with a single match to another player."""
+
+    player.matching = other
+    if isinstance(other, Hospital):
+        other._match(player)
+    else:
+        other.matching = player
+
+
+def _to_list(values):
+    """Get a list of Python objects from an array or other iterable."""
+
+    if isinstance(values, np.ndarray):
+        return values.tolist()
+
+    return list(values)
+
+
+def _names_to_array(players, party):
+    """Make an array of player names that are all strings or integers."""
+
+    names = [player.name for player in players]
+    if all(isinstance(name, str) for name in names):
+        if any(name.endswith("\x00") for name in names):
+            raise ValueError(
+                f"The names of the {party} cannot end in a null character "
+                "since arrays of strings drop them."
+            )
+
+        dtype = str
+    elif all(isinstance(name, int) for name in names):
+        dtype = np.int64
+    else:
+        dtype = None
+
+    try:
+        array = np.array(names, dtype=dtype)
+    except (OverflowError, TypeError):
+        array = None
+
+    if dtype is None or array is None or array.tolist() != names:
+        raise ValueError(
+            f"The names of the {party} must all be strings or all be "
+            "integers that can be stored in an array."
+        )
+
+    return array
+
+
+def _prefs_to_csr(players, index, attr):
+    """Get the preferences of some players in CSR form.
+
+    Any player not in ``index`` is left out.
+    """
+
+    indptr = np.zeros(len(players) + 1, dtype=np.int64)
+    indices = []
+    for i, player in enumerate(players):
+        indices.extend(
+            index[other] for other in getattr(player, attr) if other in index
+        )
+        indptr[i + 1] = len(indices)
+
+    return indptr, np.array(indices, dtype=np.int64)
+
+
+def _csr_to_prefs(indptr, indices, others):
+    """Get the preference lists described by some CSR arrays."""
+
+    indptr = indptr.tolist()
+    flat = [others[i] for i in indices.tolist()]
+
+    return [flat[start:end] for start, end in zip(indptr, indptr[1:])]
+
+
+def read_hospital_resident(
+    resident_path,
+    hospital_path,
+    capacities,
+    clean=False,
+    chunksize=65536,
+    fields=None,
+    validate="fast",
+):
+    """Read an instance of HR from files of ranked pairs.
+
+    Each row of ``resident_path`` is a ``(resident, hospital, rank)``
+    triple and each row of ``hospital_path`` is a
+    ``(hospital, resident, rank)`` triple, where lower ranks are
+    preferred. The files are read ``chunksize`` rows at a time and the
+    names in them are replaced with integer identifiers as they go, so
+    the memory used is proportional to the number of ranked pairs.
+
+    Files ending in ``.jsonl`` or ``.ndjson`` are read as JSON lines.
+    Otherwise, they are read as CSV, where a first row whose last field
+    is not an integer is taken to be a header and skipped. Names read
+    from CSV files are strings.
+
+    Parameters
+    ----------
+    resident_path : str
+        The file of resident preferences.
+    hospital_path : str
+        The file of hospital preferences.
+    capacities : dict or str
+        A dictionary mapping hospital names to their capacities, or a
+        file of ``(hospital, capacity)`` rows given as CSV rows or JSON
+        arrays.
+    clean : bool
+        Whether the instance should be cleaned when it is checked.
+        Defaults to ``False``.
+    chunksize : int
+        The number of rows to read at a time. Defaults to 65536.
+    fields : tuple of str, optional
+        If the rows of a JSON lines file are objects rather than arrays,
+        the keys of the player, the other player and the rank in each.
+    validate : str
+        How to check the instance once it is read. Must be one of
+        ``"full"``, ``"fast"`` (the default) and ``"none"``. The fast
+        check takes time in proportion to the number of ranked pairs,
+        while the full one can take far longer on large instances. See
+        ``matching.validation``.
+
+    Returns
+    -------
+    game : HospitalResident
+        The instance described by the files.
+    """
+
+    from matching.games import HospitalResident
+
+    residents, hospitals = _Names(), _Names()
+    resident_prefs = _read_ranked_pairs(
+        resident_path, residents, hospitals, chunksize, fields
+    )
+    hospital_prefs = _read_ranked_pairs(
+        hospital_path, hospitals, residents, chunksize, fields
+    )
+
+    if not isinstance(capacities, dict):
+        capacities = {
+            name: int(capacity) for name, capacity in _read_rows(capacities)
+        }
+
+    missing = [name for name in hospitals.names if name not in capacities]
+    if missing:
+        raise ValueError(f"No capacity was given for {missing}.")
+
+    arrays = {
+        "__game__": np.array(HospitalResident.__name__),
+        "__clean__": np.array(clean),
+        "residents": residents.names,
+        "hospitals": hospitals.names,
+        "hospitals_capacity": np.array(
+            [capacities[name] for name in hospitals.names], dtype=np.int64
+        ),
+    }
+    for party, (edges, names) in {
+        "residents": (resident_prefs, residents),
+        "hospitals": (hospital_prefs, hospitals),
+    }.items():
+        indptr, indices = _edges_to_csr(*edges, len(names.names))
+        arrays[f"{party}_indptr"], arrays[f"{party}_indices"] = indptr, indices
+
+    del resident_prefs, hospital_prefs
+
+    game = game_from_arrays(HospitalResident, arrays)
+    game._validate(validate)
+
+    return game
+
+
+class _Names:
+    """A record of the names seen so far and their identifiers."""
+
+    def __init__(self):
+        self.ids = {}
+        self.names = []
+
+    def intern(self, name):
+        """Get the identifier of a name, adding it if it is new."""
+
+        idx = self.ids.get(name)
+        if idx is None:
+            idx = self.ids[name] = len(self.names)
+            self.names.append(name)
+
+        return idx
+
+
+def _read_ranked_pairs(path, players, others, chunksize, fields=None):
+    """Read the ranked pairs in a file as compact arrays of identifiers."""
+
+    player_ids, other_ids, ranks = (array.array("q") for _ in range(3))
+    rows = _read_rows(path, fields)
+    while True:
+        chunk = list(itertools.islice(rows, chunksize))
+        if not chunk:
+            break
+
+        player_names, other_names, rank_values = zip(*chunk)
+        player_ids.extend(map(players.intern, player_names))
+        other_ids.extend(map(others.intern, other_names))
+        ranks.extend(map(int, rank_values))
+
+    return tuple(
+        np.frombuffer(ids, dtype=np.int64) if ids else np.zeros(0, np.int64)
+        for ids in (player_ids, other_ids, ranks)
+    )
+
+
+def _edges_to_csr(player_ids, other_ids, ranks, num_players):
+    """Get the CSR preference arrays for some ranked pairs."""
+
+    order = np.lexsort((ranks, player_ids))
+    indptr = np.zeros(num_players + 1, dtype=np.int64)
+    np.cumsum(np.bincount(player_ids, minlength=num_players), out=indptr[1:])
+
+    return indptr, other_ids[order]
+
+
+def _read_rows(path, fields=None):
+    """Iterate over the rows of a CSV or JSON lines file."""
+
+    if os.path.splitext(path)[1].lower() in (".jsonl", ".ndjson"):
+        yield from _read_json_lines(path, fields)
+        return
+
+    with open(path, newline="") as f:
+        rows = csv.reader(f)
+        first = next(rows, None)
+        if first is not None and _is_integer(first[-1]):
+            yield first
+
+        yield from rows
+
+
+def _read_json_lines(path, fields=None):
+    """Iterate over the rows of a JSON lines file."""
+
+    with open(path) as f:
+        for line in f:
+            if not line.strip():
+                continue
+
+            row = json.loads(line)
+            if isinstance(row, dict):
+                if fields is None:
+                    raise ValueError(
+                        "The rows of the file are objects, so ``fields`` "
+                        "must name the keys to read from them."
+                    )
+
+                row = [row[field] for field in fields]
+
+            yield row
+
+
+def _is_integer(value):
+    """Determine whether a string is an integer."""
+
+    try:
+        int(value)
+    except ValueError:
+        return False
+
+    return True
@@ -2,6 +2,7 @@
 
 from matching import BaseMatching
 from matching.players import Player
+from matching.validation import check_mode
 
 
 class SingleMatching(BaseMatching):
@@ -16,6 +17,41 @@ class SingleMatching(BaseMatching):
     def __init__(self, dictionary):
         super().__init__(dictionary)
 
+    @classmethod
+    def from_arrays(cls, players, others, partners, validate="full"):
+        """Make a matching from an array of partners, linking every
+        player to their match in one pass.
+
+        The ``i``-th entry of ``partners`` is the position in ``others``
+        of the match of the ``i``-th player in ``players``, or -1 if
+        they are unmatched. Anyone in ``others`` without a match is left
+        unmatched. If ``others`` is ``players``, as in SR, the partners
+        must be symmetric.
+
+        Unless ``validate`` is ``"none"``, the array is checked with
+        vectorised operations and a ``ValueError`` is raised if it does
+        not describe a matching. The matching returned is compact; see
+        ``matching.compact``.
+        """
+
+        from matching.compact import CompactSingleMatching, check_partners
+
+        check_mode(validate)
+        matching = CompactSingleMatching(players, others, partners)
+        if validate != "none":
+            check_partners(matching)
+
+        for other in others:
+            other.matching = None
+
+        for player, i in zip(players, matching.partners.tolist()):
+            if i >= 0:
+                other = others[i]
+                player.matching = other
+                other.matching = player
+
+        return matching
+
     def __setitem__(self, player, new):
         """Set a player's new match and match them to the player, too.
 
@@ -24,6 +60,7 @@ class SingleMatching(BaseMatching):
 
         self._check_player_in_keys(player)
         self._check_new_valid_type(new, (type(None), Player))
+        self._record_change(player, new)
 
         player.matching = new
         if isinstance(new, Player):
@@ -31,6 +68,29 @@ class SingleMatching(BaseMatching):
 
         self._data[player] = new
 
+    def _record_change(self, player, new):
+        """Record the player, their old match and their new match as
+        changed."""
+
+        self._changed.update((player, self._data.get(player), new))
+        self._changed.discard(None)
+
+    def _check_many(self, assignments):
+        """Check that each new match is a player or ``None``."""
+
+        types = (type(None), Player)
+        invalid = [new for _, new in assignments if not isinstance(new, types)]
+        if invalid:
+            self._check_new_valid_type(invalid[0], types)
+
+    def _link_many(self, assignments):
+        """Match each player and their new match to one another."""
+
+        for player, new in assignments:
+            player.matching = new
+            if new is not None:
+                new.matching = player
+
 
 class MultipleMatching(BaseMatching):
     """Matching class for games with multiple matches like HR or SA.
@@ -44,6 +104,40 @@ class MultipleMatching(BaseMatching):
     def __init__(self, dictionary):
         super().__init__(dictionary)
 
+    @classmethod
+    def from_arrays(cls, players, others, indptr, indices, validate="full"):
+        """Make a matching from arrays in compressed sparse row (CSR)
+        form, linking every player to their matches in one pass.
+
+        The matches of the ``i``-th player in ``players`` are those in
+        ``others`` at positions ``indices[indptr[i]:indptr[i + 1]]``.
+        Anyone in ``others`` without a match is left unmatched.
+
+        Unless ``validate`` is ``"none"``, the arrays are checked with
+        vectorised operations and a ``ValueError`` is raised if they do
+        not describe a matching. The matching returned is compact; see
+        ``matching.compact``.
+        """
+
+        from matching.compact import CompactMultipleMatching, check_csr
+
+        check_mode(validate)
+        matching = CompactMultipleMatching(players, others, indptr, indices)
+        if validate != "none":
+            check_csr(matching)
+
+        for other in others:
+            other.matching = None
+
+        flat = [others[i] for i in matching.indices.tolist()]
+        bounds = matching.indptr.tolist()
+        for player, start, end in zip(players, bounds, bounds[1:]):
+            player.matching = flat[start:end]
+            for other in player.matching:
+                other.matching = player
+
+        return matching
+
     def __setitem__(self, player, new):
         """Set a player's match and match each of them to the player.
 
@@ -56,8 +150,44 @@ class MultipleMatching(BaseMatching):
         for other in new:
             self._check_new_valid_type(other, Player)
 
+        self._record_change(player, new)
+
         player.matching = new
         for other in new:
             other.matching = player
 
         self._data[player] = new
+
+    def _record_change(self, player, new):
+        """Record the player, their old matches and their new matches as
+        changed."""
+
+        self._changed.add(player)
+        self._changed.update(self._data.get(player, ()))
+        self._changed.update(new)
+
+    def _check_many(self, assignments):
+        """Check that each new match is a collection of players."""
+
+        types = (list, tuple)
+        invalid = [new for _, new in assignments if not isinstance(new, types)]
+        if invalid:
+            self._check_new_valid_type(invalid[0], types)
+
+        invalid = [
+            other
+            for _, new in assignments
+            for other in new
+            if not isinstance(other, Player)
+        ]
+        if invalid:
+            self._check_new_valid_type(invalid[0], Player)
+
+    def _link_many(self, assignments):
+        """Match each player to their new matches, and them to the
+        player."""
+
+        for player, new in assignments:
+            player.matching = new
+            for other in new:
+                other.matching = player
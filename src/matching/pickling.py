@@ -0,0 +1,703 @@
+"""Functions for pickling and copying games, matchings and players.
+
+The players of a game are linked to one another through their
+preferences and matches, so pickling one of them as any other object
+would walk the whole graph of players, recursing as it goes. That is
+slow, makes a large payload, and can hit the recursion limit for large
+games. Instead, the players linked to a game, matching or player are
+pickled as a flat table, which holds the following:
+
+- ``names``: the name of each player, as a list.
+- ``classes`` and ``kinds``: the classes of the players in the table,
+  and the position of the class of each player among them.
+- ``{attribute}_lengths`` and ``{attribute}_indices``: the players in
+  an attribute of each player, such as their preferences or matches, as
+  the number of players in it and the positions of them all in turn. A
+  length of -1 stands for ``None``, -2 for a player without the
+  attribute, and -3 for a value that is the same as one stored already,
+  such as original preferences that have not changed.
+- ``_pref_names_lengths`` and ``_pref_names``: the names each player
+  had in their preferences, in the same form.
+- ``_project_counts_lengths``, ``_project_counts_indices`` and
+  ``_project_counts_values``: the counts that each supervisor keeps of
+  the projects that rank each student.
+- ``capacity`` and ``_original_capacity``: the capacities of the
+  players, where they have them.
+- ``lists``: the positions of the players in each list of players that
+  the game or matching holds, such as its parties.
+- ``extras``: any other attributes of each player, which are pickled as
+  they are.
+
+The players are made again from the table in a single pass, and then
+the game or matching from their positions in it. Deep copies are made
+in the same way, without pickling, so that the copies of the players
+are linked as the originals are.
+"""
+
+import collections
+import contextlib
+import copy
+import gc
+import itertools
+import operator
+
+import numpy as np
+
+from matching.base import BaseGame, BaseMatching, BasePlayer
+from matching.matchings import MultipleMatching
+from matching.players import Hospital
+
+_PLAYERS = (
+    "prefs",
+    "matching",
+    "_original_prefs",
+    "supervisor",
+    "projects",
+    "_project_counts",
+)
+_CAPACITIES = ("capacity", "_original_capacity")
+_ORDER = (
+    "prefs",
+    "matching",
+    "_pref_names",
+    "_original_prefs",
+    "capacity",
+    "_original_capacity",
+    "supervisor",
+    "projects",
+    "_project_counts",
+)
+_KNOWN = frozenset(("name",) + _ORDER)
+
+_NONE, _ABSENT, _SAME = -1, -2, -3
+_MISSING = object()
+_REPEATED = object()
+_MARKERS = {_NONE: None, _ABSENT: _MISSING, _SAME: _REPEATED}
+
+_get_name = operator.attrgetter("name")
+
+
+@contextlib.contextmanager
+def _paused_gc():
+    """Pause the cyclic garbage collector while many objects are made.
+
+    Otherwise, the collector runs again and again over the objects made
+    so far, and the time taken grows faster than the number of players.
+    """
+
+    enabled = gc.isenabled()
+    gc.disable()
+    try:
+        yield
+    finally:
+        if enabled:
+            gc.enable()
+
+
+class _Table:
+    """A table of players, filled in as they are found."""
+
+    def __init__(self):
+        self.players = []
+        self.lists = []
+        self._index = {}
+        self._list_index = {}
+
+    def find(self, player):
+        """Get the position of a player, adding them if they are new."""
+
+        i = self._index.get(id(player))
+        if i is None:
+            i = self._index[id(player)] = len(self.players)
+            self.players.append(player)
+
+        return i
+
+    def positions(self, players):
+        """Get an array of the positions of some players."""
+
+        return np.array(list(map(self.find, players)), dtype=np.int64)
+
+    def add_list(self, players):
+        """Get the position of a list of players among the lists in the
+        table, adding it if it is new."""
+
+        i = self._list_index.get(id(players))
+        if i is None:
+            i = self._list_index[id(players)] = len(self.lists)
+            self.lists.append(list(map(self.find, players)))
+
+        return i
+
+    def to_state(self):
+        """Get the flat description of the players in the table.
+
+        The players are read in batches. Each attribute is read for the
+        whole batch at once, and any players in it who are not in the
+        table yet are added, to be read in the next batch.
+        """
+
+        columns = {key: ([], []) for key in _PLAYERS}
+        left = collections.defaultdict(set)
+        with _paused_gc():
+            start = 0
+            while start < len(self.players):
+                batch = self.players[start:]
+                lengths = {}
+                for key in _PLAYERS:
+                    lengths[key], positions = self._take_players(
+                        key, batch, start, lengths, left
+                    )
+                    columns[key][0].extend(lengths[key])
+                    columns[key][1].extend(positions)
+
+                start += len(batch)
+
+            return self._make_state(columns, left)
+
+    def _make_state(self, columns, left):
+        """Make the flat description of the players once they have all
+        been found."""
+
+        players = self.players
+        attrs = list(map(vars, players))
+        dtype = np.int32 if len(players) < 2**31 else np.int64
+
+        classes = {}
+        kinds = [classes.setdefault(type(p), len(classes)) for p in players]
+        state = {
+            "classes": tuple(classes),
+            "kinds": np.array(kinds, dtype=np.int32),
+            "names": [values.get("name") for values in attrs],
+        }
+        for key, (lengths, positions) in columns.items():
+            state[f"{key}_lengths"] = np.array(lengths, dtype=np.int32)
+            state[f"{key}_indices"] = np.array(positions, dtype=dtype)
+
+        counts = columns["_project_counts"][0]
+        state["_project_counts_values"] = np.array(
+            [
+                count
+                for values, length in zip(attrs, counts)
+                if length > 0
+                for count in values["_project_counts"].values()
+            ],
+            dtype=np.int64,
+        )
+
+        lengths, names = _take_names(
+            attrs, columns["_original_prefs"][0], left
+        )
+        state["_pref_names_lengths"] = np.array(lengths, dtype=np.int32)
+        state["_pref_names"] = names
+
+        for key in _CAPACITIES:
+            state[key] = np.array(
+                _take_capacities(key, players, attrs, left), dtype=np.int64
+            )
+
+        state["lists"] = [np.array(lst, dtype=dtype) for lst in self.lists]
+        state["extras"] = _take_extras(attrs, left)
+
+        return state
+
+    def _take_players(self, key, batch, start, lengths, left):
+        """Get the positions of the players in an attribute of each player
+        in a batch, and how many there are for each.
+
+        Original preferences that are the same as the preferences are
+        not stored again. Attributes that do not hold players are left
+        to be pickled as they are.
+        """
+
+        kind = collections.Counter if key == "_project_counts" else list
+        prefs = lengths.get("prefs")
+        batch_lengths, lists, owners = [], [], []
+        for i, player in enumerate(batch):
+            values = vars(player)
+            value = values.get(key, _MISSING)
+            if value is _MISSING:
+                length = _ABSENT
+            elif key == "supervisor" or (
+                key == "matching" and not isinstance(player, Hospital)
+            ):
+                value = () if value is None else (value,)
+                length = len(value)
+            elif value is None:
+                length = _NONE
+            elif type(value) is not kind:
+                length = _ABSENT
+                left[start + i].add(key)
+            elif (
+                key == "_original_prefs"
+                and prefs[i] >= 0
+                and value == values["prefs"]
+            ):
+                length = _SAME
+            else:
+                length = len(value)
+
+            batch_lengths.append(length)
+            if length > 0:
+                lists.append(value)
+                owners.append(i)
+
+        try:
+            positions = self._find_all(lists)
+        except KeyError:
+            lists = self._add_new(
+                key, lists, owners, start, batch_lengths, left
+            )
+            positions = self._find_all(lists)
+
+        return batch_lengths, positions
+
+    def _find_all(self, lists):
+        """Get the positions of the players in some lists, all of whom
+        are in the table."""
+
+        flat = itertools.chain.from_iterable(lists)
+        return list(map(self._index.__getitem__, map(id, flat)))
+
+    def _add_new(self, key, lists, owners, start, lengths, left):
+        """Add the players in some lists to the table.
+
+        Any list holding something other than players is left to be
+        pickled as it is. Get the lists that only hold players.
+        """
+
+        kept = []
+        for value, i in zip(lists, owners):
+            if all(isinstance(other, BasePlayer) for other in value):
+                kept.append(value)
+                for other in value:
+                    self.find(other)
+            else:
+                lengths[i] = _ABSENT
+                left[start + i].add(key)
+
+        return kept
+
+
+def _take_names(attrs, original, left):
+    """Get the names each player had in their preferences as a flat
+    list, and how many there are for each.
+
+    Names that are those of the original preferences of the player, as
+    they are when the preferences are first set, are not stored again.
+    """
+
+    lengths, flat = [], []
+    for i, values in enumerate(attrs):
+        value = values.get("_pref_names", _MISSING)
+        if value is _MISSING:
+            length = _ABSENT
+        elif type(value) is not list:
+            length = _ABSENT
+            left[i].add("_pref_names")
+        elif (original[i] >= 0 or original[i] == _SAME) and value == _names(
+            values["_original_prefs"]
+        ):
+            length = _SAME
+        else:
+            length = len(value)
+
+        lengths.append(length)
+        if length > 0:
+            flat.extend(value)
+
+    return lengths, flat
+
+
+def _take_capacities(key, players, attrs, left):
+    """Get the capacities of the hospitals among some players.
+
+    Any capacity that is not an integer is left to be pickled as it is.
+    """
+
+    capacities = []
+    for i, (player, values) in enumerate(zip(players, attrs)):
+        value = values.get(key, _MISSING)
+        if type(value) is int and isinstance(player, Hospital):
+            capacities.append(value)
+            continue
+
+        capacities.append(0)
+        if value is not _MISSING:
+            left[i].add(key)
+
+    return capacities
+
+
+def _take_extras(attrs, left):
+    """Get the attributes of each player that are pickled as they are."""
+
+    extras = {}
+    for i, values in enumerate(attrs):
+        if i in left or not values.keys() <= _KNOWN:
+            kept = left.get(i, ())
+            extra = {
+                key: value
+                for key, value in values.items()
+                if key not in _KNOWN or key in kept
+            }
+            if extra:
+                extras[i] = extra
+
+    return extras
+
+
+def _names(players):
+    """Get the names of some players."""
+
+    return list(map(_get_name, players))
+
+
+def _split(lengths, flat):
+    """Split a flat list into the values of an attribute of each player,
+    given their lengths."""
+
+    sizes = np.maximum(lengths, 0)
+    ends = np.cumsum(sizes)
+    values = list(
+        map(
+            flat.__getitem__,
+            map(slice, (ends - sizes).tolist(), ends.tolist()),
+        )
+    )
+    for i in np.flatnonzero(lengths < 0).tolist():
+        values[i] = _MARKERS[int(lengths[i])]
+
+    return values
+
+
+class _Builder:
+    """A builder of the players in a table, and of the objects that hold
+    them.
+
+    When a deep copy is made, ``originals`` are the players in the table
+    and ``memo`` is the memo of the copy. Players that have been copied
+    already are taken from the memo, and the others are added to it.
+    """
+
+    def __init__(self, state, originals=None, memo=None):
+        self.memo = memo
+        self.players = []
+        with _paused_gc():
+            self._make_players(state, originals)
+
+        self.lists = [self.find(positions) for positions in state["lists"]]
+
+    def copy(self, value):
+        """Copy a value held by a game, matching or player, if a deep copy
+        is being made."""
+
+        if self.memo is None:
+            return value
+
+        return copy.deepcopy(value, self.memo)
+
+    def find(self, positions):
+        """Get the players at some positions in the table."""
+
+        return list(map(self.players.__getitem__, positions.tolist()))
+
+    def _make_players(self, state, originals):
+        """Make the players in a table, reading each attribute for all of
+        them at once and then setting the attributes of each player."""
+
+        classes, names, memo = state["classes"], state["names"], self.memo
+        players, fresh = self.players, []
+        for i, kind in enumerate(state["kinds"].tolist()):
+            key = None if originals is None else id(originals[i])
+            if key is not None and key in memo:
+                players.append(memo[key])
+                fresh.append(False)
+                continue
+
+            player = classes[kind].__new__(classes[kind])
+            player.name = names[i]
+            if key is not None:
+                memo[key] = player
+
+            players.append(player)
+            fresh.append(True)
+
+        columns = self._read_columns(state)
+        rows = zip(*(columns[key] for key in _ORDER))
+        for player, row, new in zip(players, rows, fresh):
+            if new:
+                vars(player).update(
+                    [
+                        (key, value)
+                        for key, value in zip(_ORDER, row)
+                        if value is not _MISSING
+                    ]
+                )
+
+        for i, extra in state["extras"].items():
+            if fresh[i]:
+                vars(players[i]).update(self.copy(extra))
+
+    def _read_columns(self, state):
+        """Read the value of each attribute of every player."""
+
+        hospitals = [issubclass(cls, Hospital) for cls in state["classes"]]
+        hospitals = [hospitals[kind] for kind in state["kinds"].tolist()]
+        columns = {
+            key: _split(
+                state[f"{key}_lengths"], self.find(state[f"{key}_indices"])
+            )
+            for key in _PLAYERS
+        }
+
+        columns["matching"] = [
+            value if hospital or value is _MISSING else _single(value)
+            for value, hospital in zip(columns["matching"], hospitals)
+        ]
+        columns["supervisor"] = [
+            value if value is _MISSING else _single(value)
+            for value in columns["supervisor"]
+        ]
+        columns["_original_prefs"] = [
+            prefs[:] if value is _REPEATED else value
+            for value, prefs in zip(
+                columns["_original_prefs"], columns["prefs"]
+            )
+        ]
+        columns["_pref_names"] = [
+            _names(original) if value is _REPEATED else value
+            for value, original in zip(
+                _split(state["_pref_names_lengths"], state["_pref_names"]),
+                columns["_original_prefs"],
+            )
+        ]
+
+        counts = _split(
+            state["_project_counts_lengths"],
+            state["_project_counts_values"].tolist(),
+        )
+        columns["_project_counts"] = [
+            students
+            if students is _MISSING
+            else collections.Counter(dict(zip(students, values)))
+            for students, values in zip(columns["_project_counts"], counts)
+        ]
+
+        for key in _CAPACITIES:
+            columns[key] = [
+                value if hospital else _MISSING
+                for value, hospital in zip(state[key].tolist(), hospitals)
+            ]
+
+        return columns
+
+
+def _single(value):
+    """Get the single player held by an attribute, or ``None``."""
+
+    return value[0] if value else None
+
+
+def _matching_to_state(matching, table):
+    """Get the flat description of a matching, adding its players to a
+    table."""
+
+    from matching.compact import _CompactMatching, compact
+
+    state = {"changed": table.positions(list(matching._changed))}
+    if isinstance(matching, _CompactMatching):
+        if matching._stale:
+            matching = compact(matching)
+
+        arrays = matching.to_numpy()
+        state["players"] = table.add_list(matching.players)
+        state["others"] = table.add_list(matching.others)
+        state["arrays"] = arrays if isinstance(arrays, tuple) else (arrays,)
+    else:
+        keys, values = list(matching._data), list(matching._data.values())
+        state["keys"] = table.positions(keys)
+        if isinstance(matching, MultipleMatching):
+            state["lengths"] = np.fromiter(
+                map(len, values), dtype=np.int64, count=len(values)
+            )
+            state["indices"] = table.positions(
+                [other for value in values for other in value]
+            )
+        else:
+            state["partners"] = np.array(
+                [
+                    -1 if value is None else table.find(value)
+                    for value in values
+                ],
+                dtype=np.int64,
+            )
+
+    state["class"] = type(matching)
+    return state
+
+
+def _matching_from_state(state, builder):
+    """Make a matching from its flat description."""
+
+    cls = state["class"]
+    if "arrays" in state:
+        players = builder.lists[state["players"]]
+        others = builder.lists[state["others"]]
+        arrays = (builder.copy(array) for array in state["arrays"])
+        matching = cls(players, others, *arrays)
+    else:
+        keys = builder.find(state["keys"])
+        if "partners" in state:
+            values = [
+                builder.players[i] if i >= 0 else None
+                for i in state["partners"].tolist()
+            ]
+        else:
+            values = _split(state["lengths"], builder.find(state["indices"]))
+
+        matching = cls.__new__(cls)
+        BaseMatching.__init__(matching, dict(zip(keys, values)))
+
+    matching._changed = set(builder.find(state["changed"]))
+    return matching
+
+
+def _game_to_state(game, table):
+    """Get the flat description of a game, adding its players to a
+    table.
+
+    The lists of players that the game holds, such as its parties, are
+    kept by their positions in the table. A solve that has been paused
+    by ``solve_iter`` is kept as a checkpoint, so that solving the game
+    again carries on from there. See ``matching.checkpoint``.
+    """
+
+    attrs = dict(vars(game))
+    matching = attrs.pop("matching", None)
+    blocking_pairs = attrs.pop("blocking_pairs", None)
+    checked = attrs.pop("_checked", None)
+    solving = attrs.pop("_solving", None)
+    attrs.pop("_indexes", None)
+
+    if solving is not None and "proposals" in solving[1]:
+        from matching.checkpoint import state_to_arrays
+
+        optimal, state = solving
+        attrs["_checkpoint"] = (optimal, state_to_arrays(game, state))
+
+    lists = {}
+    for key, value in list(attrs.items()):
+        if isinstance(value, list) and all(
+            isinstance(player, BasePlayer) for player in value
+        ):
+            lists[key] = table.add_list(attrs.pop(key))
+
+    state = {"attributes": attrs, "lists": lists, "checked": False}
+    if matching is not None:
+        state["matching"] = _matching_to_state(matching, table)
+        state["checked"] = checked is matching
+
+    if blocking_pairs is not None:
+        state["blocking_pairs"] = np.array(
+            [
+                [table.find(player), table.find(other)]
+                for player, other in blocking_pairs
+            ],
+            dtype=np.int64,
+        ).reshape(-1, 2)
+
+    return state
+
+
+def _set_game_state(game, state, builder):
+    """Set the attributes of a game from its flat description."""
+
+    BaseGame.__init__(game)
+    vars(game).update(builder.copy(state["attributes"]))
+    for key, i in state["lists"].items():
+        setattr(game, key, builder.lists[i])
+
+    if "matching" in state:
+        game.matching = _matching_from_state(state["matching"], builder)
+        if state["checked"]:
+            game._checked = game.matching
+
+    if "blocking_pairs" in state:
+        game.blocking_pairs = [
+            (builder.players[i], builder.players[j])
+            for i, j in state["blocking_pairs"].tolist()
+        ]
+
+
+def _to_state(obj, table):
+    """Get the flat description of a game, matching or player."""
+
+    if isinstance(obj, BaseGame):
+        return _game_to_state(obj, table)
+
+    if isinstance(obj, BaseMatching):
+        return _matching_to_state(obj, table)
+
+    return table.find(obj)
+
+
+def _from_state(obj, state, builder):
+    """Make a game, matching or player from its flat description. A game
+    is made in place of ``obj``, which is an empty instance of it."""
+
+    if isinstance(obj, BaseGame):
+        _set_game_state(obj, state, builder)
+        return obj
+
+    if isinstance(state, dict):
+        return _matching_from_state(state, builder)
+
+    return builder.players[state]
+
+
+def get_state(obj):
+    """Get the flat description of a game, matching or player, with the
+    table of the players linked to it."""
+
+    table = _Table()
+    state = _to_state(obj, table)
+
+    return state, table.to_state()
+
+
+def from_state(state, players, obj=None):
+    """Make a game, matching or player from its flat description and
+    table of players.
+
+    A game is made by setting the state of ``obj``, which is an empty
+    instance of it.
+    """
+
+    return _from_state(obj, state, _Builder(players))
+
+
+def deep_copy(obj, memo):
+    """Make a deep copy of a game, matching or player through its flat
+    description, adding the copies of its players to ``memo``."""
+
+    table = _Table()
+    state = _to_state(obj, table)
+    builder = _Builder(table.to_state(), table.players, memo)
+    copied = (
+        type(obj).__new__(type(obj)) if isinstance(obj, BaseGame) else None
+    )
+
+    return _from_state(copied, state, builder)
+
+
+def shallow_copy(obj):
+    """Make a shallow copy of a game, matching or player, whose
+    attributes are those of the original."""
+
+    copied = type(obj).__new__(type(obj))
+    vars(copied).update(vars(obj))
+    if isinstance(obj, BaseMatching):
+        dict.update(copied, dict.items(obj))
+
+    return copied
@@ -43,6 +43,19 @@ class Project(Hospital):
             self.prefs = prefs
             self.supervisor._forget(student)
 
+    def set_prefs(self, students):
+        """Set the project's preferences to be a list of students.
+
+        This method also updates the supervisor's count of the projects
+        that rank each student.
+        """
+
+        if self.supervisor is not None:
+            self.supervisor._update_counts(self.prefs, -1)
+            self.supervisor._update_counts(students, 1)
+
+        super().set_prefs(students)
+
     def _match(self, student):
         """Match the project to the student.
 
@@ -72,6 +85,10 @@ class Project(Hospital):
         This method also update the supervisor's project list.
         """
 
+        if self.supervisor is not None:
+            self.supervisor._update_counts(self.prefs, -1)
+
         self.supervisor = supervisor
+        supervisor._update_counts(self.prefs, 1)
         if self not in supervisor.projects:
             supervisor.projects.append(self)
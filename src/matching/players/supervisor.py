@@ -1,5 +1,7 @@
 """The Supervisor class for use in instances of SA."""
 
+import collections
+
 from .hospital import Hospital
 
 
@@ -28,26 +30,39 @@ class Supervisor(Hospital):
         The current matches of the supervisor. An empty list if
         currently unsubscribed, and updated through its projects'
         matching updates.
+    _project_counts : collections.Counter
+        The number of the supervisor's projects that rank each student.
+        Updated as the projects set and forget their preferences.
     """
 
     def __init__(self, name, capacity):
         super().__init__(name, capacity)
         self.projects = []
+        self._project_counts = collections.Counter()
 
     def _forget(self, student):
-        """Attempt to forget the student.
+        """Attempt to forget the student after one of the supervisor's
+        projects has forgotten them.
 
         A student is only removed if it is not ranked by any of the
         supervisor's projects.
         """
 
-        if student in self.prefs and not any(
-            [student in project.prefs for project in self.projects]
-        ):
+        self._update_counts([student], -1)
+        if not self._project_counts[student] and student in self.prefs:
             prefs = self.prefs[:]
             prefs.remove(student)
             self.prefs = prefs
 
+    def _update_counts(self, students, change):
+        """Change the number of projects that rank some students."""
+
+        counts = self._project_counts
+        for student in students:
+            counts[student] += change
+            if counts[student] <= 0:
+                del counts[student]
+
     def set_prefs(self, students):
         """Set the preference list for the supervisor.
 
@@ -59,11 +74,20 @@ class Supervisor(Hospital):
         self._pref_names = [student.name for student in students]
         self._original_prefs = students[:]
 
-        for project in self.projects:
-            acceptable = [
-                student for student in students if project in student.prefs
-            ]
-            project.set_prefs(acceptable)
+        acceptable = {project: [] for project in self.projects}
+        for student in students:
+            ranked = set()
+            for project in student.prefs:
+                if project in acceptable and project not in ranked:
+                    ranked.add(project)
+                    acceptable[project].append(student)
+
+        for project, prefs in acceptable.items():
+            project.set_prefs(prefs)
+
+        self._project_counts = collections.Counter(
+            student for prefs in acceptable.values() for student in prefs
+        )
 
     def get_favourite(self):
         """Get the supervisor's favourite viable student.
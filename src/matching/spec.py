@@ -0,0 +1,207 @@
+"""Immutable specifications of game instances."""
+
+import collections
+import types
+
+from matching.base import BasePlayer
+from matching.io import game_from_arrays, game_to_arrays, read_arrays
+from matching.pickling import _paused_gc
+
+
+class GameSpec:
+    """An immutable specification of a game instance.
+
+    A specification holds the names, capacities and preferences of the
+    players in a game as read-only arrays, and none of the state that
+    changes when a game is solved. It can be shared between threads,
+    each of which solves the instance with a game of its own.
+
+    The players are built from the arrays once, when the specification
+    is made, and kept as a template. Each new game gets a copy of the
+    template players with their own preferences and matches, made in a
+    single pass without building or checking the players again.
+
+    Parameters
+    ----------
+    game_class : type
+        The class of game described by the specification.
+    arrays : dict
+        The arrays describing the instance, as given by
+        ``matching.io.game_to_arrays``.
+
+    Attributes
+    ----------
+    game_class : type
+        The class of game described by the specification.
+    arrays : mappingproxy
+        A read-only view of the arrays describing the instance.
+    """
+
+    __slots__ = ("game_class", "arrays", "_template")
+
+    def __init__(self, game_class, arrays):
+        frozen = {}
+        for key, array in arrays.items():
+            if "_original_" in key or key.endswith("_matching"):
+                continue
+
+            array = array.view()
+            array.flags.writeable = False
+            frozen[key] = array
+
+        object.__setattr__(self, "game_class", game_class)
+        object.__setattr__(self, "arrays", types.MappingProxyType(frozen))
+        object.__setattr__(
+            self, "_template", _Template(game_from_arrays(game_class, frozen))
+        )
+
+    def __setattr__(self, name, value):
+        raise AttributeError(f"{type(self).__name__} is immutable.")
+
+    def __delattr__(self, name):
+        raise AttributeError(f"{type(self).__name__} is immutable.")
+
+    def __reduce__(self):
+        return type(self), (self.game_class, dict(self.arrays))
+
+    def __repr__(self):
+        sizes = ", ".join(
+            f"{party}={len(self.arrays[party])}"
+            for party in self.game_class._player_classes
+        )
+        return f"{type(self).__name__}({self.game_class.__name__}, {sizes})"
+
+    @classmethod
+    def from_game(cls, game):
+        """Make a specification from the current state of a game.
+
+        The preferences of the players are taken as they are, so any
+        checking or cleaning should be done first and the specification
+        made before the game is solved.
+        """
+
+        return cls(type(game), game_to_arrays(game))
+
+    @classmethod
+    def load(cls, path, mmap=True):
+        """Load a specification from a game saved with its ``save``
+        method.
+
+        If ``mmap`` is ``True``, the arrays are mapped from disk rather
+        than read into memory first. The template players are built from
+        them either way.
+        """
+
+        from matching import games
+
+        arrays = read_arrays(path, mmap)
+        return cls(getattr(games, str(arrays["__game__"])), arrays)
+
+    def new_game(self):
+        """Make a new, unsolved game from the specification.
+
+        The game holds the state of a single solve, and can be solved
+        and checked independently of any other game made from the
+        specification.
+        """
+
+        return self._template.new_game()
+
+    def solve(self, *args, **kwargs):
+        """Solve the instance with a new game and return that game.
+
+        Any arguments are passed to the ``solve`` method of the game, and
+        its matching is available as the ``matching`` attribute of the
+        returned game.
+        """
+
+        game = self.new_game()
+        game.solve(*args, **kwargs)
+
+        return game
+
+
+class _Template:
+    """The players of an unsolved game, kept to be copied for each new
+    game.
+
+    The attributes of each player are sorted once: those that hold
+    other players are kept by the positions of those players, lists and
+    dictionaries are copied for each game, and the rest are shared.
+    """
+
+    def __init__(self, game):
+        cls = type(game)
+        players = [
+            player
+            for party in cls._player_classes
+            for player in vars(game)[party]
+        ]
+        index = {id(player): i for i, player in enumerate(players)}
+
+        self.game_class = cls
+        self.clean = game.clean
+        self.parties = {}
+        start = 0
+        for party in cls._player_classes:
+            end = start + len(vars(game)[party])
+            self.parties[party] = (start, end)
+            start = end
+
+        self.classes = [type(player) for player in players]
+        self.shared = []
+        self.copied, self.singles, self.lists, self.counts = [], [], [], []
+        for i, player in enumerate(players):
+            shared = {}
+            for key, value in vars(player).items():
+                if isinstance(value, BasePlayer):
+                    self.singles.append((i, key, index[id(value)]))
+                elif isinstance(value, collections.Counter):
+                    positions = [index[id(other)] for other in value]
+                    self.counts.append(
+                        (i, key, positions, list(value.values()))
+                    )
+                elif (
+                    isinstance(value, list)
+                    and value
+                    and all(isinstance(other, BasePlayer) for other in value)
+                ):
+                    positions = [index[id(other)] for other in value]
+                    self.lists.append((i, key, positions))
+                elif isinstance(value, (list, dict)):
+                    self.copied.append((i, key, value))
+                else:
+                    shared[key] = value
+
+            self.shared.append(shared)
+
+    def new_game(self):
+        """Make a new game with copies of the template players."""
+
+        with _paused_gc():
+            players = list(map(object.__new__, self.classes))
+            for player, shared in zip(players, self.shared):
+                player.__dict__ = shared.copy()
+
+            find = players.__getitem__
+            for i, key, value in self.copied:
+                setattr(players[i], key, value.copy())
+            for i, key, j in self.singles:
+                setattr(players[i], key, players[j])
+            for i, key, positions in self.lists:
+                setattr(players[i], key, list(map(find, positions)))
+            for i, key, positions, counts in self.counts:
+                setattr(
+                    players[i],
+                    key,
+                    collections.Counter(
+                        dict(zip(map(find, positions), counts))
+                    ),
+                )
+
+        parties = {
+            party: players[start:end]
+            for party, (start, end) in self.parties.items()
+        }
+
+        return self.game_class._from_players(self.clean, **parties)
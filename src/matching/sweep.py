@@ -0,0 +1,269 @@
+"""Functions for solving an instance of HR under many sets of capacities.
+
+The instance is indexed once: each resident gets a list of the positions
+of the hospitals they rank, and each hospital a dictionary of the rank
+it gives each resident. The resident-optimal matching of the instance
+is found from these by the resident-proposing algorithm, and that run
+is kept as the base for every scenario.
+
+A scenario that only lowers capacities starts from the end of the base
+run. Any rejection made in the base run would be made with fewer posts,
+so the hospitals with fewer posts need only reject their worst residents
+until they fit, and the algorithm carries on from there. Any other
+scenario is solved from scratch, but from the same index.
+"""
+
+import concurrent.futures
+import functools
+import heapq
+
+import numpy as np
+
+_SHARED = {}
+
+
+def sweep_capacities(game, scenarios, workers=None):
+    """Find the changes to the resident-optimal matching of an instance
+    of HR under some scenarios of hospital capacities.
+
+    The game itself is left as it is, and it need not have been solved.
+    Preferences are taken as they were when the game was made, and a
+    pair is acceptable if each of them ranks the other.
+
+    Parameters
+    ----------
+    game : HospitalResident
+        The game to sweep.
+    scenarios : iterable of dict
+        The scenarios to solve. Each is a dictionary mapping the names
+        of some hospitals to their capacities in that scenario. Any
+        other hospital keeps its capacity.
+    workers : int, optional
+        The number of worker processes to solve the scenarios in. Each
+        process is sent the index of the instance once. If ``None``, the
+        scenarios are solved in this process.
+
+    Returns
+    -------
+    deltas : numpy.recarray
+        A row for each resident whose match differs from the base
+        matching in a scenario. The ``scenario`` field gives the
+        position of the scenario, ``resident`` the position of the
+        resident in ``game.residents``, and ``before`` and ``after`` the
+        positions of their matches in ``game.hospitals`` in the base
+        matching and the scenario, or -1 if they are unmatched.
+    """
+
+    instance = _index(game)
+    base = _solve(*instance)
+    positions = {hospital: i for i, hospital in enumerate(game.hospitals)}
+    changes = [
+        _get_changes(game, positions, scenario) for scenario in scenarios
+    ]
+
+    if workers is None:
+        before = _get_partners(instance[0], base[0])
+        solve = functools.partial(
+            _solve_scenario, instance=instance, base=base, before=before
+        )
+        rows = list(map(solve, changes))
+    else:
+        with concurrent.futures.ProcessPoolExecutor(
+            workers, initializer=_share, initargs=(instance, base)
+        ) as executor:
+            chunksize = max(1, len(changes) // (4 * workers))
+            rows = list(
+                executor.map(_solve_shared, changes, chunksize=chunksize)
+            )
+
+    partners = _get_partners(instance[0], base[0])
+    scenario = np.repeat(
+        np.arange(len(rows), dtype=np.int64), [len(r) for r, _ in rows]
+    )
+    residents = np.concatenate(
+        [np.zeros(0, dtype=np.int64)] + [r for r, _ in rows]
+    )
+    after = np.concatenate(
+        [np.zeros(0, dtype=np.int64)] + [a for _, a in rows]
+    )
+
+    return np.rec.fromarrays(
+        [scenario, residents, partners[residents], after],
+        names=["scenario", "resident", "before", "after"],
+    )
+
+
+def _index(game):
+    """Get the preferences, ranks and capacities of an instance of HR as
+    lists indexed by position."""
+
+    hospital_index = {h: i for i, h in enumerate(game.hospitals)}
+    resident_index = {r: i for i, r in enumerate(game.residents)}
+
+    prefs = [
+        [hospital_index[h] for h in _get_prefs(r) if h in hospital_index]
+        for r in game.residents
+    ]
+
+    ranks = []
+    for hospital in game.hospitals:
+        rank = {}
+        for resident in _get_prefs(hospital):
+            if resident in resident_index:
+                rank.setdefault(resident_index[resident], len(rank))
+        ranks.append(rank)
+
+    capacities = [hospital.capacity for hospital in game.hospitals]
+
+    return prefs, ranks, capacities
+
+
+def _get_prefs(player):
+    """Get the preferences of a player as they were first set."""
+
+    if player._original_prefs is None:
+        return player.prefs
+
+    return player._original_prefs
+
+
+def _get_changes(game, positions, scenario):
+    """Get the capacities a scenario changes by hospital position."""
+
+    changes = {}
+    for name, capacity in scenario.items():
+        hospital = game.get_player(name, "hospitals")
+        if not isinstance(capacity, (int, np.integer)) or capacity < 0:
+            raise ValueError(
+                f"The capacity of {hospital} must be a non-negative "
+                f"integer, not {capacity!r}."
+            )
+        changes[positions[hospital]] = int(capacity)
+
+    return changes
+
+
+def _share(instance, base):
+    """Keep the index and base run of an instance in a worker process.
+
+    Each worker of a sweep has its own store, so this is only used by
+    the workers and never by a sweep in this process.
+    """
+
+    _SHARED.update(
+        instance=instance,
+        base=base,
+        before=_get_partners(instance[0], base[0]),
+    )
+
+
+def _solve_shared(changes):
+    """Solve a scenario in a worker with the instance kept by ``_share``."""
+
+    return _solve_scenario(changes, **_SHARED)
+
+
+def _solve_scenario(changes, instance, base, before):
+    """Solve a scenario and get the residents whose match changes, and
+    what it changes to."""
+
+    prefs, ranks, capacities = instance
+    cursors, heaps = base
+
+    new_capacities = capacities[:]
+    for hospital, capacity in changes.items():
+        new_capacities[hospital] = capacity
+
+    if all(new_capacities[h] <= capacities[h] for h in changes):
+        new_cursors, _ = _resume(
+            prefs, ranks, new_capacities, cursors, heaps, changes
+        )
+    else:
+        new_cursors, _ = _solve(prefs, ranks, new_capacities)
+
+    after = _get_partners(prefs, new_cursors)
+    (residents,) = np.nonzero(before != after)
+
+    return residents, after[residents]
+
+
+def _solve(prefs, ranks, capacities):
+    """Run the resident-proposing algorithm from the start."""
+
+    cursors = [0] * len(prefs)
+    heaps = [[] for _ in ranks]
+    free = list(range(len(prefs)))[::-1]
+    _propose(prefs, ranks, capacities, cursors, heaps, free)
+
+    return cursors, heaps
+
+
+def _resume(prefs, ranks, capacities, cursors, heaps, hospitals):
+    """Carry on from a run with more posts at some hospitals. The run
+    itself is left as it is."""
+
+    cursors = cursors[:]
+    heaps = [
+        heap[:] if i in hospitals else heap for i, heap in enumerate(heaps)
+    ]
+    free = []
+    for hospital in hospitals:
+        heap = heaps[hospital]
+        while len(heap) > capacities[hospital]:
+            _, resident = heapq.heappop(heap)
+            cursors[resident] += 1
+            free.append(resident)
+
+    _propose(prefs, ranks, capacities, cursors, heaps, free)
+
+    return cursors, heaps
+
+
+def _propose(prefs, ranks, capacities, cursors, heaps, free):
+    """Let free residents propose down their preferences until none is
+    left who can.
+
+    Each hospital keeps a heap of its matches by the negative of the
+    rank it gives them, so its worst match is at the top. A resident's
+    cursor is at their match, or past the end of their preferences if
+    they are unmatched. The heaps that change are replaced, so that any
+    shared with another run are left alone.
+    """
+
+    copied = set()
+    while free:
+        resident = free.pop()
+        resident_prefs, cursor = prefs[resident], cursors[resident]
+        while cursor < len(resident_prefs):
+            hospital = resident_prefs[cursor]
+            rank = ranks[hospital].get(resident)
+            if rank is not None:
+                if hospital not in copied:
+                    heaps[hospital] = heaps[hospital][:]
+                    copied.add(hospital)
+
+                heap = heaps[hospital]
+                if len(heap) < capacities[hospital]:
+                    heapq.heappush(heap, (-rank, resident))
+                    break
+                if heap and -heap[0][0] > rank:
+                    _, worst = heapq.heapreplace(heap, (-rank, resident))
+                    cursors[worst] += 1
+                    free.append(worst)
+                    break
+
+            cursor += 1
+
+        cursors[resident] = cursor
+
+
+def _get_partners(prefs, cursors):
+    """Get the position of the match of each resident, or -1."""
+
+    return np.array(
+        [
+            resident_prefs[cursor] if cursor < len(resident_prefs) else -1
+            for resident_prefs, cursor in zip(prefs, cursors)
+        ],
+        dtype=np.int64,
+    )
@@ -0,0 +1,178 @@
+"""Functions for solving many small instances of SM at once.
+
+An instance of SM with ``n`` suitors and ``n`` reviewers is given by two
+``(n, n)`` arrays of ranks: ``suitor_ranks[i, j]`` is the rank suitor
+``i`` gives reviewer ``j``, and ``reviewer_ranks[j, i]`` the rank
+reviewer ``j`` gives suitor ``i``, where 0 is the favourite. Each row
+is a permutation of ``range(n)``. A batch of instances of the same size
+is a pair of ``(batch, n, n)`` arrays, and is solved without making any
+players, with every free suitor in the batch proposing at once::
+
+    partners = stable_marriages(suitor_ranks, reviewer_ranks)
+
+Here ``partners[b, i]`` is the reviewer matched to suitor ``i`` in
+instance ``b``.
+"""
+
+import numpy as np
+
+
+def stable_marriages(
+    suitor_ranks, reviewer_ranks, optimal="suitor", check_stability=False
+):
+    """Solve a batch of instances of SM given by their rank arrays.
+
+    Every free suitor of every instance proposes to the next reviewer on
+    their preference list at once. Each reviewer proposed to keeps the
+    best of its current partner and new suitors, and rejects the rest.
+    The rounds end once every suitor is matched, and the matching of
+    each instance is the one ``stable_marriage`` finds.
+
+    Parameters
+    ----------
+    suitor_ranks : array-like of int
+        The ranks each suitor gives the reviewers, of shape
+        ``(batch, n, n)``.
+    reviewer_ranks : array-like of int
+        The ranks each reviewer gives the suitors, of shape
+        ``(batch, n, n)``.
+    optimal : str, optional
+        Which party the matchings should be optimised for. Must be one
+        of ``"suitor"`` and ``"reviewer"``. Defaults to the former.
+    check_stability : bool, optional
+        Whether to also check each matching for blocking pairs. See
+        ``check_stable_marriages``.
+
+    Returns
+    -------
+    partners : numpy.ndarray
+        The position of the reviewer matched to each suitor, of shape
+        ``(batch, n)``.
+    stable : numpy.ndarray
+        Whether each matching is stable, of shape ``(batch,)``. Only
+        returned if ``check_stability`` is ``True``.
+    """
+
+    suitor_ranks = _check_ranks(suitor_ranks, "suitor_ranks")
+    reviewer_ranks = _check_ranks(reviewer_ranks, "reviewer_ranks")
+    if suitor_ranks.shape != reviewer_ranks.shape:
+        raise ValueError(
+            "The rank arrays of the suitors and reviewers have different "
+            f"shapes: {suitor_ranks.shape} and {reviewer_ranks.shape}."
+        )
+
+    if optimal.lower() == "reviewer":
+        partners = _invert(_propose(reviewer_ranks, suitor_ranks))
+    else:
+        partners = _propose(suitor_ranks, reviewer_ranks)
+
+    if check_stability:
+        return partners, check_stable_marriages(
+            suitor_ranks, reviewer_ranks, partners
+        )
+
+    return partners
+
+
+def check_stable_marriages(suitor_ranks, reviewer_ranks, partners):
+    """Check a batch of matchings of instances of SM for blocking pairs.
+
+    A suitor and reviewer block a matching if they each rank the other
+    above their partner. Return a boolean array of shape ``(batch,)``,
+    saying whether each matching has no blocking pairs.
+    """
+
+    suitor_ranks = np.asarray(suitor_ranks)
+    reviewer_ranks = np.asarray(reviewer_ranks)
+    partners = np.asarray(partners)
+    batch, n = partners.shape
+
+    rows = np.arange(batch)[:, None]
+    suitors = np.arange(n)[None, :]
+    suitor_limits = suitor_ranks[rows, suitors, partners]
+    reviewer_limits = reviewer_ranks[rows, partners, suitors]
+
+    reviewer_limits_by_reviewer = np.empty_like(reviewer_limits)
+    reviewer_limits_by_reviewer[rows, partners] = reviewer_limits
+
+    prefers_reviewer = suitor_ranks < suitor_limits[:, :, None]
+    prefers_suitor = (
+        np.swapaxes(reviewer_ranks, 1, 2)
+        < reviewer_limits_by_reviewer[:, None, :]
+    )
+
+    return ~(prefers_reviewer & prefers_suitor).any(axis=(1, 2))
+
+
+def _check_ranks(ranks, name):
+    """Get an array of ranks, checking that each row is a permutation."""
+
+    ranks = np.asarray(ranks)
+    if ranks.ndim != 3 or ranks.shape[1] != ranks.shape[2]:
+        raise ValueError(
+            f"{name} must have shape (batch, n, n), not {ranks.shape}."
+        )
+
+    if not np.array_equal(
+        np.sort(ranks, axis=2),
+        np.broadcast_to(np.arange(ranks.shape[2]), ranks.shape),
+    ):
+        raise ValueError(f"Each row of {name} must be a permutation of ranks.")
+
+    return ranks.astype(np.int64, copy=False)
+
+
+def _propose(suitor_ranks, reviewer_ranks):
+    """Find the suitor-optimal matching of each instance in rounds.
+
+    Suitors and reviewers are numbered across the batch, so that each
+    round is a handful of operations on the free suitors of every
+    instance. The reviewers proposed to are sorted by the rank they give
+    each proposal, and the first proposal to each is held if it beats
+    the current partner of the reviewer.
+    """
+
+    batch, n, _ = suitor_ranks.shape
+    prefs = np.argsort(suitor_ranks, axis=2).reshape(batch * n, n)
+    ranks = reviewer_ranks.reshape(batch * n, n)
+
+    holders = np.full(batch * n, -1, dtype=np.int64)
+    holder_ranks = np.full(batch * n, n, dtype=np.int64)
+    cursors = np.zeros(batch * n, dtype=np.int64)
+    offsets = np.arange(batch * n) // n * n
+
+    free = np.arange(batch * n)
+    while free.size:
+        reviewers = offsets[free] + prefs[free, cursors[free]]
+        proposal_ranks = ranks[reviewers, free % n]
+
+        order = np.lexsort((proposal_ranks, reviewers))
+        first = np.ones(order.size, dtype=bool)
+        first[1:] = reviewers[order[1:]] != reviewers[order[:-1]]
+        best = order[first]
+        best = best[proposal_ranks[best] < holder_ranks[reviewers[best]]]
+
+        held = reviewers[best]
+        rejected = holders[held]
+        holders[held] = free[best]
+        holder_ranks[held] = proposal_ranks[best]
+
+        accepted = np.zeros(free.size, dtype=bool)
+        accepted[best] = True
+        free = np.concatenate((free[~accepted], rejected[rejected >= 0]))
+        cursors[free] += 1
+
+    partners = np.empty(batch * n, dtype=np.int64)
+    partners[holders] = np.arange(batch * n) % n
+
+    return partners.reshape(batch, n)
+
+
+def _invert(partners):
+    """Get the partners of the other party from an array of partners."""
+
+    batch, n = partners.shape
+    inverse = np.empty_like(partners)
+    inverse[np.arange(batch)[:, None], partners] = np.arange(n)
+
+    return inverse
@@ -0,0 +1,234 @@
+"""Tools for checking game inputs and collecting the issues found.
+
+Games can check their inputs in one of three ways, given by the
+``validate`` argument of their constructors:
+
+- ``"full"`` runs their ``check_inputs`` method, which reports every
+  issue it finds and, if the game is to be cleaned, fixes it;
+- ``"fast"`` runs their ``verify_inputs`` method, which takes time
+  linear in the number of preferences and raises a ``ValueError`` at
+  the first issue. Players with an empty preference list are reported
+  and cleaned as in ``check_inputs``;
+- ``"none"`` trusts the inputs as they are.
+
+By default, each issue found by the ``check_inputs`` method of a game is
+raised as a warning. Within a ``collect_issues`` block, they are instead
+gathered in a ``ValidationReport``, and their messages are only written
+if they are asked for::
+
+    with collect_issues() as report:
+        game = HospitalResident.create_from_dictionaries(
+            resident_prefs, hospital_prefs, capacities, clean=True
+        )
+
+    report.counts()
+    report.emit()
+
+Importing ``matching`` makes Python show every warning, each time it is
+raised, unless warning options were given on the command line. Set the
+``MATCHING_NO_WARNINGS_FILTER`` environment variable to leave the
+warning filters alone.
+"""
+
+import collections
+import contextlib
+import contextvars
+import warnings
+
+_REPORT = contextvars.ContextVar("matching_validation_report", default=None)
+
+
+class Issue(collections.namedtuple("Issue", ["category", "template", "args"])):
+    """An issue found when checking the inputs of a game.
+
+    The message of the issue is only formatted from its template and
+    arguments when it is needed.
+
+    Parameters
+    ----------
+    category : type
+        The class of warning for the issue.
+    template : str
+        A template for the message of the issue, to be formatted with
+        ``str.format``.
+    args : tuple
+        The arguments to the template.
+    """
+
+    __slots__ = ()
+
+    @property
+    def message(self):
+        """The message describing the issue."""
+
+        return self.template.format(*self.args)
+
+    def to_warning(self):
+        """Make a warning of the issue."""
+
+        return self.category(self.message)
+
+
+class ValidationReport:
+    """A record of the issues found when checking the inputs of games.
+
+    Attributes
+    ----------
+    issues : list of Issue
+        The issues in the order they were found.
+    """
+
+    def __init__(self):
+        self.issues = []
+
+    def __len__(self):
+        return len(self.issues)
+
+    def __iter__(self):
+        return iter(self.issues)
+
+    def __repr__(self):
+        counts = ", ".join(
+            f"{category.__name__}={count}"
+            for category, count in self.counts().items()
+        )
+        return f"{type(self).__name__}({counts})"
+
+    def counts(self):
+        """Count the issues of each category."""
+
+        return collections.Counter(issue.category for issue in self.issues)
+
+    def messages(self, category=None):
+        """Get the messages of the issues, optionally of one category."""
+
+        return [
+            issue.message
+            for issue in self.issues
+            if category is None or issue.category is category
+        ]
+
+    def emit(self, summary=True):
+        """Raise the issues as warnings.
+
+        If ``summary`` is ``True``, a single warning is raised for each
+        category, giving the number of issues and the first of them.
+        Otherwise, a warning is raised for every issue.
+        """
+
+        if not summary:
+            for issue in self.issues:
+                warnings.warn(issue.to_warning(), stacklevel=2)
+
+            return
+
+        firsts = {}
+        for issue in self.issues:
+            firsts.setdefault(issue.category, issue)
+
+        for category, count in self.counts().items():
+            warnings.warn(
+                category(
+                    f"{count} issue(s) found, the first of which was: "
+                    f"{firsts[category].message}"
+                ),
+                stacklevel=2,
+            )
+
+
+@contextlib.contextmanager
+def collect_issues():
+    """Collect the issues found when checking games in this context.
+
+    Yields a ``ValidationReport`` to which the issues are added in place
+    of raising a warning for each. Contexts can be nested, in which case
+    issues go to the innermost report. Each thread and asynchronous task
+    collects its issues separately.
+    """
+
+    report = ValidationReport()
+    token = _REPORT.set(report)
+    try:
+        yield report
+    finally:
+        _REPORT.reset(token)
+
+
+def report_issue(category, template, *args):
+    """Report an issue found when checking the inputs of a game.
+
+    The issue is added to the current report if there is one, and raised
+    as a warning otherwise.
+    """
+
+    issue = Issue(category, template, args)
+    report = _REPORT.get()
+    if report is None:
+        warnings.warn(issue.to_warning(), stacklevel=2)
+    else:
+        report.issues.append(issue)
+
+
+def check_mode(validate):
+    """Raise a ``ValueError`` if ``validate`` is not one of ``"full"``,
+    ``"fast"`` and ``"none"``."""
+
+    if validate not in ("full", "fast", "none"):
+        raise ValueError(
+            "Validation must be one of 'full', 'fast' and 'none', "
+            f"not {validate!r}."
+        )
+
+
+def verify_prefs(players, others):
+    """Check that each player ranks distinct members of ``others``.
+
+    Raise a ``ValueError`` for the first player whose preference list
+    has a repeat or contains someone not in ``others``. Empty lists are
+    left to the game to report.
+    """
+
+    others = set(others)
+    for player in players:
+        prefs = player.prefs
+        if len(set(prefs)) != len(prefs):
+            raise ValueError(f"{player} has ranked a player multiple times.")
+
+        for other in prefs:
+            if other not in others:
+                raise ValueError(f"{player} has ranked {other}, not a player.")
+
+
+def verify_reciprocated(players, others):
+    """Check that every player ranks exactly those of ``others`` that
+    rank them.
+
+    Raise a ``ValueError`` for the first pair that is not reciprocated,
+    going through ``players`` and then ``others`` in order.
+    """
+
+    ranks = {player: set(player.prefs) for player in players}
+    ranked_by = {other: set(other.prefs) for other in others}
+
+    for player in players:
+        for other in player.prefs:
+            if player not in ranked_by[other]:
+                raise ValueError(f"{player} ranked {other} but they did not.")
+
+    for other in others:
+        for player in other.prefs:
+            if other not in ranks[player]:
+                raise ValueError(f"{other} ranked {player} but they did not.")
+
+
+def verify_capacities(players):
+    """Check that every player has a capacity of at least one.
+
+    Raise a ``ValueError`` for the first player that does not.
+    """
+
+    for player in players:
+        if player.capacity < 1:
+            raise ValueError(
+                f"{player} has a capacity of {player.capacity}, less than one."
+            )
@@ -4,7 +4,7 @@ import pytest
 from hypothesis import given
 from hypothesis.strategies import booleans
 
-from matching import BaseGame, Player
+from matching import BaseGame, BasePlayer, Player
 from matching.exceptions import (
     PlayerExcludedWarning,
     PreferencesChangedWarning,
@@ -25,6 +25,12 @@ class DummyGame(BaseGame):
     def check_validity(self):
         """Placeholder validity-checker method."""
 
+    def _get_pairs_with(self, player):
+        """Placeholder method for getting the pairs with a player."""
+
+    def _is_blocking_pair(self, player, other):
+        """Placeholder method for checking a pair."""
+
 
 @given(clean=booleans())
 def test_init(clean):
@@ -136,3 +142,35 @@ def test_check_inputs_player_prefs_nonempty(player_others, clean):
     if clean:
         assert other not in game.others
         assert player.prefs == others[1:]
+
+
+@given(player_others=player_others())
+def test_get_player(player_others):
+    """Test that players can be found by name, including after a player
+    is removed from the game."""
+
+    player, others = player_others
+    others = [o for o in others if o.name != player.name]
+    others = list({o.name: o for o in others}.values())
+
+    player.set_prefs(others)
+    for other in others:
+        other.set_prefs([player])
+
+    game = DummyGame()
+    game._player_classes = {"players": BasePlayer, "others": BasePlayer}
+    game.players = [player]
+    game.others = others
+
+    assert game.get_player(player.name) is player
+    for other in others:
+        assert game.get_player(other.name) is other
+        assert game.get_player(other.name, "others") is other
+
+    with pytest.raises(ValueError):
+        game.get_player(player.name, "others")
+
+    game._remove_player(player, "players", "others")
+
+    with pytest.raises(ValueError):
+        game.get_player(player.name)
@@ -24,3 +24,18 @@ def player_others(
     others = [BasePlayer(draw(other_names_from)) for _ in range(size)]
 
     return player, others
+
+
+def matching_names(matching):
+    """Get a matching in terms of the names of its players."""
+
+    names = {}
+    for key in matching.keys():
+        value = matching[key]
+        names[key.name] = (
+            [v.name for v in value]
+            if isinstance(value, list)
+            else getattr(value, "name", None)
+        )
+
+    return names
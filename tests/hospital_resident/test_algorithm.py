@@ -1,12 +1,16 @@
 """Tests for the Hospital-Resident algorithm."""
 
+import copy
+
 import numpy as np
 from hypothesis import given
 
 from matching.algorithms.hospital_resident import (
     hospital_optimal,
+    hospital_optimal_jit,
     hospital_resident,
     resident_optimal,
+    resident_optimal_jit,
 )
 
 from .util import players
@@ -67,3 +71,90 @@ def test_hospital_optimal(players_):
             idx = hospital.prefs.index(resident)
             assert idx >= old_idx
             old_idx = idx
+
+
+@given(players_=players())
+def test_hospital_optimal_deletes_successors(players_):
+    """Test that the hospital-optimal algorithm deletes every pair made
+    redundant by a match, and no others."""
+
+    residents, hospitals = players_
+    originals = {hospital: hospital.prefs[:] for hospital in hospitals}
+
+    hospital_optimal(hospitals)
+
+    for resident in residents:
+        if resident.matching:
+            assert resident.prefs[-1] == resident.matching
+
+    for hospital in hospitals:
+        assert hospital.prefs == [
+            resident
+            for resident in originals[hospital]
+            if hospital in resident.prefs
+        ]
+
+
+@given(players_=players())
+def test_resident_optimal_deletes_successors(players_):
+    """Test that the resident-optimal algorithm deletes the successors to
+    the worst match of every full hospital, and no others."""
+
+    residents, hospitals = players_
+    originals = {resident: resident.prefs[:] for resident in residents}
+
+    resident_optimal(residents, hospitals)
+
+    for hospital in hospitals:
+        if len(hospital.matching) == hospital.capacity:
+            assert hospital.prefs[-1] == hospital.matching[-1]
+
+    for resident in residents:
+        assert resident.prefs == [
+            hospital
+            for hospital in originals[resident]
+            if resident in hospital.prefs
+        ]
+
+
+def _get_state(residents, hospitals):
+    """Get the preferences and matches of every player by name."""
+
+    return [
+        (repr(player), repr(player.prefs), repr(player.matching))
+        for player in residents + hospitals
+    ]
+
+
+@given(players_=players())
+def test_resident_optimal_jit(players_):
+    """Test that the kernel of the resident-optimal algorithm leaves the
+    players as the algorithm itself does."""
+
+    residents, hospitals = players_
+    other_residents, other_hospitals = copy.deepcopy(players_)
+
+    matching = resident_optimal_jit(residents, hospitals)
+    expected = resident_optimal(other_residents, other_hospitals)
+
+    assert repr(matching) == repr(expected)
+    assert _get_state(residents, hospitals) == _get_state(
+        other_residents, other_hospitals
+    )
+
+
+@given(players_=players())
+def test_hospital_optimal_jit(players_):
+    """Test that the kernel of the hospital-optimal algorithm leaves the
+    players as the algorithm itself does."""
+
+    residents, hospitals = players_
+    other_residents, other_hospitals = copy.deepcopy(players_)
+
+    matching = hospital_optimal_jit(hospitals)
+    expected = hospital_optimal(other_hospitals)
+
+    assert repr(matching) == repr(expected)
+    assert _get_state(residents, hospitals) == _get_state(
+        other_residents, other_hospitals
+    )
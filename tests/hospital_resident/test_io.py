@@ -0,0 +1,172 @@
+"""Tests for reading instances of HR from files of ranked pairs."""
+
+import csv
+import json
+import os
+import tempfile
+
+import pytest
+from hypothesis import given
+from hypothesis.strategies import booleans, integers, sampled_from, text
+
+from matching.games import HospitalResident
+from matching.io import read_hospital_resident
+
+from .util import connections
+
+
+def _write_ranked_pairs(path, preferences, header):
+    """Write a preference dictionary as a file of ranked pairs.
+
+    The rows are written in reverse so that the ranks must be used to
+    recover the preferences.
+    """
+
+    rows = [
+        [name, other, rank]
+        for name, prefs in preferences.items()
+        for rank, other in enumerate(prefs)
+    ][::-1]
+
+    with open(path, "w", newline="") as f:
+        if path.endswith(".jsonl"):
+            for row in rows:
+                f.write(json.dumps(row) + "\n")
+        else:
+            writer = csv.writer(f)
+            if header:
+                writer.writerow(["player", "other", "rank"])
+            writer.writerows(rows)
+
+
+@given(
+    connections=connections(
+        residents_from=text("ABCDE"), hospitals_from=text("XYZ")
+    ),
+    extension=sampled_from([".csv", ".jsonl"]),
+    header=booleans(),
+    chunksize=integers(1, 5),
+)
+def test_read_hospital_resident(connections, extension, header, chunksize):
+    """Test that an instance of HR can be read from files in chunks."""
+
+    resident_prefs, hospital_prefs, capacities = connections
+
+    with tempfile.TemporaryDirectory() as directory:
+        resident_path = os.path.join(directory, f"residents{extension}")
+        hospital_path = os.path.join(directory, f"hospitals{extension}")
+        _write_ranked_pairs(resident_path, resident_prefs, header)
+        _write_ranked_pairs(hospital_path, hospital_prefs, header)
+
+        game = read_hospital_resident(
+            resident_path, hospital_path, capacities, chunksize=chunksize
+        )
+
+    assert isinstance(game, HospitalResident)
+    assert {r.name: r._pref_names for r in game.residents} == resident_prefs
+    assert {h.name: h._pref_names for h in game.hospitals} == hospital_prefs
+    assert {h.name: h.capacity for h in game.hospitals} == capacities
+
+    expected = HospitalResident.create_from_dictionaries(
+        resident_prefs, hospital_prefs, capacities
+    ).solve()
+    assert {
+        h.name: [r.name for r in rs] for h, rs in game.solve().items()
+    } == {h.name: [r.name for r in rs] for h, rs in expected.items()}
+
+
+def test_read_hospital_resident_capacity_file():
+    """Test that capacities can be read from a file, too."""
+
+    with tempfile.TemporaryDirectory() as directory:
+        paths = [
+            os.path.join(directory, name)
+            for name in ("residents.csv", "hospitals.csv", "capacities.csv")
+        ]
+        _write_ranked_pairs(paths[0], {"A": ["X", "Y"], "B": ["X"]}, True)
+        _write_ranked_pairs(paths[1], {"X": ["B", "A"], "Y": ["A"]}, True)
+        with open(paths[2], "w") as f:
+            f.write("hospital,capacity\nX,1\nY,2\n")
+
+        game = read_hospital_resident(*paths)
+
+    assert {h.name: h.capacity for h in game.hospitals} == {"X": 1, "Y": 2}
+    assert {
+        h.name: [r.name for r in rs] for h, rs in game.solve().items()
+    } == {
+        "X": ["B"],
+        "Y": ["A"],
+    }
+
+
+def test_read_hospital_resident_json_objects():
+    """Test that rows of JSON objects are read using their fields."""
+
+    fields = ("name", "other", "rank")
+    with tempfile.TemporaryDirectory() as directory:
+        paths = []
+        for party, preferences in (
+            ("residents", {"A": ["X"]}),
+            ("hospitals", {"X": ["A"]}),
+        ):
+            path = os.path.join(directory, f"{party}.jsonl")
+            with open(path, "w") as f:
+                for name, prefs in preferences.items():
+                    for rank, other in enumerate(prefs):
+                        row = dict(zip(fields, (name, other, rank)))
+                        f.write(json.dumps(row) + "\n\n")
+
+            paths.append(path)
+
+        with pytest.raises(ValueError, match="fields"):
+            read_hospital_resident(*paths, {"X": 1})
+
+        game = read_hospital_resident(*paths, {"X": 1}, fields=fields)
+
+    (resident,), (hospital,) = game.residents, game.hospitals
+    assert resident.prefs == [hospital]
+    assert hospital.prefs == [resident]
+
+
+def test_read_hospital_resident_missing_capacity():
+    """Test that every hospital must be given a capacity."""
+
+    with tempfile.TemporaryDirectory() as directory:
+        paths = [
+            os.path.join(directory, name)
+            for name in ("residents.csv", "hospitals.csv")
+        ]
+        _write_ranked_pairs(paths[0], {"A": ["X", "Y"]}, False)
+        _write_ranked_pairs(paths[1], {"X": ["A"], "Y": ["A"]}, False)
+
+        with pytest.raises(ValueError, match="capacity"):
+            read_hospital_resident(*paths, {"X": 1})
+
+
+@pytest.mark.parametrize(
+    "validate, checks",
+    (("fast", ["verify"]), ("full", ["check"]), ("none", [])),
+)
+def test_read_hospital_resident_validate(monkeypatch, validate, checks):
+    """Test that an instance read from files is checked in the linear way
+    unless another is asked for."""
+
+    called = []
+    monkeypatch.setattr(
+        HospitalResident, "check_inputs", lambda self: called.append("check")
+    )
+    monkeypatch.setattr(
+        HospitalResident, "verify_inputs", lambda self: called.append("verify")
+    )
+
+    with tempfile.TemporaryDirectory() as directory:
+        paths = [
+            os.path.join(directory, name)
+            for name in ("residents.csv", "hospitals.csv")
+        ]
+        _write_ranked_pairs(paths[0], {"A": ["X"]}, False)
+        _write_ranked_pairs(paths[1], {"X": ["A"]}, False)
+
+        read_hospital_resident(*paths, {"X": 1}, validate=validate)
+
+    assert called == checks
@@ -1,10 +1,20 @@
 """Unit tests for the HR solver."""
 
+import copy
+import os
+import tempfile
+import threading
 import warnings
 
 import pytest
 from hypothesis import given
-from hypothesis.strategies import booleans, sampled_from
+from hypothesis.strategies import (
+    booleans,
+    integers,
+    lists,
+    sampled_from,
+    text,
+)
 
 from matching import MultipleMatching
 from matching import Player as Resident
@@ -12,6 +22,7 @@ from matching.exceptions import (
     MatchingError,
     PlayerExcludedWarning,
     PreferencesChangedWarning,
+    SolveInterruptedError,
 )
 from matching.games import HospitalResident
 from matching.players import Hospital
@@ -245,6 +256,28 @@ def test_check_inputs_hospital_capacity(game):
         assert hospital not in game.hospitals
 
 
+@given(game=games())
+def test_get_player(game):
+    """Test that players are found by name, and that a hospital removed
+    while cleaning can no longer be found."""
+
+    for party in ("residents", "hospitals"):
+        for player in getattr(game, party):
+            assert game.get_player(player.name, party) is player
+
+    hospital = game.hospitals[0]
+    hospital.capacity = 0
+
+    with pytest.warns(PlayerExcludedWarning):
+        game._check_inputs_player_capacity("hospitals", "residents")
+
+    if game.clean:
+        with pytest.raises(ValueError):
+            game.get_player(hospital.name, "hospitals")
+    else:
+        assert game.get_player(hospital.name, "hospitals") is hospital
+
+
 @given(game=games(), optimal=sampled_from(["resident", "hospital"]))
 def test_solve(game, optimal):
     """Test for the correct solving of games."""
@@ -271,6 +304,160 @@ def test_solve(game, optimal):
         assert resident.matching is None
 
 
+def _get_state(game):
+    """Get the names of the preferences and matches of every player."""
+
+    return [
+        (player.name, [p.name for p in player.prefs], repr(player.matching))
+        for player in game.residents + game.hospitals
+    ]
+
+
+@given(game=games(), optimal=sampled_from(["resident", "hospital"]))
+def test_solve_iter(game, optimal):
+    """Test that solving a game step by step reports its progress and
+    finds the same matching as solving it at once."""
+
+    other = copy.deepcopy(game)
+    expected = other.solve(optimal)
+
+    steps = list(game.solve_iter(optimal, chunk=1))
+    proposals = [progress.proposals for progress in steps]
+    assert proposals == list(range(1, len(steps) + 1))
+    assert all(progress.free > 0 for progress in steps)
+
+    assert isinstance(game.matching, MultipleMatching)
+    assert _get_state(game) == _get_state(other)
+    assert repr(game.matching) == repr(expected)
+
+
+@given(game=games(), optimal=sampled_from(["resident", "hospital"]))
+def test_solve_interrupted(game, optimal):
+    """Test that a solve that is stopped part of the way through leaves
+    the game as it was."""
+
+    state = _get_state(game)
+
+    steps = game.solve_iter(optimal, chunk=1)
+    next(steps)
+    steps.close()
+    assert _get_state(game) == state
+    assert game.matching is None
+
+    with pytest.raises(SolveInterruptedError) as error:
+        game.solve(optimal, time_budget=0)
+    assert error.value.reason == "time_budget"
+
+    event = threading.Event()
+    event.set()
+    with pytest.raises(SolveInterruptedError) as error:
+        game.solve(optimal, cancel_event=event)
+    assert error.value.reason == "cancelled"
+    assert _get_state(game) == state
+
+    event.clear()
+    matching = game.solve(optimal, time_budget=60, cancel_event=event)
+    assert matching is game.matching
+    assert game.check_stability()
+
+
+@given(game=games())
+def test_solve_rounds(game):
+    """Test that solving a game in rounds finds the same matching as
+    solving it one proposal at a time, and leaves the players the same."""
+
+    other = copy.deepcopy(game)
+    expected = other.solve()
+
+    steps = list(game.solve_iter(engine="rounds"))
+    assert all(progress.free > 0 for progress in steps)
+    assert _get_state(game) == _get_state(other)
+    assert repr(game.matching) == repr(expected)
+
+    matching = copy.deepcopy(other).solve(engine="rounds")
+    assert repr(matching) == repr(expected)
+
+    with pytest.raises(ValueError):
+        game.solve("hospital", engine="rounds")
+    with pytest.raises(ValueError):
+        game.solve(engine="parallel")
+
+
+@given(game=games(), optimal=sampled_from(["resident", "hospital"]))
+def test_solve_backend(game, optimal):
+    """Test that solving a game with the numba backend finds the same
+    matching as the default one, whether or not numba is installed."""
+
+    other = copy.deepcopy(game)
+    expected = other.solve(optimal)
+
+    matching = game.solve(optimal, backend="numba")
+    assert _get_state(game) == _get_state(other)
+    assert repr(matching) == repr(expected)
+
+    with pytest.raises(ValueError):
+        game.solve(optimal, backend="fortran")
+
+
+@given(
+    game=games(residents_from=text("ABCDE"), hospitals_from=text("XYZ")),
+    optimal=sampled_from(["resident", "hospital"]),
+    step=integers(min_value=1, max_value=20),
+)
+def test_checkpoint(game, optimal, step):
+    """Test that a solve saved part of the way through carries on to find
+    the same matching as solving the game at once."""
+
+    other = copy.deepcopy(game)
+    expected = other.solve(optimal)
+
+    steps = game.solve_iter(optimal, chunk=1)
+    progress = [next(steps, None) for _ in range(step)][-1]
+    if progress is None:
+        with pytest.raises(ValueError):
+            game.checkpoint("never_written.npz")
+        return
+
+    with tempfile.TemporaryDirectory() as directory:
+        path = os.path.join(directory, "checkpoint.npz")
+        game.checkpoint(path)
+        steps.close()
+
+        loaded = HospitalResident.load_checkpoint(path)
+        other_optimal = "hospital" if optimal == "resident" else "resident"
+        with pytest.raises(ValueError):
+            loaded.solve(other_optimal)
+
+        steps = loaded.solve_iter(optimal, chunk=1)
+        assert next(steps) == progress
+        steps.close()
+        assert loaded.matching is None
+
+        matching = loaded.solve(optimal)
+
+    assert _get_state(loaded) == _get_state(other)
+    assert repr(matching) == repr(expected)
+    assert loaded._checkpoint is None
+
+
+def test_checkpoint_null_names():
+    """Test that a game with names that cannot be stored is refused when
+    saved, rather than being saved with the wrong names."""
+
+    game = HospitalResident.create_from_dictionaries(
+        {"A\x00": ["X"], "B": ["X"]}, {"X": ["B", "A\x00"]}, {"X": 1}
+    )
+    steps = game.solve_iter(chunk=1)
+    next(steps)
+
+    with tempfile.TemporaryDirectory() as directory:
+        path = os.path.join(directory, "checkpoint.npz")
+        with pytest.raises(ValueError, match="null character"):
+            game.checkpoint(path)
+        with pytest.raises(ValueError, match="null character"):
+            game.save(path)
+
+
 @given(game=games())
 def test_check_validity(game):
     """Test for a valid matching when the game is solved."""
@@ -369,3 +556,216 @@ def test_check_stability():
     matching[y] = [a, b]
 
     assert not game.check_stability()
+
+
+@given(game=games(), optimal=sampled_from(["resident", "hospital"]))
+def test_recheck_stability(game, optimal):
+    """Test that rechecking the stability of a matching after some
+    changes finds the same blocking pairs as checking it afresh."""
+
+    matching = game.solve(optimal)
+    assert game.recheck_stability()
+    assert game.blocking_pairs == []
+
+    hospitals = [hospital for hospital in game.hospitals if hospital.matching]
+    dropped = [hospital.matching[-1] for hospital in hospitals]
+    matching.update_many({h: h.matching[:-1] for h in hospitals})
+    for resident in dropped:
+        resident.matching = None
+
+    stable = game.recheck_stability()
+    blocking_pairs = game.blocking_pairs
+    assert not matching._changed
+
+    assert stable == game.check_stability()
+    assert blocking_pairs == game.blocking_pairs
+
+
+@given(
+    game=games(residents_from=text("ABCDE"), hospitals_from=text("XYZ")),
+    solve=booleans(),
+    mmap=booleans(),
+)
+def test_save_and_load(game, solve, mmap):
+    """Test that a game and its matching can be saved and loaded."""
+
+    if solve:
+        game.solve()
+
+    with tempfile.TemporaryDirectory() as directory:
+        path = os.path.join(directory, "game.npz")
+        game.save(path)
+        loaded = HospitalResident.load(path, mmap=mmap)
+
+    assert isinstance(loaded, HospitalResident)
+    assert loaded.clean is game.clean
+    for party in ("residents", "hospitals"):
+        players, loaded_players = vars(game)[party], vars(loaded)[party]
+        assert [p.name for p in loaded_players] == [p.name for p in players]
+        for player, loaded_player in zip(players, loaded_players):
+            assert [p.name for p in loaded_player.prefs] == [
+                p.name for p in player.prefs
+            ]
+
+    for hospital, loaded_hospital in zip(game.hospitals, loaded.hospitals):
+        assert loaded_hospital.capacity == hospital.capacity
+
+    if solve:
+        assert {
+            h.name: [r.name for r in rs] for h, rs in loaded.matching.items()
+        } == {h.name: [r.name for r in rs] for h, rs in game.matching.items()}
+        assert loaded.check_stability() == game.check_stability()
+    else:
+        assert loaded.matching is None
+
+
+@given(
+    connections=connections(),
+    optimal=sampled_from(["resident", "hospital"]),
+)
+def test_reduce(connections, optimal):
+    """Test that reducing a game removes pairs without changing its
+    optimal matchings."""
+
+    with warnings.catch_warnings():
+        warnings.simplefilter("ignore")
+        game = HospitalResident.create_from_dictionaries(
+            *connections, clean=True
+        )
+        reduced = HospitalResident.create_from_dictionaries(
+            *connections, clean=True
+        )
+
+    removed = reduced.reduce()
+    assert removed == sum(
+        len(r.prefs) - len(reduced_r.prefs)
+        for r, reduced_r in zip(game.residents, reduced.residents)
+    )
+    assert reduced.reduce() == 0
+
+    for resident in reduced.residents:
+        for hospital in resident.prefs:
+            assert resident in hospital.prefs
+
+    game.solve(optimal)
+    reduced.solve(optimal)
+    assert {
+        h.name: [r.name for r in rs] for h, rs in reduced.matching.items()
+    } == {h.name: [r.name for r in rs] for h, rs in game.matching.items()}
+
+
+@given(
+    connections=connections(),
+    changes=lists(integers(-3, 3), min_size=1, max_size=3),
+)
+def test_sweep_capacities(connections, changes):
+    """Test that sweeping capacities gives the changes to the
+    resident-optimal matching of a new game for each scenario."""
+
+    resident_prefs, hospital_prefs, capacities = connections
+    scenarios = []
+    for change in changes:
+        scenarios.append(
+            {h: max(c + change, 0) for h, c in list(capacities.items())[1:]}
+        )
+        scenarios.append(
+            {h: max(c + change, 0) for h, c in capacities.items()}
+        )
+
+    game = HospitalResident.create_from_dictionaries(*connections)
+    deltas = game.sweep_capacities(scenarios)
+
+    assert game.matching is None
+
+    def solve(capacities):
+        """Get the match of each resident in a new game."""
+
+        with warnings.catch_warnings():
+            warnings.simplefilter("ignore")
+            new = HospitalResident.create_from_dictionaries(
+                resident_prefs, hospital_prefs, capacities, clean=True
+            )
+
+        new.solve()
+        return {
+            r.name: getattr(r.matching, "name", None) for r in new.residents
+        }
+
+    base = solve(capacities)
+    for i, scenario in enumerate(scenarios):
+        expected = solve({**capacities, **scenario})
+        matches = dict(base)
+        for row in deltas[deltas.scenario == i]:
+            resident = game.residents[row.resident].name
+            assert base[resident] == getattr(
+                game.hospitals[row.before] if row.before >= 0 else None,
+                "name",
+                None,
+            )
+            matches[resident] = (
+                game.hospitals[row.after].name if row.after >= 0 else None
+            )
+
+        assert matches == expected
+
+
+def test_sweep_capacities_workers():
+    """Test that scenarios swept in worker processes give the same table,
+    and that invalid scenarios are refused."""
+
+    game = HospitalResident.create_from_dictionaries(
+        {"A": ["X", "Y"], "B": ["X", "Y"], "C": ["X"]},
+        {"X": ["C", "A", "B"], "Y": ["B", "A"]},
+        {"X": 2, "Y": 1},
+    )
+    scenarios = [{"X": 1}, {"X": 3}, {"Y": 0}, {"X": 0, "Y": 2}]
+
+    deltas = game.sweep_capacities(scenarios)
+    assert deltas.tolist() == [
+        (0, 0, 0, -1),
+        (1, 1, 1, 0),
+        (2, 1, 1, -1),
+        (3, 0, 0, 1),
+        (3, 2, 0, -1),
+    ]
+    assert game.sweep_capacities(scenarios, workers=2).tolist() == (
+        deltas.tolist()
+    )
+
+    with pytest.raises(ValueError):
+        game.sweep_capacities([{"Z": 1}])
+    with pytest.raises(ValueError):
+        game.sweep_capacities([{"X": -1}])
+
+
+def test_sweep_capacities_threads():
+    """Test that sweeps of different games in threads at once do not get
+    in the way of each other."""
+
+    games = [
+        HospitalResident.create_from_dictionaries(
+            {r: ["X", "Y"] if r % 2 else ["Y", "X"] for r in range(size)},
+            {"X": list(range(size)), "Y": list(range(size))[::-1]},
+            {"X": size // 2, "Y": size // 2},
+        )
+        for size in (20, 40, 60, 80)
+    ]
+    scenarios = [{"X": c} for c in range(20)] * 5
+    expected = [game.sweep_capacities(scenarios).tolist() for game in games]
+
+    results = [None] * len(games)
+    barrier = threading.Barrier(len(games))
+
+    def sweep(i):
+        barrier.wait()
+        results[i] = games[i].sweep_capacities(scenarios).tolist()
+
+    threads = [
+        threading.Thread(target=sweep, args=(i,)) for i in range(len(games))
+    ]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    assert results == expected
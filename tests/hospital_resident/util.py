@@ -98,3 +98,13 @@ def games(draw, clean=booleans(), **kwargs):
 
     residents, hospitals = draw(players(**kwargs))
     return HospitalResident(residents, hospitals, draw(clean))
+
+
+def make_hr():
+    """Make a small instance of HR."""
+
+    return HospitalResident.create_from_dictionaries(
+        {"A": ["C"], "S": ["C", "M"], "D": ["C", "M", "G"], "J": ["C", "G"]},
+        {"M": ["D", "S"], "C": ["D", "A", "S", "J"], "G": ["D", "J"]},
+        {"M": 1, "C": 2, "G": 1},
+    )
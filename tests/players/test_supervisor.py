@@ -48,3 +48,37 @@ def test_set_prefs(name, capacity, pref_names):
         assert project.prefs == students
         assert project._pref_names == pref_names
         assert project._original_prefs == students
+
+
+@given(name=text(), capacity=integers(), pref_names=lists(text(), min_size=1))
+def test_forget(name, capacity, pref_names):
+    """Test that a supervisor only forgets a student once none of its
+    projects rank them."""
+
+    supervisor = Supervisor(name, capacity)
+    projects = [Project(i, capacity) for i in range(2)]
+    for project in projects:
+        project.set_supervisor(supervisor)
+
+    students = []
+    for sname in pref_names:
+        student = Student(sname)
+        student.set_prefs(projects)
+        students.append(student)
+
+    supervisor.set_prefs(students)
+    assert supervisor._project_counts == {student: 2 for student in students}
+
+    student = students[0]
+    projects[0]._forget(student)
+    assert supervisor._project_counts[student] == 1
+    assert student in supervisor.prefs
+
+    projects[1]._forget(student)
+    assert supervisor._project_counts[student] == 0
+    assert student not in supervisor.prefs
+
+    projects[1].set_prefs(students[1:])
+    assert supervisor._project_counts == {
+        other: 1 + (other in projects[0].prefs) for other in students[1:]
+    }
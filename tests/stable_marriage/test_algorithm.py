@@ -1,6 +1,9 @@
 """Integration tests for the Stable Marriage Problem algorithm."""
 
+import copy
+
 from matching.algorithms import stable_marriage
+from matching.algorithms.stable_marriage import stable_marriage_jit
 
 from .util import STABLE_MARRIAGE, make_players
 
@@ -39,3 +42,23 @@ def test_reviewer_optimal(player_names, seed):
         for suit in preferred:
             partner = suit.matching
             assert suit.prefs.index(reviewer) > suit.prefs.index(partner)
+
+
+@STABLE_MARRIAGE
+def test_stable_marriage_jit(player_names, seed):
+    """Test that the kernel of the algorithm finds the same matching, and
+    leaves the players the same, as the algorithm itself."""
+
+    for optimal in ["suitor", "reviewer"]:
+        suitors, reviewers = make_players(player_names, seed)
+        others = copy.deepcopy(suitors + reviewers)
+
+        matching = stable_marriage_jit(suitors, reviewers, optimal)
+        expected = stable_marriage(
+            others[: len(suitors)], others[len(suitors) :], optimal
+        )
+
+        assert repr(matching) == repr(expected)
+        for player, other in zip(suitors + reviewers, others):
+            assert repr(player.prefs) == repr(other.prefs)
+            assert repr(player.matching) == repr(other.matching)
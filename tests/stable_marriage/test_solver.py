@@ -1,5 +1,8 @@
 """Unit tests for the SM solver."""
 
+import os
+import tempfile
+
 import pytest
 
 from matching import Player, SingleMatching
@@ -105,6 +108,37 @@ def test_solve(player_names, seed):
             assert game_reviewer._pref_names == reviewer._pref_names
 
 
+@STABLE_MARRIAGE
+def test_checkpoint(player_names, seed):
+    """Test that a solve saved at any step carries on to find the same
+    matching as solving the game at once."""
+
+    for optimal in ["suitor", "reviewer"]:
+        suitors, reviewers = make_players(player_names, seed)
+        expected = StableMarriage(suitors, reviewers).solve(optimal)
+        num_steps = len(
+            list(StableMarriage(suitors, reviewers).solve_iter(optimal, 1))
+        )
+
+        for step in range(num_steps):
+            game = StableMarriage(suitors, reviewers)
+            steps = game.solve_iter(optimal, chunk=1)
+            for _ in range(step + 1):
+                next(steps)
+
+            with tempfile.TemporaryDirectory() as directory:
+                path = os.path.join(directory, "checkpoint.npz")
+                game.checkpoint(path)
+                steps.close()
+
+                loaded = StableMarriage.load_checkpoint(path)
+                matching = loaded.solve(optimal)
+
+            assert {s.name: r.name for s, r in matching.items()} == {
+                s.name: r.name for s, r in expected.items()
+            }
+
+
 @STABLE_MARRIAGE
 def test_check_validity(player_names, seed):
     """Test for a valid matching when the game is solved."""
@@ -190,3 +224,59 @@ def test_check_stability():
     matching[b] = x
 
     assert not game.check_stability()
+
+
+@STABLE_MARRIAGE
+def test_recheck_stability(player_names, seed):
+    """Test that rechecking the stability of a matching after some
+    changes finds the same blocking pairs as checking it afresh."""
+
+    suitor_prefs, reviewer_prefs = make_prefs(player_names, seed)
+    game = StableMarriage.create_from_dictionaries(
+        suitor_prefs, reviewer_prefs
+    )
+
+    matching = game.solve()
+    assert game.check_stability()
+
+    first, last = game.suitors[0], game.suitors[-1]
+    matching.update_many({first: last.matching, last: first.matching})
+
+    stable = game.recheck_stability()
+    blocking_pairs = game.blocking_pairs
+    assert not matching._changed
+
+    assert stable == game.check_stability()
+    assert blocking_pairs == game.blocking_pairs
+
+
+@STABLE_MARRIAGE
+def test_save_and_load(player_names, seed):
+    """Test that a game and its matching can be saved and loaded."""
+
+    suitors, reviewers = make_players(player_names, seed)
+    game = StableMarriage(suitors, reviewers)
+
+    with tempfile.TemporaryDirectory() as directory:
+        path = os.path.join(directory, "game.npz")
+        game.save(path)
+        loaded = StableMarriage.load(path)
+        assert loaded.matching is None
+
+        for party in ("suitors", "reviewers"):
+            players, loaded_players = vars(game)[party], vars(loaded)[party]
+            for player, loaded_player in zip(players, loaded_players):
+                assert loaded_player.name == player.name
+                assert [p.name for p in loaded_player.prefs] == [
+                    p.name for p in player.prefs
+                ]
+
+        game.solve()
+        game.save(path)
+        loaded = StableMarriage.load(path)
+
+    assert {s.name: r.name for s, r in loaded.matching.items()} == {
+        s.name: r.name for s, r in game.matching.items()
+    }
+    assert loaded.check_validity()
+    assert loaded.check_stability()
@@ -5,6 +5,7 @@ from hypothesis import given
 from hypothesis.strategies import composite, integers, lists, sampled_from
 
 from matching import Player
+from matching.games import StableMarriage
 
 
 @composite
@@ -71,3 +72,11 @@ STABLE_MARRIAGE = given(
     ),
     seed=integers(min_value=0, max_value=2**32 - 1),
 )
+
+
+def make_sm():
+    """Make a small instance of SM."""
+
+    return StableMarriage.create_from_dictionaries(
+        {"A": ["X", "Y"], "B": ["X", "Y"]}, {"X": ["B", "A"], "Y": ["A", "B"]}
+    )
@@ -1,5 +1,6 @@
 """Integration and unit tests for the SR algorithm."""
 
+import copy
 import warnings
 
 from hypothesis import assume, given
@@ -10,6 +11,7 @@ from matching.algorithms.stable_roommates import (
     locate_all_or_nothing_cycle,
     second_phase,
     stable_roommates,
+    stable_roommates_jit,
 )
 from matching.exceptions import NoStableMatchingWarning
 
@@ -113,3 +115,27 @@ def test_stable_roommates(players):
             assert not player.prefs
         else:
             assert match == player.prefs[0]
+
+
+@given(players=players())
+def test_stable_roommates_jit(players):
+    """Test that the kernels of the algorithm find the same matching,
+    give the same warnings, and leave the players the same, as the
+    algorithm itself."""
+
+    others = copy.deepcopy(players)
+
+    with warnings.catch_warnings(record=True) as caught:
+        warnings.simplefilter("always")
+        matching = stable_roommates_jit(players)
+    with warnings.catch_warnings(record=True) as expected_caught:
+        warnings.simplefilter("always")
+        expected = stable_roommates(others)
+
+    assert repr(matching) == repr(expected)
+    assert [str(w.message) for w in caught] == [
+        str(w.message) for w in expected_caught
+    ]
+    for player, other in zip(players, others):
+        assert repr(player.prefs) == repr(other.prefs)
+        assert repr(player.matching) == repr(other.matching)
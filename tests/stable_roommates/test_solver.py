@@ -1,9 +1,12 @@
 """Unit tests for the SR solver."""
 
+import os
+import tempfile
 import warnings
 
 import pytest
 from hypothesis import given
+from hypothesis.strategies import integers
 
 from matching import Player, SingleMatching
 from matching.exceptions import MatchingError, NoStableMatchingWarning
@@ -73,6 +76,65 @@ def test_solve(game):
             assert match in game.players
 
 
+@given(game=games())
+def test_solve_iter(game):
+    """Test that solving a game step by step finds the same matching as
+    solving it at once."""
+
+    other = StableRoommates.create_from_dictionary(
+        {p.name: p._pref_names for p in game.players}
+    )
+    with warnings.catch_warnings():
+        warnings.simplefilter("ignore")
+        expected = other.solve()
+        steps = list(game.solve_iter(chunk=1))
+
+    assert [progress.proposals for progress in steps] == list(
+        range(1, len(steps) + 1)
+    )
+    assert {p.name: repr(m) for p, m in game.matching.items()} == {
+        p.name: repr(m) for p, m in expected.items()
+    }
+
+
+@given(
+    game=games(players_from=integers(0, 100)),
+    step=integers(min_value=1, max_value=20),
+)
+def test_checkpoint(game, step):
+    """Test that a solve saved in either phase carries on to find the same
+    matching as solving the game at once."""
+
+    other = StableRoommates.create_from_dictionary(
+        {p.name: p._pref_names for p in game.players}
+    )
+    with warnings.catch_warnings():
+        warnings.simplefilter("ignore")
+        expected = other.solve()
+
+        steps = game.solve_iter(chunk=1)
+        progress = [next(steps, None) for _ in range(step)][-1]
+        if progress is None:
+            with pytest.raises(ValueError):
+                game.checkpoint("never_written.npz")
+            return
+
+        with tempfile.TemporaryDirectory() as directory:
+            path = os.path.join(directory, "checkpoint.npz")
+            game.checkpoint(path)
+            steps.close()
+
+            loaded = StableRoommates.load_checkpoint(path)
+            matching = loaded.solve()
+
+    assert {p.name: repr(m) for p, m in matching.items()} == {
+        p.name: repr(m) for p, m in expected.items()
+    }
+    assert repr([p.prefs for p in loaded.players]) == repr(
+        [p.prefs for p in other.players]
+    )
+
+
 @given(game=games())
 def test_check_validity(game):
     """Test for error if any players are left unmatched."""
@@ -113,8 +175,40 @@ def test_stability():
     matching[c] = a
     matching[d] = b
 
+    assert not game.recheck_stability()
+    blocking_pairs = game.blocking_pairs
     assert not game.check_stability()
+    assert blocking_pairs == game.blocking_pairs
 
     matching[a] = None
     matching[c] = None
+    assert not game.recheck_stability()
     assert not game.check_stability()
+
+
+@given(game=games(players_from=integers(0, 100)))
+def test_save_and_load(game):
+    """Test that a game and its matching can be saved and loaded."""
+
+    with warnings.catch_warnings():
+        warnings.simplefilter("ignore")
+        game.solve()
+
+    with tempfile.TemporaryDirectory() as directory:
+        path = os.path.join(directory, "game.npz")
+        game.save(path)
+        loaded = StableRoommates.load(path)
+
+    assert [p.name for p in loaded.players] == [p.name for p in game.players]
+    for player, loaded_player in zip(game.players, loaded.players):
+        assert [p.name for p in loaded_player.prefs] == [
+            p.name for p in player.prefs
+        ]
+        assert [p.name for p in loaded_player._original_prefs] == [
+            p.name for p in player._original_prefs
+        ]
+        assert getattr(loaded_player.matching, "name", None) == getattr(
+            player.matching, "name", None
+        )
+
+    assert loaded.check_stability() == game.check_stability()
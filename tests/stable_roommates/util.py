@@ -57,3 +57,11 @@ def games(draw, **kwargs):
 
     players_ = draw(players(**kwargs))
     return StableRoommates(players_)
+
+
+def make_sr():
+    """Make a small instance of SR."""
+
+    return StableRoommates.create_from_dictionary(
+        {1: [2, 3, 4], 2: [1, 3, 4], 3: [4, 1, 2], 4: [3, 1, 2]}
+    )
@@ -1,10 +1,13 @@
 """Tests for the Student Allocation algorithm."""
 
+import copy
+
 import numpy as np
 
 from matching.algorithms.student_allocation import (
     student_allocation,
     student_optimal,
+    student_optimal_jit,
     supervisor_optimal,
 )
 
@@ -88,3 +91,61 @@ def test_supervisor_optimal(
             idx = supervisor.prefs.index(student)
             assert idx >= old_idx
             old_idx = idx
+
+
+@STUDENT_ALLOCATION
+def test_student_optimal_deletes_pairs(
+    student_names, project_names, supervisor_names, capacities, seed, clean
+):
+    """Test that the student-optimal algorithm deletes pairs from both
+    sides, and that supervisors forget only students no project ranks."""
+
+    np.random.seed(seed)
+    students, projects, supervisors = make_players(
+        student_names, project_names, supervisor_names, capacities
+    )
+    originals = {supervisor: supervisor.prefs[:] for supervisor in supervisors}
+
+    student_optimal(students, projects)
+
+    for project in projects:
+        for student in project.prefs:
+            assert project in student.prefs
+        for student in project.matching:
+            assert student.matching == project
+
+    for student in students:
+        for project in student.prefs:
+            assert student in project.prefs
+
+    for supervisor in supervisors:
+        ranked = {s for project in supervisor.projects for s in project.prefs}
+        assert supervisor.prefs == [
+            s for s in originals[supervisor] if s in ranked
+        ]
+        assert len(supervisor.matching) <= supervisor.capacity
+
+
+@STUDENT_ALLOCATION
+def test_student_optimal_jit(
+    student_names, project_names, supervisor_names, capacities, seed, clean
+):
+    """Test that the kernel of the student-optimal algorithm leaves the
+    players as the algorithm itself does."""
+
+    np.random.seed(seed)
+    players = make_players(
+        student_names, project_names, supervisor_names, capacities
+    )
+    students, projects, supervisors = players
+    others = copy.deepcopy(players)
+
+    matching = student_optimal_jit(students, projects)
+    expected = student_optimal(*others[:2])
+
+    assert repr(matching) == repr(expected)
+    for player, other in zip(
+        students + projects + supervisors, sum(others, [])
+    ):
+        assert repr(player.prefs) == repr(other.prefs)
+        assert repr(player.matching) == repr(other.matching)
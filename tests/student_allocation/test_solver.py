@@ -1,5 +1,8 @@
 """Unit tests for the SA solver."""
 
+import copy
+import os
+import tempfile
 import warnings
 
 import pytest
@@ -387,6 +390,106 @@ def test_solve(
             assert student.matching is None
 
 
+@STUDENT_ALLOCATION
+def test_solve_iter(
+    student_names, project_names, supervisor_names, capacities, seed, clean
+):
+    """Test that solving a game step by step finds the same matching as
+    solving it at once."""
+
+    for optimal in ["student", "supervisor"]:
+        *_, game = make_game(
+            student_names,
+            project_names,
+            supervisor_names,
+            capacities,
+            seed,
+            clean,
+        )
+        other = copy.deepcopy(game)
+
+        expected = other.solve(optimal)
+        steps = list(game.solve_iter(optimal, chunk=1))
+
+        assert [progress.proposals for progress in steps] == list(
+            range(1, len(steps) + 1)
+        )
+        assert {p.name: repr(m) for p, m in game.matching.items()} == {
+            p.name: repr(m) for p, m in expected.items()
+        }
+
+
+@STUDENT_ALLOCATION
+def test_solve_rounds(
+    student_names, project_names, supervisor_names, capacities, seed, clean
+):
+    """Test that solving a game in rounds finds the same matching as
+    solving it one proposal at a time, and leaves the players the same."""
+
+    *_, game = make_game(
+        student_names, project_names, supervisor_names, capacities, seed, clean
+    )
+    other = copy.deepcopy(game)
+
+    expected = other.solve()
+    matching = game.solve(engine="rounds")
+
+    assert {p.name: repr(m) for p, m in matching.items()} == {
+        p.name: repr(m) for p, m in expected.items()
+    }
+    for player, other_player in zip(
+        game.students + game.projects + game.supervisors,
+        other.students + other.projects + other.supervisors,
+    ):
+        assert repr(player.prefs) == repr(other_player.prefs)
+        assert repr(player.matching) == repr(other_player.matching)
+
+    with pytest.raises(ValueError):
+        game.solve("supervisor", engine="rounds")
+
+
+@STUDENT_ALLOCATION
+def test_checkpoint(
+    student_names, project_names, supervisor_names, capacities, seed, clean
+):
+    """Test that a solve saved part of the way through carries on to find
+    the same matching as solving the game at once."""
+
+    for optimal in ["student", "supervisor"]:
+        *_, game = make_game(
+            student_names,
+            project_names,
+            supervisor_names,
+            capacities,
+            seed,
+            clean,
+        )
+        other = copy.deepcopy(game)
+        expected = other.solve(optimal)
+
+        steps = game.solve_iter(optimal, chunk=1)
+        if next(steps, None) is None:
+            continue
+
+        with tempfile.TemporaryDirectory() as directory:
+            path = os.path.join(directory, "checkpoint.npz")
+            game.checkpoint(path)
+            steps.close()
+
+            loaded = StudentAllocation.load_checkpoint(path, mmap=False)
+            matching = loaded.solve(optimal)
+
+        assert {p.name: repr(m) for p, m in matching.items()} == {
+            p.name: repr(m) for p, m in expected.items()
+        }
+        for player, other_player in zip(
+            loaded.students + loaded.supervisors,
+            other.students + other.supervisors,
+        ):
+            assert repr(player.prefs) == repr(other_player.prefs)
+            assert repr(player.matching) == repr(other_player.matching)
+
+
 @STUDENT_ALLOCATION
 def test_check_validity(
     student_names, project_names, supervisor_names, capacities, seed, clean
@@ -514,6 +617,48 @@ def test_check_for_oversubscribed_supervisors(
         assert str(supervisor.matching) in e
 
 
+@STUDENT_ALLOCATION
+def test_save_and_load(
+    student_names, project_names, supervisor_names, capacities, seed, clean
+):
+    """Test that a game and its matching can be saved and loaded."""
+
+    *_, game = make_game(
+        student_names, project_names, supervisor_names, capacities, seed, clean
+    )
+    game.solve()
+
+    with tempfile.TemporaryDirectory() as directory:
+        path = os.path.join(directory, "game.npz")
+        game.save(path)
+        loaded = StudentAllocation.load(path)
+
+    for party in ("students", "projects", "supervisors"):
+        players, loaded_players = vars(game)[party], vars(loaded)[party]
+        assert [p.name for p in loaded_players] == [p.name for p in players]
+        for player, loaded_player in zip(players, loaded_players):
+            assert [p.name for p in loaded_player.prefs] == [
+                p.name for p in player.prefs
+            ]
+
+    for project, loaded_project in zip(game.projects, loaded.projects):
+        assert loaded_project.capacity == project.capacity
+        assert loaded_project.supervisor.name == project.supervisor.name
+
+    for supervisor, loaded_supervisor in zip(
+        game.supervisors, loaded.supervisors
+    ):
+        assert loaded_supervisor.capacity == supervisor.capacity
+        assert [s.name for s in loaded_supervisor.matching] == [
+            s.name for s in supervisor.matching
+        ]
+
+    assert {
+        p.name: [s.name for s in ss] for p, ss in loaded.matching.items()
+    } == {p.name: [s.name for s in ss] for p, ss in game.matching.items()}
+    assert loaded.check_stability() == game.check_stability()
+
+
 def test_check_stability():
     """Test checker for whether a matching is stable or not."""
 
@@ -543,4 +688,43 @@ def test_check_stability():
     matching[p] = [c]
     matching[q] = [a, b]
 
+    assert not game.recheck_stability()
+    assert game.blocking_pairs == [(a, p)]
     assert not game.check_stability()
+    assert game.blocking_pairs == [(a, p)]
+
+
+@STUDENT_ALLOCATION
+def test_reduce(
+    student_names, project_names, supervisor_names, capacities, seed, clean
+):
+    """Test that reducing a game removes pairs without changing its
+    optimal matchings."""
+
+    *_, game = make_game(
+        student_names, project_names, supervisor_names, capacities, seed, clean
+    )
+    reduced = copy.deepcopy(game)
+
+    removed = reduced.reduce()
+    assert removed == sum(
+        len(s.prefs) - len(reduced_s.prefs)
+        for s, reduced_s in zip(game.students, reduced.students)
+    )
+
+    for supervisor in reduced.supervisors:
+        ranked = {s for p in supervisor.projects for s in p.prefs}
+        assert set(supervisor.prefs) == ranked
+
+    for optimal in ("student", "supervisor"):
+        matchings = []
+        for instance in map(copy.deepcopy, (game, reduced)):
+            instance.solve(optimal)
+            matchings.append(
+                {
+                    p.name: sorted(s.name for s in ss)
+                    for p, ss in instance.matching.items()
+                }
+            )
+
+        assert matchings[0] == matchings[1]
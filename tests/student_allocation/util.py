@@ -167,3 +167,15 @@ STUDENT_ALLOCATION = given(
     seed=integers(min_value=0, max_value=2**32 - 1),
     clean=booleans(),
 )
+
+
+def make_sa():
+    """Make a small instance of SA."""
+
+    return StudentAllocation.create_from_dictionaries(
+        {"A": ["P", "Q"], "B": ["P"], "C": ["Q", "P"]},
+        {"X": ["C", "B", "A"], "Y": ["A", "C"]},
+        {"P": "X", "Q": "Y"},
+        {"P": 1, "Q": 1},
+        {"X": 1, "Y": 1},
+    )
@@ -0,0 +1,126 @@
+"""Tests for solving many games at once with `matching.batch`."""
+
+import asyncio
+import threading
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+
+import pytest
+from base.util import matching_names
+from hospital_resident.util import make_hr
+from stable_roommates.util import make_sr
+
+from matching.batch import solve_many, solve_many_async
+
+
+@pytest.mark.parametrize("serialise", (None, True))
+def test_solve_async_in_threads(serialise):
+    """Test that a game can be solved in the default executor."""
+
+    expected = matching_names(make_hr().solve("hospital"))
+    game = make_hr()
+
+    matching = asyncio.run(
+        game.solve_async(optimal="hospital", serialise=serialise)
+    )
+
+    assert matching is game.matching
+    assert matching_names(matching) == expected
+    assert game.check_validity() and game.check_stability()
+
+
+def test_solve_many_async_in_processes():
+    """Test that games sent to a process pool are solved as arrays."""
+
+    games = [make_hr(), make_sr(), make_hr()]
+    expected = [
+        matching_names(make_hr().solve()),
+        matching_names(make_sr().solve()),
+    ]
+
+    async def solve_all():
+        with ProcessPoolExecutor(max_workers=2) as executor:
+            return await solve_many_async(games[::2], executor=executor), (
+                await make_sr().solve_async(executor=executor)
+            )
+
+    hr_matchings, sr_matching = asyncio.run(solve_all())
+
+    assert [matching_names(m) for m in hr_matchings] == [expected[0]] * 2
+    assert matching_names(sr_matching) == expected[1]
+    for game in games[::2]:
+        assert game.check_validity() and game.check_stability()
+        assert all(
+            resident in game.matching[resident.matching]
+            for resident in game.residents
+            if resident.matching is not None
+        )
+
+
+def test_solve_async_timeout_and_cancel():
+    """Test that a serialised game is untouched by timeouts and
+    cancellation."""
+
+    release = threading.Event()
+    game = make_hr()
+
+    async def solve_late(executor):
+        executor.submit(release.wait, 5)
+
+        with pytest.raises(asyncio.TimeoutError):
+            await game.solve_async(
+                executor=executor, timeout=0.01, serialise=True
+            )
+
+        task = asyncio.ensure_future(
+            solve_many_async([game], executor=executor, serialise=True)
+        )
+        await asyncio.sleep(0.01)
+        task.cancel()
+        with pytest.raises(asyncio.CancelledError):
+            await task
+
+        release.set()
+
+    with ThreadPoolExecutor(max_workers=1) as executor:
+        asyncio.run(solve_late(executor))
+
+    assert game.matching is None
+    assert all(resident.matching is None for resident in game.residents)
+
+
+def test_solve_many():
+    """Test that games can be solved in and out of an executor."""
+
+    expected = matching_names(make_hr().solve("hospital"))
+
+    matchings = solve_many([make_hr(), make_hr()], "hospital")
+    assert [matching_names(m) for m in matchings] == [expected] * 2
+
+    with ThreadPoolExecutor(max_workers=2) as executor:
+        matchings = solve_many(
+            [make_hr(), make_hr()], "hospital", executor=executor
+        )
+    assert [matching_names(m) for m in matchings] == [expected] * 2
+
+
+@pytest.mark.parametrize("make_game", (make_hr, make_sr))
+def test_serialise_result_type(make_game):
+    """Test that serialising games does not change the class of the
+    matchings they are given."""
+
+    expected = type(make_game().solve())
+    with ThreadPoolExecutor(max_workers=2) as executor:
+        for serialise in (False, True):
+            (matching,) = solve_many(
+                [make_game()], executor=executor, serialise=serialise
+            )
+            (result,) = asyncio.run(
+                solve_many_async(
+                    [make_game()], executor=executor, serialise=serialise
+                )
+            )
+            single = asyncio.run(
+                make_game().solve_async(executor=executor, serialise=serialise)
+            )
+
+            assert type(matching) is type(result) is type(single) is expected
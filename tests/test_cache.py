@@ -0,0 +1,192 @@
+"""Tests for the solve cache in `matching.cache`."""
+
+import json
+import os
+import tempfile
+import threading
+
+import pytest
+from base.util import matching_names
+from hospital_resident.util import make_hr
+from stable_marriage.util import make_sm
+from stable_roommates.util import make_sr
+from student_allocation.util import make_sa
+
+from matching.cache import CacheInfo, SolveCache
+from matching.exceptions import SolveInterruptedError
+from matching.games import HospitalResident, StableMarriage
+
+
+def _reversed(dictionary):
+    """Get a dictionary with its items in the reverse order."""
+
+    return dict(reversed(list(dictionary.items())))
+
+
+def test_solve_hit_for_reordered_instance():
+    """Test that an instance is found in the cache whatever its order."""
+
+    here = os.path.dirname(__file__)
+    path = os.path.join(here, "hospital_resident", "data", "issue_159.json")
+    with open(path, "r") as f:
+        preferences = json.load(f)
+
+    resident_prefs = {
+        int(res): prefs for res, prefs in preferences["residents"].items()
+    }
+    hospital_prefs = {
+        int(hos): prefs for hos, prefs in preferences["hospitals"].items()
+    }
+    capacities = {hospital: 2 for hospital in hospital_prefs}
+    cache = SolveCache()
+
+    game = HospitalResident.create_from_dictionaries(
+        resident_prefs, hospital_prefs, capacities, clean=True
+    )
+    expected = matching_names(game.solve(cache=cache))
+    assert cache.cache_info() == CacheInfo(0, 1, 128, 1)
+
+    other = HospitalResident.create_from_dictionaries(
+        _reversed(resident_prefs),
+        _reversed(hospital_prefs),
+        capacities,
+        clean=True,
+    )
+    matching = other.solve(cache=cache)
+    assert cache.cache_info() == CacheInfo(1, 1, 128, 1)
+
+    assert matching_names(matching) == expected
+    assert other.matching is matching
+    assert other.check_validity()
+    assert other.check_stability()
+    for hospital, residents in matching.items():
+        assert hospital.matching == residents
+        for resident in residents:
+            assert resident.matching is hospital
+
+
+def test_solve_optimality_in_key():
+    """Test that solutions of different optimality are kept apart."""
+
+    cache = SolveCache()
+    for optimal in ("resident", "hospital", "resident"):
+        game = HospitalResident.create_from_dictionaries(
+            {"A": ["X", "Y"], "B": ["Y", "X"]},
+            {"X": ["B", "A"], "Y": ["A", "B"]},
+            {"X": 1, "Y": 1},
+        )
+        matching = game.solve(optimal, cache=cache)
+        expected = {"X": ["A"], "Y": ["B"]}
+        if optimal == "hospital":
+            expected = {"X": ["B"], "Y": ["A"]}
+
+        assert matching_names(matching) == expected
+
+    assert (cache.hits, cache.misses) == (1, 2)
+
+
+def test_solve_names_not_storable():
+    """Test that games whose names cannot be stored in an array are still
+    cached, by the reprs of their names."""
+
+    suitor_prefs = {("A", 1): [0, "0"], ("B", 2): ["0", 0]}
+    reviewer_prefs = {0: [("B", 2), ("A", 1)], "0": [("A", 1), ("B", 2)]}
+
+    cache = SolveCache()
+    for prefs in (suitor_prefs, _reversed(suitor_prefs)):
+        game = StableMarriage.create_from_dictionaries(prefs, reviewer_prefs)
+        matching = game.solve(cache=cache)
+
+        assert matching_names(matching) == {("A", 1): 0, ("B", 2): "0"}
+
+    assert (cache.hits, cache.misses) == (1, 1)
+
+
+def test_solve_clashing_reprs():
+    """Test that a game whose names have the same reprs is solved without
+    the cache."""
+
+    class Name:
+        def __repr__(self):
+            return "name"
+
+    first, second = Name(), Name()
+    game = StableMarriage.create_from_dictionaries(
+        {first: ["X", "Y"], second: ["Y", "X"]},
+        {"X": [first, second], "Y": [second, first]},
+    )
+    cache = SolveCache()
+    matching = game.solve(cache=cache)
+
+    assert matching_names(matching) == {first: "X", second: "Y"}
+    assert len(cache) == 0
+
+
+@pytest.mark.parametrize("make_game", (make_hr, make_sm, make_sr, make_sa))
+def test_solve_passes_arguments(make_game):
+    """Test that the cache solves a new instance with the other arguments
+    given to the game."""
+
+    cache = SolveCache()
+    cancel_event = threading.Event()
+    cancel_event.set()
+    with pytest.raises(SolveInterruptedError):
+        make_game().solve(cache=cache, cancel_event=cancel_event)
+
+    assert len(cache) == 0
+
+    expected = matching_names(make_game().solve())
+    matching = make_game().solve(cache=cache, time_budget=60)
+
+    assert matching_names(matching) == expected
+    assert cache.cache_info() == CacheInfo(0, 2, 128, 1)
+
+
+@pytest.mark.parametrize("make_game", (make_hr, make_sm, make_sr, make_sa))
+def test_solve_hit_type(make_game):
+    """Test that a matching found in the cache is of the same class as one
+    found by solving the game."""
+
+    cache = SolveCache()
+    expected = make_game().solve()
+    make_game().solve(cache=cache)
+    matching = make_game().solve(cache=cache)
+
+    assert cache.hits == 1
+    assert type(matching) is type(expected)
+    assert matching_names(matching) == matching_names(expected)
+
+
+def test_lru_eviction_and_clear():
+    """Test that the least recently used matching is evicted."""
+
+    cache = SolveCache(maxsize=1)
+    for optimal in ("suitor", "reviewer", "suitor", "suitor"):
+        game = StableMarriage.create_from_dictionaries(
+            {"A": ["X", "Y"], "B": ["Y", "X"]},
+            {"X": ["B", "A"], "Y": ["A", "B"]},
+        )
+        game.solve(optimal, cache=cache)
+
+    assert cache.cache_info() == CacheInfo(1, 3, 1, 1)
+
+    cache.clear()
+    assert cache.cache_info() == CacheInfo(0, 0, 1, 0)
+
+
+@pytest.mark.parametrize("make_game", (make_sm, make_sr, make_sa))
+def test_solve_on_disk(make_game):
+    """Test that matchings on disk are shared between caches."""
+
+    with tempfile.TemporaryDirectory() as directory:
+        expected = matching_names(
+            make_game().solve(cache=SolveCache(0, directory))
+        )
+
+        cache = SolveCache(directory=directory)
+        game = make_game()
+        matching = game.solve(cache=cache)
+
+    assert cache.cache_info() == CacheInfo(1, 0, 128, 1)
+    assert matching_names(matching) == expected
+    assert game.check_validity()
@@ -0,0 +1,158 @@
+"""Tests for the command-line interface in `matching.cli`."""
+
+import json
+import os
+import subprocess
+import sys
+
+import pytest
+
+from matching.cli import main
+from matching.games import HospitalResident
+
+HERE = os.path.dirname(__file__)
+ISSUE_159 = os.path.join(HERE, "hospital_resident", "data", "issue_159.json")
+
+SM_INSTANCE = {
+    "suitors": {"A": ["X", "Y"], "B": ["Y", "X"]},
+    "reviewers": {"X": ["B", "A"], "Y": ["A", "B"]},
+}
+
+
+def _read_output(capsys):
+    """Read the lines of JSON written to stdout."""
+
+    return [json.loads(line) for line in capsys.readouterr().out.splitlines()]
+
+
+@pytest.mark.parametrize("workers", (0, 2))
+def test_issue_159(capsys, workers):
+    """Test that the HR instance of issue 159 is solved as it is in
+    Python, with verdicts on the matching."""
+
+    argv = ["hr", ISSUE_159, "--capacity", "2", "--clean", "--stability"]
+    assert main(argv + ["--validity", "--workers", str(workers)]) == 0
+
+    (result,) = _read_output(capsys)
+    assert result["instance"] == f"{ISSUE_159}:0"
+    assert result["stable"] is True
+    assert result["valid"] is True
+    assert result["issues"]
+
+    with open(ISSUE_159, "r") as f:
+        preferences = json.load(f)
+
+    game = HospitalResident.create_from_dictionaries(
+        {r: list(map(str, p)) for r, p in preferences["residents"].items()},
+        {h: list(map(str, p)) for h, p in preferences["hospitals"].items()},
+        {hospital: 2 for hospital in preferences["hospitals"]},
+        clean=True,
+    )
+    expected = {
+        hospital.name: [resident.name for resident in residents]
+        for hospital, residents in game.solve().items()
+    }
+    assert result["matching"] == expected
+
+
+def test_json_lines_and_errors(capsys, tmp_path):
+    """Test that each line of a JSON lines file is solved, and that an
+    instance that cannot be made is reported without stopping the rest."""
+
+    path = tmp_path / "instances.jsonl"
+    lines = [
+        dict(SM_INSTANCE, name="first"),
+        {"name": "second", "suitors": {"A": ["X"]}, "reviewers": {}},
+        dict(SM_INSTANCE, name="third"),
+    ]
+    path.write_text("\n".join(json.dumps(line) for line in lines))
+
+    argv = ["sm", str(path), "--workers", "2", "--optimal", "reviewer"]
+    assert main(argv) == 1
+
+    results = {result["instance"]: result for result in _read_output(capsys)}
+    assert set(results) == {"first", "second", "third"}
+    assert results["first"]["matching"] == {"A": "Y", "B": "X"}
+    assert results["third"] == {**results["first"], "instance": "third"}
+    assert set(results["second"]) == {"instance", "error"}
+
+
+def test_csv_and_output_file(tmp_path):
+    """Test that the preferences and capacities of an SA instance can be
+    read from files of rows and that the results can be written to a
+    file."""
+
+    (tmp_path / "students.csv").write_text(
+        "\n".join(["student,project,rank", "A,X,0", "B,Y,1", "B,X,0"])
+    )
+    (tmp_path / "supervisors.jsonl").write_text(
+        "\n".join(json.dumps(row) for row in [["F", "B", 0], ["F", "A", 1]])
+    )
+    (tmp_path / "capacities.csv").write_text("F,2")
+
+    path = tmp_path / "instance.json"
+    path.write_text(
+        json.dumps(
+            {
+                "students": "students.csv",
+                "supervisors": "supervisors.jsonl",
+                "project_supervisors": {"X": "F", "Y": "F"},
+                "supervisor_capacities": "capacities.csv",
+            }
+        )
+    )
+    output = tmp_path / "output.jsonl"
+
+    argv = ["sa", str(path), "--capacity", "1", "--output", str(output)]
+    assert main(argv + ["--workers", "0"]) == 0
+
+    (result,) = [json.loads(line) for line in output.read_text().splitlines()]
+    assert result["matching"] == {"X": ["B"], "Y": []}
+
+
+def test_clean_roommates(capsys, tmp_path):
+    """Test that an SR instance is cleaned when asked for."""
+
+    path = tmp_path / "instance.json"
+    path.write_text(
+        json.dumps(
+            {
+                "name": "repeated",
+                "players": {
+                    "A": ["B", "C", "D", "B"],
+                    "B": ["A", "D", "C"],
+                    "C": ["D", "A", "B"],
+                    "D": ["C", "B", "A"],
+                },
+            }
+        )
+    )
+
+    argv = ["sr", str(path), "--workers", "0", "--validate", "fast"]
+    assert main(argv) == 1
+    (result,) = _read_output(capsys)
+    assert "ranked a player multiple times" in result["error"]
+
+    assert main(argv + ["--clean", "--stability"]) == 0
+    (result,) = _read_output(capsys)
+    assert result["issues"] == ["A has ranked B multiple times."]
+    assert result["stable"] is True
+    assert result["matching"] == {"A": "B", "B": "A", "C": "D", "D": "C"}
+
+
+def test_module(tmp_path):
+    """Test that the interface runs with `python -m matching`."""
+
+    path = tmp_path / "instance.json"
+    path.write_text(
+        json.dumps([{"players": {"A": ["B", "C"], "B": ["A", "C"], "C": []}}])
+    )
+
+    output = subprocess.run(
+        [sys.executable, "-m", "matching", "sr", str(path), "-w", "0"],
+        capture_output=True,
+        text=True,
+    )
+
+    assert output.returncode == 1
+    assert "ValueError" in json.loads(output.stdout)["error"]
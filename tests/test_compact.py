@@ -0,0 +1,187 @@
+"""Tests for the array-backed matchings in `matching.compact`."""
+
+import os
+import tempfile
+
+import numpy as np
+import pytest
+from hospital_resident.util import games
+from hypothesis import given
+from hypothesis.strategies import sampled_from, text
+from stable_marriage.util import STABLE_MARRIAGE, make_prefs
+
+from matching import Hospital, MultipleMatching, Player, SingleMatching
+from matching.compact import CompactMultipleMatching, CompactSingleMatching
+from matching.games import HospitalResident, StableMarriage
+
+
+def _pairs(matching):
+    """Get the set of matched name pairs in a matching."""
+
+    pairs = set()
+    for player, match in matching.items():
+        matches = match if isinstance(match, list) else [match]
+        pairs.update((player.name, m.name) for m in matches if m is not None)
+
+    return pairs
+
+
+@given(game=games(), optimal=sampled_from(["resident", "hospital"]))
+def test_multiple(game, optimal):
+    """Test that a solved HR matching can be made compact and exported,
+    and that its dictionary is made only when it is needed."""
+
+    matching = game.solve(optimal)
+    compact = matching.compact()
+
+    assert isinstance(compact, CompactMultipleMatching)
+    assert isinstance(compact, MultipleMatching)
+    assert not compact._filled
+    assert len(compact) == len(matching)
+    assert list(compact) == list(matching.keys())
+
+    indptr, indices = compact.to_numpy()
+    assert indptr.tolist()[-1] == len(indices)
+    assert not compact._filled
+
+    records = compact.to_records()
+    assert set(zip(records.player.tolist(), records.match.tolist())) == (
+        _pairs(matching)
+    )
+    assert not compact._filled
+
+    assert compact == matching
+    assert compact._filled
+    for hospital in game.hospitals:
+        assert compact[hospital] == matching[hospital]
+
+
+@given(
+    game=games(residents_from=text("ABCDE"), hospitals_from=text("XYZ")),
+    optimal=sampled_from(["resident", "hospital"]),
+)
+def test_load_is_compact(game, optimal):
+    """Test that a loaded matching is compact and matches the original."""
+
+    matching = game.solve(optimal)
+    with tempfile.TemporaryDirectory() as directory:
+        path = os.path.join(directory, "game.npz")
+        game.save(path)
+        loaded = HospitalResident.load(path, mmap=False)
+
+    assert isinstance(loaded.matching, CompactMultipleMatching)
+    assert _pairs(loaded.matching) == _pairs(matching)
+    for hospital in loaded.hospitals:
+        assert loaded.matching[hospital] == hospital.matching
+
+
+@STABLE_MARRIAGE
+def test_single(player_names, seed):
+    """Test that an SM matching exports an array of partners, and that
+    updates to it are followed by its exports."""
+
+    suitor_prefs, reviewer_prefs = make_prefs(player_names, seed)
+    game = StableMarriage.create_from_dictionaries(
+        suitor_prefs, reviewer_prefs
+    )
+
+    matching = game.solve()
+    compact = matching.compact()
+
+    assert isinstance(compact, CompactSingleMatching)
+    assert isinstance(compact, SingleMatching)
+
+    partners = compact.to_numpy()
+    assert [compact.others[i] for i in partners] == [
+        matching[suitor] for suitor in compact.players
+    ]
+    assert np.array_equal(matching.to_numpy(), partners)
+
+    suitor = compact.players[0]
+    compact[suitor] = None
+    assert compact[suitor] is None
+    assert compact.to_numpy()[0] == -1
+    assert len(compact.to_records()) == len(compact) - 1
+
+
+@given(game=games(), optimal=sampled_from(["resident", "hospital"]))
+def test_multiple_from_arrays(game, optimal):
+    """Test that a matching made from CSR arrays links every player."""
+
+    compact = game.solve(optimal).compact()
+    indptr, indices = compact.to_numpy()
+    others = compact.others + [
+        r for r in game.residents if r not in compact.others
+    ]
+    expected = {h: h.matching for h in game.hospitals}
+    for player in game.residents + game.hospitals:
+        player.matching = "foo"
+
+    matching = MultipleMatching.from_arrays(
+        compact.players, others, indptr, indices
+    )
+
+    assert matching == expected
+    for hospital, residents in expected.items():
+        assert hospital.matching == residents
+        assert all(resident.matching == hospital for resident in residents)
+
+    unmatched = others[len(compact.others) :]
+    assert all(resident.matching is None for resident in unmatched)
+
+
+@STABLE_MARRIAGE
+def test_single_from_arrays(player_names, seed):
+    """Test that a matching made from partners links every player, and
+    that invalid partners are refused."""
+
+    suitor_prefs, reviewer_prefs = make_prefs(player_names, seed)
+    game = StableMarriage.create_from_dictionaries(
+        suitor_prefs, reviewer_prefs
+    )
+    suitors, reviewers = game.suitors, game.reviewers
+    partners = np.arange(len(suitors))[::-1]
+
+    matching = SingleMatching.from_arrays(suitors, reviewers, partners)
+    for suitor, i in zip(suitors, partners):
+        assert matching[suitor] == reviewers[i]
+        assert suitor.matching == reviewers[i]
+        assert reviewers[i].matching == suitor
+
+    partners = np.zeros(len(suitors), dtype=int)
+    partners[0] = len(reviewers)
+    for validate in ("full", "fast"):
+        with pytest.raises(ValueError):
+            SingleMatching.from_arrays(suitors, reviewers, partners, validate)
+
+    SingleMatching.from_arrays(suitors, reviewers, partners[1:] * 0, "none")
+
+
+@pytest.mark.parametrize(
+    "indptr, indices",
+    (([0, 1], [0, 1]), ([0, 2, 1], [0, 1]), ([0, 1, 2], [0, 0])),
+)
+def test_multiple_from_arrays_invalid(indptr, indices):
+    """Test that CSR arrays that do not describe a matching are refused."""
+
+    players = [Hospital(name, 2) for name in "XY"]
+    others = [Player(name) for name in "AB"]
+
+    with pytest.raises(ValueError):
+        MultipleMatching.from_arrays(players, others, indptr, indices)
+
+
+def test_to_pandas():
+    """Test that a matching can be exported to a data frame."""
+
+    pd = pytest.importorskip("pandas")
+
+    game = HospitalResident.create_from_dictionaries(
+        {"A": ["X"], "B": ["X", "Y"]},
+        {"X": ["B", "A"], "Y": ["B"]},
+        {"X": 1, "Y": 1},
+    )
+    frame = game.solve().to_pandas()
+
+    assert isinstance(frame, pd.DataFrame)
+    assert frame.to_dict("records") == [{"player": "X", "match": "B"}]
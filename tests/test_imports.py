@@ -0,0 +1,105 @@
+"""Tests for the lazy imports of the packages in the library."""
+
+import importlib
+import subprocess
+import sys
+
+import pytest
+
+import matching
+from matching import algorithms, games
+
+
+def _imported_modules(code):
+    """Get the modules of the library imported by some code, run in a
+    fresh interpreter."""
+
+    code += (
+        "\nimport sys"
+        "\nprint(*(name for name in sys.modules if 'matching' in name))"
+    )
+    output = subprocess.run(
+        [sys.executable, "-c", code], capture_output=True, text=True
+    )
+
+    return set(output.stdout.split())
+
+
+def test_import_package():
+    """Test that importing the package loads nothing else of it."""
+
+    assert _imported_modules("import matching") == {
+        "matching",
+        "matching._lazy",
+    }
+
+
+def test_import_game():
+    """Test that importing a game loads its own algorithm and none of the
+    other games or algorithms."""
+
+    modules = _imported_modules("from matching.games import HospitalResident")
+
+    assert "matching.games.hospital_resident" in modules
+    assert "matching.algorithms.hospital_resident" in modules
+    for name in ("stable_marriage", "stable_roommates", "student_allocation"):
+        assert f"matching.games.{name}" not in modules
+        assert f"matching.algorithms.{name}" not in modules
+
+    for name in ("batch", "cache", "checkpoint", "cli", "io", "tensor"):
+        assert f"matching.{name}" not in modules
+
+
+@pytest.mark.parametrize(
+    "code",
+    (
+        "import matching.games",
+        "from matching.games import HospitalResident",
+        "from matching.games import StableMarriage",
+        "from matching.games import StableRoommates",
+        "from matching.games import StudentAllocation",
+        "from matching.games import StableRoommates\n"
+        "StableRoommates.create_from_dictionary({1: [2], 2: [1]}).solve()",
+    ),
+)
+def test_import_without_numpy(code):
+    """Test that numpy is only imported once an array-based engine or
+    backend is used."""
+
+    code += "\nimport sys\nprint('numpy' in sys.modules)"
+    output = subprocess.run(
+        [sys.executable, "-c", code], capture_output=True, text=True
+    )
+
+    assert output.stdout.strip() == "False"
+
+
+@pytest.mark.parametrize(
+    "package", (matching, games, algorithms), ids=lambda p: p.__name__
+)
+def test_exports(package):
+    """Test that every export of a package can be found and is listed."""
+
+    for name in package.__all__:
+        if name == "Matching":
+            continue
+
+        assert getattr(package, name) is not None
+        assert name in dir(package)
+
+
+def test_export_named_like_submodule():
+    """Test that an algorithm stays a function once its submodule of the
+    same name has been imported."""
+
+    module = importlib.import_module("matching.algorithms.stable_roommates")
+
+    assert callable(algorithms.stable_roommates)
+    assert algorithms.stable_roommates is module.stable_roommates
+
+
+def test_missing_attribute():
+    """Test that a name a package does not have raises an error."""
+
+    with pytest.raises(AttributeError):
+        games.NotAGame
@@ -0,0 +1,81 @@
+"""Tests for the array container functions in `matching.io`."""
+
+import os
+import tempfile
+
+import numpy as np
+import pytest
+from hypothesis import given
+from hypothesis.extra.numpy import arrays
+from hypothesis.strategies import dictionaries, integers, sampled_from
+
+from matching import Player
+from matching.io import _names_to_array, read_arrays, write_arrays
+
+ARRAYS = dictionaries(
+    keys=sampled_from(["foo", "bar_indptr", "baz_indices"]),
+    values=arrays(np.int64, integers(0, 10)),
+)
+
+
+@given(arrays_=ARRAYS)
+def test_write_read_arrays_mmap(arrays_):
+    """Test that arrays can be written and then mapped from disk."""
+
+    with tempfile.TemporaryDirectory() as directory:
+        path = os.path.join(directory, "arrays.npz")
+        write_arrays(path, arrays_)
+        loaded = read_arrays(path, mmap=True)
+
+        assert set(loaded) == set(arrays_)
+        for key, array in arrays_.items():
+            assert np.array_equal(loaded[key], array)
+            if array.size:
+                assert isinstance(loaded[key], np.memmap)
+                assert not loaded[key].flags.writeable
+
+        del loaded
+
+
+@given(arrays_=ARRAYS)
+def test_write_read_arrays_in_memory(arrays_):
+    """Test that arrays can be written and then read into memory."""
+
+    with tempfile.TemporaryDirectory() as directory:
+        path = os.path.join(directory, "arrays.npz")
+        write_arrays(path, arrays_)
+        loaded = read_arrays(path, mmap=False)
+
+        assert set(loaded) == set(arrays_)
+        for key, array in arrays_.items():
+            assert np.array_equal(loaded[key], array)
+            assert not isinstance(loaded[key], np.memmap)
+
+
+def test_read_arrays_compressed():
+    """Test that a compressed archive cannot be mapped from disk."""
+
+    with tempfile.TemporaryDirectory() as directory:
+        path = os.path.join(directory, "arrays.npz")
+        np.savez_compressed(path, foo=np.arange(10))
+
+        with pytest.raises(ValueError, match="compressed"):
+            read_arrays(path, mmap=True)
+
+
+@pytest.mark.parametrize("names", (["A", 1], [2**70], ["A\x00"]))
+def test_names_to_array_invalid(names):
+    """Test that names which cannot be stored in an array are caught."""
+
+    players = [Player(name) for name in names]
+    with pytest.raises(ValueError, match="residents"):
+        _names_to_array(players, "residents")
+
+
+def test_names_to_array_null():
+    """Test that names ending in a null character are refused with a clear
+    message rather than being cut short."""
+
+    players = [Player("A"), Player("B\x00")]
+    with pytest.raises(ValueError, match="null character"):
+        _names_to_array(players, "residents")
@@ -0,0 +1,54 @@
+"""Tests for compiling the kernels in `matching.algorithms.kernels`."""
+
+import sys
+import threading
+import time
+import types
+
+import pytest
+
+from matching.algorithms import kernels
+
+
+def test_compile_in_threads(monkeypatch):
+    """Test that threads compiling the kernels at once each find every
+    kernel compiled, and that each is compiled only once."""
+
+    names = list(kernels._KERNELS)
+    if not names:
+        pytest.skip("The kernels have been compiled already.")
+
+    compiled = []
+
+    def njit(**options):
+        def jit(func):
+            time.sleep(0.01)
+            compiled.append(func.__name__)
+            return types.SimpleNamespace(compiled=func)
+
+        return jit
+
+    monkeypatch.setitem(sys.modules, "numba", types.SimpleNamespace(njit=njit))
+    monkeypatch.setattr(kernels, "_KERNELS", list(names))
+    for name in names:
+        monkeypatch.setattr(kernels, name, getattr(kernels, name))
+
+    seen = []
+    barrier = threading.Barrier(4)
+
+    def compile_kernels():
+        barrier.wait()
+        kernels._compile()
+        seen.append(
+            all(hasattr(getattr(kernels, name), "compiled") for name in names)
+        )
+
+    threads = [threading.Thread(target=compile_kernels) for _ in range(4)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    assert seen == [True] * 4
+    assert sorted(compiled) == sorted(names)
+    assert kernels._KERNELS == []
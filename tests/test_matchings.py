@@ -1,5 +1,6 @@
 """Tests for the matching classes."""
 
+import pytest
 from hypothesis import given
 from hypothesis.strategies import (
     composite,
@@ -96,3 +97,69 @@ def test_multiple_setitem(dictionary):
     assert host.matching == players
     for player in players:
         assert player.matching == host
+
+
+@given(dictionary=multiples())
+def test_by_name(dictionary):
+    """Test that a matching can be viewed by the names of its keys, and
+    that the view follows updates to the matching."""
+
+    matching = MultipleMatching(dictionary)
+    names = {host.name: host for host in dictionary}
+
+    assert set(matching.by_name) == set(names)
+    assert len(matching.by_name) == len(names)
+    for name, host in names.items():
+        assert matching.by_name[name] == dictionary[host]
+
+    host = list(names.values())[0]
+    matching[host] = []
+    assert matching.by_name[host.name] == []
+
+
+@given(dictionary=singles())
+def test_single_by_name(dictionary):
+    """Test that a single matching can be viewed by name."""
+
+    matching = SingleMatching(dictionary)
+    names = {player.name: player for player in dictionary}
+
+    assert dict(matching.by_name) == {
+        name: dictionary[player] for name, player in names.items()
+    }
+
+
+@given(dictionary=multiples(), validate=sampled_from(["full", "fast", "none"]))
+def test_multiple_update_many(dictionary, validate):
+    """Test that many host players can be updated at once."""
+
+    matching = MultipleMatching(dictionary)
+    hosts = list(dictionary.keys())
+    players = list(
+        {player for players in dictionary.values() for player in players}
+    )
+    assignments = {host: players[i::2] for i, host in enumerate(hosts[:2])}
+
+    matching.update_many(assignments, validate)
+    for host, new in assignments.items():
+        assert matching[host] == new
+        assert host.matching == new
+        for player in new:
+            assert player.matching == host
+
+
+@given(dictionary=singles(), validate=sampled_from(["full", "fast"]))
+def test_single_update_many_invalid(dictionary, validate):
+    """Test that updating many players checks their matches first."""
+
+    matching = SingleMatching(dictionary)
+    key = list(dictionary.keys())[0]
+
+    with pytest.raises(ValueError):
+        matching.update_many([(key, "foo")], validate)
+
+    with pytest.raises(ValueError):
+        matching.update_many({Player("bar"): None}, validate)
+
+    with pytest.raises(ValueError):
+        matching.update_many({key: None}, "quick")
@@ -0,0 +1,222 @@
+"""Tests for the flat pickling of games, matchings and players."""
+
+import copy
+import pickle
+import random
+
+import pytest
+from base.util import matching_names
+from hospital_resident.util import games
+from hypothesis import given, settings
+from hypothesis.strategies import sampled_from
+from stable_roommates.util import games as roommates_games
+
+from matching import MultipleMatching, Player, SingleMatching
+from matching.games import HospitalResident, StableMarriage
+from matching.players import Project, Supervisor
+
+COPIERS = {
+    "pickle": lambda obj: pickle.loads(pickle.dumps(obj)),
+    "deepcopy": copy.deepcopy,
+}
+
+
+def _names(player):
+    """Get the names of the players in each attribute of a player."""
+
+    def name(value):
+        if isinstance(value, list):
+            return [name(v) for v in value]
+
+        return getattr(value, "name", value)
+
+    return {key: name(value) for key, value in vars(player).items()}
+
+
+def _check_linked(players, copied):
+    """Check that copied players match the originals, and are linked only
+    to one another."""
+
+    assert [_names(p) for p in players] == [_names(p) for p in copied]
+
+    ids = {id(p) for p in copied}
+    for player in copied:
+        for other in player.prefs + list(player._original_prefs):
+            assert id(other) in ids
+
+
+def _big_game(num_residents, num_hospitals, length, seed=0):
+    """Make a large HR game without checking it."""
+
+    rng = random.Random(seed)
+    hospitals = [f"h{j}" for j in range(num_hospitals)]
+    resident_prefs = {
+        f"r{i}": rng.sample(hospitals, length) for i in range(num_residents)
+    }
+    hospital_prefs = {hospital: [] for hospital in hospitals}
+    for resident, prefs in resident_prefs.items():
+        for hospital in prefs:
+            hospital_prefs[hospital].append(resident)
+
+    return HospitalResident.create_from_dictionaries(
+        resident_prefs,
+        hospital_prefs,
+        dict.fromkeys(hospitals, 5),
+        validate="none",
+    )
+
+
+@pytest.mark.parametrize("how", COPIERS)
+@given(game=games(), solve=sampled_from([False, True]))
+@settings(deadline=None)
+def test_hospital_resident(how, game, solve):
+    """Test that an HR game is copied with its players linked as they are
+    in the original."""
+
+    if solve:
+        game.solve()
+        game.check_stability()
+
+    copied = COPIERS[how](game)
+
+    _check_linked(
+        game.residents + game.hospitals, copied.residents + copied.hospitals
+    )
+    assert copied.clean == game.clean
+    assert copied.blocking_pairs == (
+        None
+        if game.blocking_pairs is None
+        else [
+            (copied.get_player(r.name), copied.get_player(h.name))
+            for r, h in game.blocking_pairs
+        ]
+    )
+    if solve:
+        assert all(h in copied.hospitals for h in copied.matching.keys())
+        assert matching_names(copied.matching) == matching_names(game.matching)
+        assert all(
+            r.matching in copied.hospitals
+            for r in copied.residents
+            if r.matching is not None
+        )
+
+
+@pytest.mark.parametrize("how", COPIERS)
+@given(game=roommates_games())
+@settings(deadline=None)
+def test_stable_roommates(how, game):
+    """Test that a solved SR game is copied with its matching."""
+
+    game.solve()
+    copied = COPIERS[how](game)
+
+    _check_linked(game.players, copied.players)
+    assert isinstance(copied.matching, SingleMatching)
+    assert matching_names(copied.matching) == matching_names(game.matching)
+
+
+@pytest.mark.parametrize("how", COPIERS)
+def test_student_allocation(how):
+    """Test that the projects and counts of supervisors are copied."""
+
+    supervisor = Supervisor("X", 2)
+    projects = [Project("P", 1), Project("Q", 1)]
+    for project in projects:
+        project.set_supervisor(supervisor)
+
+    students = [Player("A"), Player("B")]
+    students[0].set_prefs(projects)
+    students[1].set_prefs(projects[::-1])
+    for project in projects:
+        project.set_prefs(students)
+    supervisor.set_prefs(students)
+
+    supervisor._project_counts = supervisor._project_counts.__class__(
+        {students[0]: 2, students[1]: 1}
+    )
+    copied = COPIERS[how](supervisor)
+
+    assert [p.name for p in copied.projects] == ["P", "Q"]
+    assert all(p.supervisor is copied for p in copied.projects)
+    assert {s.name: n for s, n in copied._project_counts.items()} == {
+        "A": 2,
+        "B": 1,
+    }
+
+
+@pytest.mark.parametrize("how", COPIERS)
+def test_player(how):
+    """Test that a single player is copied with those linked to it."""
+
+    suitors = [Player("A"), Player("B")]
+    reviewers = [Player("X"), Player("Y")]
+    for player in suitors:
+        player.set_prefs(reviewers)
+    for player in reviewers:
+        player.set_prefs(suitors[::-1])
+    suitors[0]._match(reviewers[1])
+    suitors[0].label = {"key": [1, 2]}
+
+    copied = COPIERS[how](suitors[0])
+
+    assert _names(copied) == _names(suitors[0])
+    assert copied.matching.prefs[1] is copied
+    assert copied.label == {"key": [1, 2]}
+    assert copied.label is not suitors[0].label
+
+
+@pytest.mark.parametrize("how", COPIERS)
+def test_matching(how):
+    """Test that a matching changed by hand is copied with its changes."""
+
+    game = _big_game(30, 6, 3)
+    matching = game.solve()
+    resident = game.residents[0]
+    hospital = next(h for h in game.hospitals if resident not in matching[h])
+    matching[hospital] = matching[hospital][:-1] + [resident]
+
+    copied = COPIERS[how](matching)
+
+    assert isinstance(copied, MultipleMatching)
+    assert matching_names(copied) == matching_names(matching)
+
+
+def test_shallow_copy():
+    """Test that a shallow copy of a game shares its players."""
+
+    game = StableMarriage.create_from_dictionaries(
+        {"A": ["X", "Y"], "B": ["Y", "X"]},
+        {"X": ["B", "A"], "Y": ["A", "B"]},
+    )
+    copied = copy.copy(game)
+
+    assert copied is not game
+    assert copied.suitors is game.suitors
+
+
+def test_paused_solve():
+    """Test that a game pickled partway through a solve carries on from
+    where it was paused."""
+
+    expected = matching_names(_big_game(300, 60, 5).solve())
+
+    game = _big_game(300, 60, 5)
+    steps = game.solve_iter(chunk=50)
+    next(steps)
+    unpickled = pickle.loads(pickle.dumps(game))
+    steps.close()
+
+    assert matching_names(unpickled.solve()) == expected
+
+
+@pytest.mark.parametrize("how", COPIERS)
+def test_large_game(how):
+    """Test that a game too large for the default pickling is copied
+    without hitting the recursion limit."""
+
+    game = _big_game(20_000, 200, 5)
+    game.solve()
+    copied = COPIERS[how](game)
+
+    assert len(copied.residents) == 20_000
+    assert matching_names(copied.matching) == matching_names(game.matching)
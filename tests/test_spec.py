@@ -0,0 +1,122 @@
+"""Tests for the immutable game specifications in `matching.spec`."""
+
+import os
+import tempfile
+from concurrent.futures import ThreadPoolExecutor
+
+import numpy as np
+import pytest
+from base.util import matching_names
+from hospital_resident.util import make_hr
+from stable_marriage.util import make_sm
+from stable_roommates.util import make_sr
+from student_allocation.util import make_sa
+
+from matching.games import HospitalResident, StableMarriage
+from matching.spec import GameSpec
+
+
+@pytest.mark.parametrize("make_game", (make_hr, make_sm, make_sr, make_sa))
+def test_solve(make_game):
+    """Test that a specification solves its instance with new games."""
+
+    spec = make_game().spec()
+    expected = matching_names(make_game().solve())
+
+    first, second = spec.solve(), spec.solve()
+    assert first is not second
+    assert isinstance(first, spec.game_class)
+    assert (
+        matching_names(first.matching)
+        == matching_names(second.matching)
+        == expected
+    )
+    assert first.check_validity() and first.check_stability()
+
+    assert spec.new_game().matching is None
+
+
+def test_solve_concurrently():
+    """Test that many threads can solve one specification at once."""
+
+    spec = make_hr().spec()
+    expected = {
+        optimal: matching_names(make_hr().solve(optimal))
+        for optimal in ("resident", "hospital")
+    }
+
+    optimals = ["resident", "hospital"] * 50
+    with ThreadPoolExecutor(max_workers=8) as executor:
+        games = list(executor.map(spec.solve, optimals))
+
+    for optimal, game in zip(optimals, games):
+        assert matching_names(game.matching) == expected[optimal]
+
+
+def test_immutable():
+    """Test that a specification and its arrays cannot be changed."""
+
+    spec = GameSpec.from_game(make_hr())
+
+    with pytest.raises(AttributeError):
+        spec.game_class = StableMarriage
+
+    with pytest.raises(AttributeError):
+        del spec.arrays
+
+    with pytest.raises(TypeError):
+        spec.arrays["residents"] = np.arange(3)
+
+    with pytest.raises(ValueError):
+        spec.arrays["residents_indices"][0] = 0
+
+    assert repr(spec) == "GameSpec(HospitalResident, residents=4, hospitals=3)"
+
+
+def test_from_solved_game_and_load():
+    """Test that no solver state is kept, and that specs can be loaded."""
+
+    game = make_hr()
+    game.solve()
+    spec = game.spec()
+    assert not any(
+        "_original_" in key or key.endswith("_matching") for key in spec.arrays
+    )
+
+    with tempfile.TemporaryDirectory() as directory:
+        path = os.path.join(directory, "game.npz")
+        make_hr().save(path)
+        loaded = GameSpec.load(path)
+
+        assert loaded.game_class is HospitalResident
+        assert matching_names(loaded.solve().matching) == matching_names(
+            game.matching
+        )
+        del loaded
+
+
+def test_new_game_from_template(monkeypatch):
+    """Test that new games copy the template players rather than building
+    them from the arrays, and share no players or lists."""
+
+    spec = make_sa().spec()
+    monkeypatch.setattr(
+        "matching.spec.game_from_arrays", lambda *args: pytest.fail()
+    )
+
+    first = spec.new_game()
+    first.solve()
+    second = spec.new_game()
+
+    assert second.matching is None
+    assert not {id(p) for p in first.students} & {
+        id(p) for p in second.students
+    }
+    for project in second.projects:
+        assert project.matching == []
+        assert project.supervisor in second.supervisors
+        assert all(student in second.students for student in project.prefs)
+        assert project.prefs == project._original_prefs
+        assert project.prefs is not project._original_prefs
+
+    assert matching_names(second.solve()) == matching_names(first.matching)
@@ -0,0 +1,107 @@
+"""Tests for solving batches of SM instances with `matching.tensor`."""
+
+import numpy as np
+import pytest
+from hypothesis import given
+from hypothesis.strategies import integers, sampled_from
+
+from matching.games import StableMarriage
+from matching.tensor import check_stable_marriages, stable_marriages
+
+
+def _make_ranks(seed, batch, size):
+    """Make the rank arrays of a batch of random instances."""
+
+    rng = np.random.default_rng(seed)
+    suitor_ranks = np.argsort(rng.random((batch, size, size)), axis=2)
+    reviewer_ranks = np.argsort(rng.random((batch, size, size)), axis=2)
+
+    return suitor_ranks, reviewer_ranks
+
+
+def _solve_game(suitor_ranks, reviewer_ranks, optimal):
+    """Solve an instance with the game and get the partners of its
+    suitors."""
+
+    size = len(suitor_ranks)
+    game = StableMarriage.create_from_dictionaries(
+        {
+            i: [size + j for j in np.argsort(row)]
+            for i, row in enumerate(suitor_ranks)
+        },
+        {
+            size + j: list(np.argsort(row))
+            for j, row in enumerate(reviewer_ranks)
+        },
+    )
+    game.solve(optimal)
+
+    return [suitor.matching.name - size for suitor in game.suitors]
+
+
+@given(
+    seed=integers(min_value=0),
+    batch=integers(min_value=1, max_value=5),
+    size=integers(min_value=1, max_value=8),
+    optimal=sampled_from(["suitor", "reviewer"]),
+)
+def test_stable_marriages(seed, batch, size, optimal):
+    """Test that a batch is solved to the matchings found by the game."""
+
+    suitor_ranks, reviewer_ranks = _make_ranks(seed, batch, size)
+
+    partners, stable = stable_marriages(
+        suitor_ranks, reviewer_ranks, optimal, check_stability=True
+    )
+
+    assert partners.shape == (batch, size)
+    assert stable.all()
+    for suitors, reviewers, expected in zip(
+        suitor_ranks, reviewer_ranks, partners
+    ):
+        assert _solve_game(suitors, reviewers, optimal) == list(expected)
+
+
+@given(
+    seed=integers(min_value=0),
+    batch=integers(min_value=1, max_value=5),
+    size=integers(min_value=1, max_value=6),
+)
+def test_check_stable_marriages(seed, batch, size):
+    """Test that a matching is stable if and only if no pair would
+    rather be with each other than their partners."""
+
+    suitor_ranks, reviewer_ranks = _make_ranks(seed, batch, size)
+    rng = np.random.default_rng(seed)
+    partners = np.array([rng.permutation(size) for _ in range(batch)])
+
+    stable = check_stable_marriages(suitor_ranks, reviewer_ranks, partners)
+
+    for suitors, reviewers, matches, result in zip(
+        suitor_ranks, reviewer_ranks, partners, stable
+    ):
+        suitor_of = np.argsort(matches)
+        blocked = any(
+            suitors[i, j] < suitors[i, matches[i]]
+            and reviewers[j, i] < reviewers[j, suitor_of[j]]
+            for i in range(size)
+            for j in range(size)
+        )
+        assert result == (not blocked)
+
+
+def test_stable_marriages_invalid():
+    """Test that rank arrays of the wrong shape or with repeated ranks
+    are rejected."""
+
+    suitor_ranks, reviewer_ranks = _make_ranks(0, 2, 3)
+
+    with pytest.raises(ValueError):
+        stable_marriages(suitor_ranks[0], reviewer_ranks[0])
+
+    with pytest.raises(ValueError):
+        stable_marriages(suitor_ranks, reviewer_ranks[:1])
+
+    suitor_ranks[0, 0] = 0
+    with pytest.raises(ValueError):
+        stable_marriages(suitor_ranks, reviewer_ranks)
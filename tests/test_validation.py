@@ -0,0 +1,237 @@
+"""Tests for collecting validation issues with `matching.validation`."""
+
+import os
+import subprocess
+import sys
+import warnings
+
+import pytest
+
+from matching.exceptions import (
+    PlayerExcludedWarning,
+    PreferencesChangedWarning,
+)
+from matching.games import (
+    HospitalResident,
+    StableMarriage,
+    StableRoommates,
+    StudentAllocation,
+)
+from matching.validation import (
+    ValidationReport,
+    collect_issues,
+    verify_reciprocated,
+)
+
+
+def _make_messy_hr():
+    """Make an instance of HR with some duplicate and unreciprocated
+    preferences, and an unranked hospital."""
+
+    return HospitalResident.create_from_dictionaries(
+        {"A": ["X", "X"], "B": ["Y"]},
+        {"X": ["A"], "Y": ["B", "A"], "Z": []},
+        {"X": 1, "Y": 1, "Z": 1},
+        clean=True,
+    )
+
+
+def test_collect_issues():
+    """Test that issues are collected in place of warnings."""
+
+    with warnings.catch_warnings(record=True) as record:
+        with collect_issues() as report:
+            game = _make_messy_hr()
+
+    assert record == []
+    assert isinstance(report, ValidationReport)
+    assert [h.name for h in game.hospitals] == ["X", "Y"]
+
+    counts = report.counts()
+    assert counts[PreferencesChangedWarning] == 2
+    assert counts[PlayerExcludedWarning] == 1
+    assert len(report) == 3
+    assert "A has ranked X multiple times." in report.messages()
+    assert report.messages(PlayerExcludedWarning) == [
+        "Z has an empty preference list."
+    ]
+    assert repr(report) == (
+        "ValidationReport(PreferencesChangedWarning=2, "
+        "PlayerExcludedWarning=1)"
+    )
+
+
+def test_emit():
+    """Test that collected issues can be raised in full or in summary."""
+
+    with collect_issues() as report:
+        _make_messy_hr()
+
+    with warnings.catch_warnings(record=True) as record:
+        warnings.simplefilter("always")
+        report.emit(summary=False)
+
+    assert [str(w.message) for w in record] == report.messages()
+
+    with warnings.catch_warnings(record=True) as record:
+        warnings.simplefilter("always")
+        report.emit()
+
+    assert [w.category for w in record] == list(report.counts())
+    assert str(record[0].message).startswith("2 issue(s) found")
+
+
+def test_nested_and_uncollected():
+    """Test that issues go to the innermost report, or are warned about
+    outside of any."""
+
+    with collect_issues() as outer:
+        with collect_issues() as inner:
+            _make_messy_hr()
+        assert len(outer) == 0
+
+    assert len(inner) == 3
+
+    with warnings.catch_warnings(record=True) as record:
+        warnings.simplefilter("always")
+        _make_messy_hr()
+
+    assert [str(w.message) for w in record] == inner.messages()
+
+
+def test_no_warnings_filter():
+    """Test that the import-time warning filter can be turned off."""
+
+    code = (
+        "import warnings; before = list(warnings.filters); "
+        "import matching; print(warnings.filters == before)"
+    )
+    env = dict(os.environ, MATCHING_NO_WARNINGS_FILTER="1")
+    output = subprocess.run(
+        [sys.executable, "-c", code], env=env, capture_output=True, text=True
+    )
+
+    assert output.stdout.strip() == "True"
+
+
+def test_validate_fast():
+    """Test that fast validation raises at the first issue without
+    warning or cleaning, and passes valid instances."""
+
+    with warnings.catch_warnings(record=True) as record:
+        warnings.simplefilter("always")
+        with pytest.raises(ValueError):
+            HospitalResident.create_from_dictionaries(
+                {"A": ["X", "X"]}, {"X": ["A"]}, {"X": 1}, validate="fast"
+            )
+        with pytest.raises(ValueError):
+            HospitalResident.create_from_dictionaries(
+                {"A": ["X"]}, {"X": ["A"]}, {"X": 0}, validate="fast"
+            )
+        with pytest.raises(ValueError):
+            StudentAllocation.create_from_dictionaries(
+                {"A": ["X"]},
+                {"F": ["A"]},
+                {"X": "F"},
+                {"X": 2},
+                {"F": 1},
+                validate="fast",
+            )
+
+    assert record == []
+
+    resident_prefs = {"A": ["X", "Y"], "B": ["Y"], "C": ["X"]}
+    hospital_prefs = {"X": ["C", "A"], "Y": ["A", "B"]}
+    capacities = {"X": 1, "Y": 1}
+    games = [
+        HospitalResident.create_from_dictionaries(
+            resident_prefs, hospital_prefs, capacities, validate=validate
+        )
+        for validate in ("full", "fast")
+    ]
+
+    full, fast = (game.solve() for game in games)
+    assert {h.name: [r.name for r in rs] for h, rs in full.items()} == {
+        h.name: [r.name for r in rs] for h, rs in fast.items()
+    }
+
+    StableMarriage.create_from_dictionaries(
+        {"A": ["X", "Y"], "B": ["Y", "X"]},
+        {"X": ["B", "A"], "Y": ["A", "B"]},
+        validate="fast",
+    )
+    with pytest.raises(ValueError):
+        StableRoommates.create_from_dictionary(
+            {"A": ["B", "B"], "B": ["A"], "C": ["A", "B"]}, validate="fast"
+        )
+
+
+@pytest.mark.parametrize("clean", [False, True])
+def test_validate_fast_empty(clean):
+    """Test that fast validation reports an empty preference list as the
+    full validation does, and removes its player if cleaning."""
+
+    resident_prefs = {"A": ["X"], "B": []}
+    hospital_prefs = {"X": ["A"], "Y": []}
+    capacities = {"X": 1, "Y": 1}
+
+    reports = {}
+    for validate in ("full", "fast"):
+        with collect_issues() as reports[validate]:
+            game = HospitalResident.create_from_dictionaries(
+                resident_prefs,
+                hospital_prefs,
+                capacities,
+                clean=clean,
+                validate=validate,
+            )
+
+        names = [p.name for p in game.residents + game.hospitals]
+        assert names == (["A", "X"] if clean else ["A", "B", "X", "Y"])
+
+    assert reports["fast"].messages(PlayerExcludedWarning) == [
+        "B has an empty preference list.",
+        "Y has an empty preference list.",
+    ]
+    assert reports["fast"].messages() == reports["full"].messages()
+
+
+def test_verify_reciprocated_order():
+    """Test that the first unreciprocated pair is found by going through
+    the players and their preferences in order."""
+
+    game = HospitalResident.create_from_dictionaries(
+        {"A": ["X", "Y", "Z"], "B": ["Z", "Y"], "C": ["Z"]},
+        {"X": ["A"], "Y": ["B"], "Z": ["C", "A"]},
+        {"X": 1, "Y": 1, "Z": 1},
+        validate="none",
+    )
+
+    for _ in range(5):
+        with pytest.raises(ValueError) as error:
+            verify_reciprocated(game.residents, game.hospitals)
+
+        assert str(error.value) == "A ranked Y but they did not."
+
+    with pytest.raises(ValueError) as error:
+        verify_reciprocated(game.hospitals, game.residents)
+
+    assert str(error.value) == "A ranked Y but they did not."
+
+
+def test_validate_none():
+    """Test that inputs are trusted without validation, and that unknown
+    modes are refused."""
+
+    with warnings.catch_warnings(record=True) as record:
+        warnings.simplefilter("always")
+        game = HospitalResident.create_from_dictionaries(
+            {"A": ["X", "X"]}, {"X": []}, {"X": 0}, validate="none"
+        )
+
+    assert record == []
+    assert [h.name for h in game.hospitals] == ["X"]
+    assert [h.name for h in game.residents[0].prefs] == ["X", "X"]
+
+    with pytest.raises(ValueError, match="Validation must be one of"):
+        HospitalResident(game.residents, game.hospitals, validate="quick")